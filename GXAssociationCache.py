@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from gurux_dlms.enums import Unit
+from gurux_dlms.objects import GXDLMSObjectCollection
+
+
+class GXAssociationCache:
+    """
+    On-disk cache of association views.
+
+    Object lists are saved as Gurux XML files and scalers and units of the
+    registers as JSON next to them.  The cache is keyed by meter identity
+    and the least recently used entries are removed when the cache grows
+    over the maximum entry count.
+    """
+    def __init__(self, path="cache", maxEntries=1000, scalerTtl=30 * 24 * 3600):
+        # Cache directory.
+        self.path = path
+        # Maximum number of cached association views.
+        self.maxEntries = maxEntries
+        # Time in seconds after scaler and unit is read again from the meter.
+        self.scalerTtl = scalerTtl
+        self.__lock = threading.Lock()
+        self.__index = None
+
+    @classmethod
+    def getKey(cls, serverAddress, clientAddress, logicalDeviceName, firmwareVersion):
+        """
+        Returns cache key for the meter identity.
+        """
+        value = "%d;%d;%s;%s" % (serverAddress, clientAddress, logicalDeviceName, firmwareVersion)
+        return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+    def __getFileName(self, key):
+        return os.path.join(self.path, key + ".xml")
+
+    def __getScalerFileName(self, key):
+        return os.path.join(self.path, key + ".scalers.json")
+
+    def __getIndexFile(self):
+        return os.path.join(self.path, "index.json")
+
+    def __getIndex(self):
+        if self.__index is None:
+            self.__index = {}
+            if os.path.exists(self.__getIndexFile()):
+                with open(self.__getIndexFile(), "r") as f:
+                    self.__index = json.load(f)
+        return self.__index
+
+    def __saveIndex(self):
+        tmp = self.__getIndexFile() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.__index, f)
+        os.replace(tmp, self.__getIndexFile())
+
+    def load(self, key, client):
+        """
+        Load cached association view to the client.
+
+        Returns True if the association view was found from the cache.
+        """
+        with self.__lock:
+            index = self.__getIndex()
+            if key not in index or not os.path.exists(self.__getFileName(key)):
+                return False
+            objects = GXDLMSObjectCollection.load(self.__getFileName(key))
+            index[key]["used"] = time.time()
+            self.__saveIndex()
+        client.objects.clear()
+        client.objects.extend(objects)
+        return True
+
+    def save(self, key, objects, description=None):
+        """
+        Save association view to the cache and remove least recently used entries.
+        """
+        with self.__lock:
+            if not os.path.exists(self.path):
+                os.makedirs(self.path)
+            index = self.__getIndex()
+            objects.save(self.__getFileName(key))
+            index[key] = {"used": time.time(), "description": description}
+            while len(index) > self.maxEntries:
+                oldest = min(index, key=lambda k: index[k]["used"])
+                self.__remove(oldest)
+            self.__saveIndex()
+
+    def loadScalers(self, key):
+        """
+        Returns cached scalers and units that are not expired.
+
+        Returned dictionary is keyed by logical name and values are (scaler, unit) tuples.
+        """
+        ret = {}
+        with self.__lock:
+            if not os.path.exists(self.__getScalerFileName(key)):
+                return ret
+            with open(self.__getScalerFileName(key), "r") as f:
+                values = json.load(f)
+        expired = time.time() - self.scalerTtl
+        for ln, value in values.items():
+            if value[2] > expired:
+                try:
+                    unit = Unit(value[1])
+                except ValueError:
+                    #  Unit that is not in the enumeration is kept as a number.
+                    unit = value[1]
+                ret[ln] = (value[0], unit)
+        return ret
+
+    def saveScalers(self, key, objects):
+        """
+        Save scalers and units of the objects to the cache.  Existing entries of other objects are kept.
+        """
+        with self.__lock:
+            if not os.path.exists(self.path):
+                os.makedirs(self.path)
+            values = {}
+            if os.path.exists(self.__getScalerFileName(key)):
+                with open(self.__getScalerFileName(key), "r") as f:
+                    values = json.load(f)
+            now = time.time()
+            for it in objects:
+                values[it.logicalName] = (it.scaler, int(it.unit), now)
+            tmp = self.__getScalerFileName(key) + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(values, f)
+            os.replace(tmp, self.__getScalerFileName(key))
+
+    def __remove(self, key):
+        self.__index.pop(key, None)
+        for it in (self.__getFileName(key), self.__getScalerFileName(key)):
+            if os.path.exists(it):
+                os.remove(it)
+
+    def invalidate(self, key=None):
+        """
+        Remove association view and scalers from the cache.  All entries are removed if key is not given.
+        """
+        with self.__lock:
+            index = self.__getIndex()
+            if key is None:
+                for it in list(index):
+                    self.__remove(it)
+            else:
+                self.__remove(key)
+            if os.path.exists(self.path):
+                self.__saveIndex()
@@ -0,0 +1,202 @@
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from gurux_common.enums import TraceLevel
+from gurux_dlms import GXDLMSClient
+from gurux_dlms.enums import InterfaceType, Authentication, Conformance
+from gurux_net import GXNet
+from gurux_net.enums import NetworkType
+from GXDLMSReader import GXDLMSReader
+from GXDLMSSimulator import GXDLMSSimulator, GXSimulatedMeter
+
+
+class GXBenchmarkResult:
+    """
+    Measured cost of one read phase.
+    """
+    def __init__(self, phase):
+        self.phase = phase
+        #  Request-reply round trips.
+        self.requests = 0
+        #  Bytes sent to and received from the meter.
+        self.bytesTx = 0
+        self.bytesRx = 0
+        #  Wall time in milliseconds.
+        self.time = 0
+        #  Peak of allocated memory in kilobytes.
+        self.memory = 0
+
+    def toDict(self):
+        return {"phase": self.phase, "requests": self.requests, "bytesTx": self.bytesTx, "bytesRx": self.bytesRx,
+                "time": self.time, "memory": self.memory}
+
+    def __str__(self):
+        return "%-24s %8d %10d %10d %10.1f %10.1f" % (self.phase, self.requests, self.bytesTx, self.bytesRx,
+                                                        self.time, self.memory)
+
+
+class GXBenchmark:
+    """
+    Reads the local simulated meter end-to-end and measures each read phase.
+
+    Round trips and bytes are counted by the simulator so they are exact and
+    do not depend on the machine.  Wall time and memory are the median of
+    the repeated runs.
+    """
+    PHASES = ["initializeConnection", "getAssociationView", "readScalerAndUnits", "getProfileGenericColumns", "getReadOut",
+              "getProfileGenerics", "close"]
+
+    def __init__(self, interfaceType=InterfaceType.WRAPPER, objectCount=20, profileEntries=96 * 31,
+                 maxPduSize=1024, latency=0, loss=0.0):
+        self.interfaceType = interfaceType
+        self.objectCount = objectCount
+        self.profileEntries = profileEntries
+        self.maxPduSize = maxPduSize
+        #  Injected one way delay of the simulator in milliseconds.
+        self.latency = latency
+        self.loss = loss
+        #  General Block Transfer window size.  GBT is not used if zero.
+        self.gbtWindowSize = 0
+        #  Is allocated memory traced.  Tracing slows down the reading.
+        self.traceMemory = True
+        #  How many times the phases are run.
+        self.repeats = 1
+
+    def __getReader(self, port):
+        client = GXDLMSClient(True, 16, 1, Authentication.NONE, None, self.interfaceType)
+        if self.gbtWindowSize:
+            client.proposedConformance |= Conformance.GENERAL_BLOCK_TRANSFER
+            client.setGbtWindowSize(self.gbtWindowSize)
+        reader = GXDLMSReader(client, GXNet(NetworkType.TCP, "127.0.0.1", port), TraceLevel.OFF)
+        reader.media.open()
+        return reader
+
+    def __measure(self, simulator, phase, func):
+        ret = GXBenchmarkResult(phase)
+        requests, tx, rx = simulator.statistics.requests, simulator.statistics.bytesRx, simulator.statistics.bytesTx
+        if self.traceMemory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            #  Values are printed by the reader.
+            with contextlib.redirect_stdout(io.StringIO()):
+                func()
+        finally:
+            ret.time = 1000 * (time.perf_counter() - start)
+            if self.traceMemory:
+                ret.memory = tracemalloc.get_traced_memory()[1] / 1024.0
+                tracemalloc.stop()
+        ret.requests = simulator.statistics.requests - requests
+        ret.bytesTx = simulator.statistics.bytesRx - tx
+        ret.bytesRx = simulator.statistics.bytesTx - rx
+        return ret
+
+    def runOnce(self):
+        """
+        Read the simulated meter once and return the results of each phase.
+        """
+        meter = GXSimulatedMeter(self.objectCount, self.profileEntries)
+        with GXDLMSSimulator(0, self.interfaceType, meter, maxPduSize=self.maxPduSize, latency=self.latency,
+                             loss=self.loss) as simulator:
+            reader = self.__getReader(simulator.port)
+            try:
+                ret = [self.__measure(simulator, it, getattr(reader, it)) for it in GXBenchmark.PHASES]
+            finally:
+                reader.media.close()
+            if simulator.statistics.sequenceErrors:
+                raise ValueError("Simulator rejected %d HDLC frames with invalid sequence number." %
+                                 simulator.statistics.sequenceErrors)
+            return ret
+
+    def run(self):
+        """
+        Run the phases given times and return the medians of each phase.
+        """
+        runs = [self.runOnce() for _ in range(max(1, self.repeats))]
+        ret = runs[0]
+        for pos, it in enumerate(ret):
+            it.time = statistics.median([r[pos].time for r in runs])
+            it.memory = statistics.median([r[pos].memory for r in runs])
+        return ret
+
+    @classmethod
+    def save(cls, results, fileName):
+        with open(fileName, "w") as f:
+            json.dump([it.toDict() for it in results], f, indent=2)
+
+    @classmethod
+    def compare(cls, results, fileName, tolerance=20):
+        """
+        Compare the results to the baseline file.  Returns the regressions.
+        Round trips and bytes must not grow.  Time and memory may grow by tolerance percent.
+        """
+        with open(fileName, "r") as f:
+            baseline = {it["phase"]: it for it in json.load(f)}
+        ret = []
+        for it in results:
+            old = baseline.get(it.phase)
+            if old is None:
+                continue
+            for name in ("requests", "bytesTx", "bytesRx"):
+                if getattr(it, name) > old[name]:
+                    ret.append("%s %s: %d > %d" % (it.phase, name, getattr(it, name), old[name]))
+            for name in ("time", "memory"):
+                if old[name] and getattr(it, name) > old[name] * (1 + tolerance / 100.0):
+                    ret.append("%s %s: %.1f > %.1f" % (it.phase, name, getattr(it, name), old[name]))
+        return ret
+
+    @classmethod
+    def show(cls, results):
+        print("%-24s %8s %10s %10s %10s %10s" % ("Phase", "Requests", "TX bytes", "RX bytes", "Time ms", "Memory KB"))
+        for it in results:
+            print(it)
+        total = GXBenchmarkResult("Total")
+        for it in results:
+            total.requests += it.requests
+            total.bytesTx += it.bytesTx
+            total.bytesRx += it.bytesRx
+            total.time += it.time
+            total.memory = max(total.memory, it.memory)
+        print(total)
+
+
+def main(args):
+    """
+    GXBenchmark [-hdlc] [-o objects] [-e profile entries] [-d max PDU size] [-l latency ms] [-x loss]
+                [-G GBT window size] [-r repeats] [-n] [-s results.json] [-b baseline.json] [-t tolerance %]
+    -n disables memory tracing.  Exit code is 1 if results are worse than the baseline.
+    """
+    options = {}
+    pos = 0
+    while pos < len(args):
+        if args[pos] in ("-hdlc", "-n"):
+            options[args[pos]] = True
+        else:
+            pos += 1
+            options[args[pos - 1]] = args[pos]
+        pos += 1
+    b = GXBenchmark(InterfaceType.HDLC if "-hdlc" in options else InterfaceType.WRAPPER,
+                    int(options.get("-o", 20)), int(options.get("-e", 96 * 31)), int(options.get("-d", 1024)),
+                    int(options.get("-l", 0)), float(options.get("-x", 0)))
+    b.gbtWindowSize = int(options.get("-G", 0))
+    b.repeats = int(options.get("-r", 1))
+    b.traceMemory = "-n" not in options
+    results = b.run()
+    GXBenchmark.show(results)
+    if "-s" in options:
+        GXBenchmark.save(results, options["-s"])
+    if "-b" in options:
+        regressions = GXBenchmark.compare(results, options["-b"], float(options.get("-t", 20)))
+        for it in regressions:
+            print("Regression: " + it)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,56 +1,235 @@
 import datetime
+import functools
+import os
+import threading
 import time
 import traceback
 from gurux_common.enums import TraceLevel
-from gurux_common.io import Parity, StopBits
-from gurux_common import ReceiveParameters, GXCommon, TimeoutException
-from gurux_dlms import GXByteBuffer, GXReplyData, GXDLMSTranslator, GXDLMSException
-from gurux_dlms.enums import InterfaceType, ObjectType, Authentication, Conformance, DataType, Security
-from gurux_dlms.objects import GXDLMSObject, GXDLMSRegister, GXDLMSDemandRegister, GXDLMSProfileGeneric
+from gurux_common.io import Parity, StopBits, BaudRate
+from gurux_common import ReceiveParameters, TimeoutException
+from gurux_dlms import GXDLMSClient, GXByteBuffer, GXDateTime, GXReplyData, GXDLMSTranslator, GXDLMSException
+from gurux_dlms.enums import InterfaceType, ObjectType, Authentication, Conformance, DataType, Security, RequestTypes, ErrorCode, \
+    Command
+from gurux_dlms.objects import GXDLMSObject, GXDLMSRegister, GXDLMSDemandRegister, GXDLMSProfileGeneric, GXDLMSData, \
+    GXDLMSAssociationLogicalName
+from gurux_dlms.GXDLMS import GXDLMS
+from gurux_dlms.GXDLMSLNParameters import GXDLMSLNParameters
+from gurux_dlms.internal._GXCommon import _GXCommon
+from gurux_dlms.internal._GXDataInfo import _GXDataInfo
 from gurux_net import GXNet
 from gurux_serial import GXSerial
+from GXAssociationCache import GXAssociationCache
+from GXProfileWatermarks import GXProfileWatermarks
+from GXProfileTable import GXProfileTable
+from GXLogWriter import GXLogWriter
+from GXRetryPolicy import GXRetryPolicy
+from GXResultSink import GXResultRecord
+from GXReadCheckpoint import GXReadCheckpoint
+from GXReadBudget import GXReadBudget
+
+
+def _reassociateOnFailure(func):
+    """
+    Re-associate and call the reader method again once if the association is lost.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return func(self, *args, **kwargs)
+        except Exception as ex:
+            if not self.persistent or not self.isAssociationLost(ex):
+                raise
+            self.reassociate(ex)
+        return func(self, *args, **kwargs)
+    return wrapper
+
+
+def _measured(func):
+    """
+    Record timing span of the reader call if metrics are collected.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if self.metrics is None:
+            return func(self, *args, **kwargs)
+        with self.metrics.span(self, func.__name__):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
+def _profiled(func):
+    """
+    Profile the meter session with cProfile if it's enabled in the metrics.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if self.metrics is None or not self.metrics.profileDirectory:
+            return func(self, *args, **kwargs)
+        with self.metrics.profile(self):
+            return func(self, *args, **kwargs)
+    return wrapper
 
 
 class GXDLMSReader:
+    #  Baud rates of IEC 62056-21 identification message.
+    IEC_BAUD_RATES = {'0': 300, '1': 600, '2': 1200, '3': 2400, '4': 4800, '5': 9600, '6': 19200}
+    #  Read priorities of the interface classes.  Registers are read first and other objects after data and clock.
+    READ_PRIORITIES = {ObjectType.REGISTER: 0, ObjectType.EXTENDED_REGISTER: 0, ObjectType.DEMAND_REGISTER: 0,
+                       ObjectType.DATA: 1, ObjectType.CLOCK: 1}
+
     def __init__(self, client, media, trace):
         self.iec = False
-        self.replyBuff = bytearray(8 + 1024)
+        #  Time in milliseconds that the meter is given to change the baud rate after mode E is selected.
+        self.iecSettleTime = 500
+        #  Baud rate of the port is set to the negotiated baud rate without the sign-on if the meter answers.
+        self.iecSkipSignOn = False
+        #  Receive timeout in milliseconds when the meter is tried without the sign-on.
+        self.iecProbeTimeout = 500
+        #  Negotiated IEC baud rates by port and server address.
+        self.iecBaudRates = {}
+        #  Receive buffer, parameters and notification reply are reused for every packet of the connection.
+        self.receiveBuffer = GXByteBuffer(8 + 1024)
+        self.receiveParameters = ReceiveParameters()
+        self.notify = GXReplyData()
+        #  Number of received frames.
+        self.receivedFrames = 0
+        #  How many times receive buffer is grown.
+        self.receiveBufferResizes = 0
+        #  Sent requests, resent requests and sent and received bytes.
+        self.requests = 0
+        self.retries = 0
+        self.bytesTx = 0
+        self.bytesRx = 0
+        #  Time in seconds spent decoding the replies.  Frames and values are timed only when metrics are collected.
+        self.decodeTime = 0
+        #  Timing spans of the reader calls are recorded if set.
+        self.metrics = None
+        #  Process pool where profile generic rows are decoded.  Rows are decoded in the reader thread if not set.
+        self.decoderPool = None
+        #  Receive timeout in milliseconds until the round trip time is measured.
         self.waitTime = 5000
-        self.logFile = open("logFile.txt", "a")
+        #  Receive timeout, resend and circuit breaker of the connection.
+        self.retryPolicy = GXRetryPolicy()
+        #  Is reply that the meter takes long to collect read.
+        self.__slowRead = False
+        #  Time when the read must be finished.  Receive timeout is shortened so it is not passed and
+        #  requests fail after it.  Read time is not limited if not set.
+        self.deadline = None
+        #  Receive timeout in milliseconds of the release and disconnect requests.  They are sent also after the deadline.
+        self.closeTimeout = 2000
+        #  Rate limiters of the port and the fleet.  Each sent request takes a token from all of them.
+        self.rateLimiters = []
         self.trace = trace
+        #  Trace level of the log file.
+        self.logLevel = trace
+        self.logFile = GXLogWriter.open("logFile.txt")
         self.media = media
         self.client = client
+        #  Association view cache.  Association view is always read from the meter if not set.
+        self.associationCache = None
+        #  Read association view from the meter and replace cached one.
+        self.invalidateCache = False
+        #  Maximum number of attributes the meter accepts in one get-request-with-list.
+        self.maxReferences = 10
+        #  Interface classes of the OBIS codes.  Objects of known class are read without the association view.
+        self.obisIndex = None
+        #  Read values are given to the result sink if set.  Otherwise they are written to the trace.
+        self.results = None
+        #  Compiled read plans.  Requests of the attribute batches are encoded on every read if not set.
+        self.readPlans = None
+        #  Cache key of the connected meter.
+        self.cacheKey = None
+        #  Objects which scaler and unit is taken from the cache.
+        self.cachedScalers = set()
+        #  Logical device name and firmware version of the connected meter.
+        self.identity = None
+        #  Profile generic watermarks.  Only new profile rows are read if set.
+        self.profileWatermarks = None
+        #  Progress of readAll.  Reading continues from the checkpoint after the connection is lost if set.
+        self.checkpoint = None
+        #  How many times readAll opens the connection again and continues from the checkpoint.
+        self.resumeAttempts = 3
+        #  Time and traffic budget of readAll.  Reads that do not fit to the budget are skipped if set.
+        self.budget = None
+        #  Number of profile rows read with one request.
+        self.rowsPerRequest = 100
+        #  Maximum number of profile rows read from one profile in one poll.
+        self.maxRowsPerPoll = 10000
+        #  Directory where profile generic rows are exported.  Rows are not exported if not set.
+        self.profileDirectory = None
+        #  Association is kept open between the polls and it's opened again if it's lost.
+        self.persistent = False
+        #  Is association established.
+        self.associated = False
+        #  Time of the last received reply.
+        self.lastActivity = 0
+        #  Reader is used only by one thread at the time.
+        self.lock = threading.RLock()
+        #  Lost GBT block and block index of the acknowledgement that asked it again.
+        self.__gbtRecovery = None
         if self.trace > TraceLevel.WARNING:
             print("Authentication: " + str(self.client.authentication))
             print("ClientAddress: " + hex(self.client.clientAddress))
             print("ServerAddress: " + hex(self.client.serverAddress))
 
+    @_measured
     def close(self):
         #pylint: disable=broad-except
+        self.associated = False
         if self.media and self.media.isOpen():
             print("DisconnectRequest")
             reply = GXReplyData()
+            #  Association is closed also when the meter is not answering or the deadline is passed.
+            #  Otherwise it's left open in the meter until it times out.
+            policy = self.retryPolicy
+            waitTime = self.waitTime
+            deadline = self.deadline
+            self.retryPolicy = GXRetryPolicy(1, maxFailures=0)
+            self.waitTime = self.closeTimeout
+            self.deadline = None
             try:
-                #Release is call only for secured connections.
-                #All meters are not supporting Release and it's causing problems.
-                if self.client.interfaceType == InterfaceType.WRAPPER or\
-                    (self.client.interfaceType == InterfaceType.HDLC and self.client.ciphering.security != Security.NONE):
-                    self.readDataBlock(self.client.releaseRequest(), reply)
-            except Exception:
-                pass
-                #  All meters don't support release.
-            reply.clear()
-            self.readDLMSPacket(self.client.disconnectRequest(), reply)
-            self.media.close()
+                try:
+                    #Release is call only for secured connections.
+                    #All meters are not supporting Release and it's causing problems.
+                    if self.client.interfaceType == InterfaceType.WRAPPER or\
+                        (self.client.interfaceType == InterfaceType.HDLC and self.client.ciphering.security != Security.NONE):
+                        self.readDataBlock(self.client.releaseRequest(), reply)
+                except Exception:
+                    pass
+                    #  All meters don't support release.
+                reply.clear()
+                self.readDLMSPacket(self.client.disconnectRequest(), reply)
+            except Exception as ex:
+                self.writeTrace("Disconnect failed. %s", TraceLevel.WARNING, ex)
+            finally:
+                self.retryPolicy = policy
+                self.waitTime = waitTime
+                self.deadline = deadline
+                self.media.close()
 
     @classmethod
     def now(cls):
         return datetime.datetime.now().strftime("%H:%M:%S")
 
-    def writeTrace(self, line, level):
+    def isTraceEnabled(self, level):
+        """
+        Returns True if trace line of the level is shown or written to the log.
+        Use this before formatting expensive trace lines.
+        """
+        return self.trace >= level or (self.logFile is not None and self.logLevel >= level)
+
+    def writeTrace(self, line, level, *args):
+        """
+        Write trace line.  Line is formatted with the arguments only if the level is enabled.
+        """
+        if not self.isTraceEnabled(level):
+            return
+        if args:
+            line = line % args
         if self.trace >= level:
             print(line)
-        self.logFile.write(line)
+        if self.logFile is not None and self.logLevel >= level:
+            self.logFile.write(line)
 
     def readDLMSPacket(self, data, reply=None):
         if not reply:
@@ -62,31 +241,97 @@ class GXDLMSReader:
                 reply.clear()
                 self.readDLMSPacket2(it, reply)
 
+    def isAssociated(self):
+        return self.associated and self.media is not None and self.media.isOpen()
+
+    def isAssociationLost(self, ex):
+        """
+        Returns True if the error means that the meter has closed the connection or the association.
+
+        Service errors of the single attributes do not mean that the association is lost.
+        """
+        if isinstance(ex, (TimeoutException, OSError)):
+            return True
+        if isinstance(ex, GXDLMSException) and ex.errorCode == ErrorCode.DISCONNECT_MODE:
+            return True
+        return self.media is None or not self.media.isOpen()
+
+    def reassociate(self, ex=None):
+        """
+        Open the connection and the association again.
+        """
+        #pylint: disable=broad-except
+        self.writeTrace("Association lost. Re-associating. %s", TraceLevel.WARNING, ex or "")
+        self.__dropConnection()
+        self.initializeConnection()
+
+    def __dropConnection(self):
+        #pylint: disable=broad-except
+        self.associated = False
+        try:
+            self.media.close()
+        except Exception:
+            pass
+        #  Disconnect request is not sent and HDLC frame sequence must be reset here.
+        self.client.settings.resetFrameSequence()
+
+    def keepAlive(self):
+        """
+        Send keep-alive so the meter does not close the association for inactivity.
+        """
+        #  Logical name of the current association is read.  WRAPPER has no keep-alive frame
+        #  and HDLC receiver ready frame is not used because GXDLMSClient.keepAlive increases
+        #  the receiver sequence number and the next reply is rejected.
+        items = self.client.objects.getObjects([ObjectType.ASSOCIATION_LOGICAL_NAME, ObjectType.ASSOCIATION_SHORT_NAME])
+        if items:
+            self.read(items[0], 1)
+        else:
+            self.read(GXDLMSAssociationLogicalName(), 1)
+
     def readDLMSPacket2(self, data, reply):
-        if not data:
+        #  Next GBT block is received without sending anything when the meter is streaming.
+        if not data and reply.moreData != RequestTypes.GBT:
             return
-        notify = GXReplyData()
+        policy = self.retryPolicy
+        if data and policy.isOpen():
+            raise TimeoutException("Meter is not answering. " + str(policy.failures) + " requests failed in a row.")
+        notify = self.notify
         reply.error = 0
         eop = 0x7E
         #In network connection terminator is not used.
         if self.client.interfaceType == InterfaceType.WRAPPER and isinstance(self.media, GXNet):
             eop = None
-        p = ReceiveParameters()
+        p = self.receiveParameters
         p.eop = eop
-        p.waitTime = self.waitTime
+        timeout = policy.getTimeout(self.waitTime)
+        #  Meter collects profile generic rows and the association view before it answers and
+        #  the data blocks are long.  They are given at least the configured wait time.
+        floor = 0
+        if self.__slowRead or reply.moreData != RequestTypes.NONE:
+            floor = self.waitTime
+        p.waitTime = self.__getWaitTime(max(floor, timeout))
+        p.reply = None
         if eop is None:
-            p.Count = 8
+            p.count = 8
         else:
-            p.Count = 5
+            p.count = 5
         self.media.eop = eop
-        rd = GXByteBuffer()
+        rd = self.receiveBuffer
+        rd.clear()
         with self.media.getSynchronous():
-            if not reply.isStreaming():
-                self.writeTrace("TX: " + self.now() + "\t" + GXByteBuffer.hex(data), TraceLevel.VERBOSE)
+            if data:
+                for it in self.rateLimiters:
+                    it.acquire()
+                if self.isTraceEnabled(TraceLevel.VERBOSE):
+                    self.writeTrace("TX: " + self.now() + "\t" + GXByteBuffer.hex(data), TraceLevel.VERBOSE)
                 self.media.send(data)
+                self.requests += 1
+                self.bytesTx += len(data)
+            start = time.time()
+            received = self.bytesRx
             pos = 0
             try:
-                while not self.client.getData(rd, reply, notify):
+                while not (self.__isUnexpectedGbtBlock(rd, reply) or self.__getData(rd, reply, notify)):
                     if notify.data.size != 0:
                         if not notify.isMoreData():
                             t = GXDLMSTranslator()
@@ -98,19 +343,120 @@ class GXDLMSReader:
                         p.count = self.client.getFrameSize(rd)
                     while not self.media.receive(p):
                         pos += 1
-                        if pos == 3:
+                        if pos == policy.attempts:
+                            policy.failed()
                             raise TimeoutException("Failed to receive reply from the device in given time.")
-                        if rd.size == 0:
-                            print("Data send failed.  Try to resend " + str(pos) + "/3")
+                        timeout = policy.backOff(timeout)
+                        p.waitTime = self.__getWaitTime(max(floor, timeout))
+                        if rd.size == 0 and data:
+                            self.writeTrace("Data send failed.  Try to resend %d/%d", TraceLevel.WARNING, pos, policy.attempts)
                             self.media.send(data, None)
+                            self.retries += 1
+                            self.bytesTx += len(data)
+                    self.bytesRx += len(p.reply)
+                    if rd.size + len(p.reply) > rd.capacity:
+                        self.receiveBufferResizes += 1
                     rd.set(p.reply)
                     p.reply = None
+                    self.receivedFrames += 1
             except Exception as e:
-                self.writeTrace("RX: " + self.now() + "\t" + str(rd), TraceLevel.ERROR)
+                if self.isTraceEnabled(TraceLevel.ERROR):
+                    self.writeTrace("RX: %s\t%s", TraceLevel.ERROR, self.now(), rd)
                 raise e
-            self.writeTrace("RX: " + self.now() + "\t" + str(rd), TraceLevel.VERBOSE)
+            self.lastActivity = time.time()
+            #  Round trip of the resent request is not measured because the reply may be for any send.
+            if data and pos == 0:
+                policy.succeeded()
+                policy.addSample(1000 * (self.lastActivity - start))
+            elif data:
+                policy.succeeded(timeout)
+                #  Meter might answer to each send.  Meter handles the requests one at a time so
+                #  one round trip is waited for each resend and one for the jitter.
+                wait = p.waitTime
+                rtt = policy.getRoundTrip()
+                if rtt is not None:
+                    wait = min(wait, (pos + 1) * rtt)
+                self.__discardLateReplies(p, pos * (self.bytesRx - received), self.lastActivity + wait / 1000.0)
+            else:
+                policy.succeeded()
+            if self.isTraceEnabled(TraceLevel.VERBOSE):
+                self.writeTrace("RX: %s\t%s", TraceLevel.VERBOSE, self.now(), rd)
             if reply.error != 0:
                 raise GXDLMSException(reply.error)
+            if reply.command == Command.RELEASE_RESPONSE and self.associated:
+                #  Meter has released the association.
+                raise GXDLMSException(ErrorCode.DISCONNECT_MODE)
+
+    def __getWaitTime(self, waitTime):
+        """
+        Returns receive timeout in milliseconds that does not go over the deadline.
+        """
+        if self.deadline is None:
+            return waitTime
+        left = int(1000 * (self.deadline - time.time()))
+        if left <= 0:
+            raise TimeoutException("Read time of the meter is used.")
+        return min(waitTime, left)
+
+    def __discardLateReplies(self, p, size, deadline):
+        """
+        Late replies of the resent request are received and discarded.
+        Otherwise they are handled as the reply of the next request.
+        """
+        if self.deadline is not None:
+            deadline = min(deadline, self.deadline)
+        p.eop = None
+        p.count = size
+        p.reply = None
+        wait = int(1000 * (deadline - time.time()))
+        if wait > 0:
+            p.waitTime = wait
+            if self.media.receive(p):
+                self.bytesRx += len(p.reply)
+                p.reply = None
+        self.media.resetSynchronousBuffer()
+        if self.isTraceEnabled(TraceLevel.WARNING):
+            self.writeTrace("Late replies of the resent request are discarded.", TraceLevel.WARNING)
+
+    def __getData(self, data, reply, notify):
+        if self.metrics is None:
+            return self.client.getData(data, reply, notify)
+        start = time.perf_counter()
+        try:
+            return self.client.getData(data, reply, notify)
+        finally:
+            self.decodeTime += time.perf_counter() - start
+
+    def updateValue(self, item, attributeIndex, value, parameters=None):
+        """
+        Update the value of the object.  Decode time is measured if metrics are collected.
+
+        Parameters are the columns of the profile generic rows if only part of the columns are read.
+        """
+        if self.metrics is None:
+            return self.client.updateValue(item, attributeIndex, value, parameters)
+        start = time.perf_counter()
+        try:
+            return self.client.updateValue(item, attributeIndex, value, parameters)
+        finally:
+            self.decodeTime += time.perf_counter() - start
+
+    def setReceiveBufferSize(self, size):
+        """
+        Grow receive buffer to hold the largest frame of the connection.
+        """
+        if self.receiveBuffer.capacity < size:
+            self.receiveBuffer.capacity = size
+
+    def __readSlow(self, read, data, reply):
+        """
+        Read reply that the meter takes long to collect with at least the configured wait time.
+        """
+        self.__slowRead = True
+        try:
+            read(data, reply)
+        finally:
+            self.__slowRead = False
 
     def readDataBlock(self, data, reply):
         if data:
@@ -121,173 +467,615 @@ class GXDLMSReader:
             else:
                 self.readDLMSPacket(data, reply)
                 while reply.isMoreData():
-                    if reply.isStreaming():
-                        data = None
-                    else:
-                        data = self.client.receiverReady(reply)
-                    self.readDLMSPacket(data, reply)
+                    self.readNextBlock(reply)
+
+    @_measured
+    def readNextBlock(self, reply):
+        """
+        Read next data block, HDLC frame or General Block Transfer block of the reply.
+        """
+        if reply.moreData == RequestTypes.GBT:
+            self.__readGbtBlock(reply)
+        else:
+            self.readDLMSPacket(self.client.receiverReady(reply), reply)
+
+    def __getGbtAck(self, blockNumberAck):
+        #  GXDLMSClient.receiverReady fails for GBT because settings do not have block number.
+        settings = self.client.settings
+        p = GXDLMSLNParameters(settings, 0, Command.GENERAL_BLOCK_TRANSFER, 0, None, None, 0xFF)
+        p.gbtWindowSize = settings.gbtWindowSize
+        p.blockNumberAck = blockNumberAck
+        p.blockIndex = settings.blockIndex
+        return GXDLMS.getLnMessages(p)[0]
+
+    def __receiveGbtBlock(self, data, reply):
+        self.readDLMSPacket2(data, reply)
+        #  Block is split to several HDLC frames.
+        while reply.moreData & RequestTypes.FRAME:
+            self.readDLMSPacket(self.client.receiverReady(reply), reply)
+
+    def __isUnexpectedGbtBlock(self, rd, reply):
+        """
+        Returns True if received WRAPPER frame is a GBT block that is not the next block of the reply.
+        Block is not given to the client because it would corrupt the reply data.
+        """
+        if reply.moreData != RequestTypes.GBT or self.client.interfaceType != InterfaceType.WRAPPER:
+            return False
+        if rd.size < 14 or rd.size < 8 + rd.getUInt16(6) or rd.getUInt8(8) != Command.GENERAL_BLOCK_TRANSFER:
+            return False
+        return rd.getUInt16(10) != reply.blockNumber + 1
+
+    def __readGbtBlock(self, reply):
+        """
+        Receive next General Block Transfer block.
+
+        Meter sends a window of blocks and the last block of the window is
+        acknowledged.  If a block is lost, the following blocks are discarded
+        and the meter is asked to send the blocks again by acknowledging the
+        last block that is received in order.
+        """
+        settings = self.client.settings
+        expected = reply.blockNumber + 1
+        #  Is lost block already asked again.
+        recovering = self.__gbtRecovery == (expected, settings.blockIndex)
+        if reply.isStreaming() or recovering:
+            data = None
+        else:
+            data = self.__getGbtAck(reply.blockNumber)
+        try:
+            self.__receiveGbtBlock(data, reply)
+        except TimeoutException:
+            if data:
+                raise
+            #  Rest of the window is lost.
+            self.writeTrace("GBT block %d is lost.", TraceLevel.WARNING, expected)
+            data = self.__getGbtAck(expected - 1)
+            self.__gbtRecovery = (expected, settings.blockIndex)
+            self.__receiveGbtBlock(data, reply)
+        if reply.blockNumber != expected and self.__gbtRecovery != (expected, settings.blockIndex):
+            #  Blocks that the meter sends before it receives the acknowledgement are discarded.
+            self.writeTrace("GBT block %d is lost.", TraceLevel.WARNING, expected)
+            data = self.__getGbtAck(expected - 1)
+            self.__gbtRecovery = (expected, settings.blockIndex)
+            if self.isTraceEnabled(TraceLevel.VERBOSE):
+                self.writeTrace("TX: " + self.now() + "\t" + GXByteBuffer.hex(data), TraceLevel.VERBOSE)
+            self.media.send(data)
+            self.bytesTx += len(data)
 
+    @_measured
     def initializeConnection(self):
         self.media.open()
         if self.iec and isinstance(self.media, GXSerial):
-            p = ReceiveParameters()
-            p.allData = False
-            p.eop = '\n'
-            p.waitTime = self.waitTime
-            with self.media.getSynchronous():
-                data = "/?!\r\n"
-                self.writeTrace("TX: " + self.now() + "\t" + data, TraceLevel.VERBOSE)
-                self.media.send(data)
-                if not self.media.receive(p):
-                    raise Exception("Failed to received reply from the media.")
-
-                self.writeTrace("RX: " + self.now() + "\t" + str(p.reply), TraceLevel.VERBOSE)
-                #If echo is used.
-                replyStr = str(p.reply)
-                if data == replyStr:
-                    p.reply = None
-                    if not self.media.receive(p):
-                        raise Exception("Failed to received reply from the media.")
-                    self.writeTrace("RX: " + self.now() + "\t" + str(p.reply), TraceLevel.VERBOSE)
-                    replyStr = str(p.reply)
-
-            if not replyStr or replyStr[0] != '/':
-                raise Exception("Invalid responce : " + replyStr)
-            baudrate = replyStr[4]
-            if baudrate == '0':
-                bitrate = 300
-            elif baudrate == '1':
-                bitrate = 600
-            elif baudrate == '2':
-                bitrate = 1200
-            elif baudrate == '3':
-                bitrate = 2400
-            elif baudrate == '4':
-                bitrate = 4800
-            elif baudrate == '5':
-                bitrate = 9600
-            elif baudrate == '6':
-                bitrate = 230400
-            else:
-                raise Exception("Unknown baud rate.")
-
-            print("Bitrate is : " + bitrate)
-            #Send ACK
-            #Send Protocol control character
-            controlCharacter = '2'.encode()
-            #"2" HDLC protocol procedure (Mode E)
-            #Mode control character
-            #"2" //(HDLC protocol procedure) (Binary mode)
-            modeControlCharacter = '2'.encode()
-            #Set mode E.
-            tmp = bytearray([0x06, controlCharacter, baudrate, modeControlCharacter, 13, 10])
-            p.reply = None
-            with self.media.getSynchronous():
-                self.media.send(tmp)
-                self.writeTrace("TX: " + self.now() + "\t" + GXCommon.toHex(tmp), TraceLevel.VERBOSE)
-                p.waitTime = 200
-                if self.media.receive(p):
-                    self.writeTrace("RX: " + self.now() + "\t" + str(p.reply), TraceLevel.VERBOSE)
-                self.media.close()
-                self.media.dataBits = 8
-                self.media.parity = Parity.NONE
-                self.media.stopBits = StopBits.ONE
-                self.media.baudRate = bitrate
-                self.media.open()
-                #This sleep make sure that all meters can be read.
-                time.sleep(1000)
+            key = self.media.port + ";" + str(self.client.serverAddress)
+            baudRate = self.iecBaudRates.get(key)
+            if not (self.iecSkipSignOn and baudRate and self.__isModeE(baudRate)):
+                self.iecBaudRates[key] = self.__iecSignOn()
 
         reply = GXReplyData()
         data = self.client.snrmRequest()
         if data:
             self.readDLMSPacket(data, reply)
             self.client.parseUAResponse(reply.data)
-            size = self.client.limits.maxInfoTX + 40
-            self.replyBuff = bytearray(size)
+            self.setReceiveBufferSize(max(self.client.limits.maxInfoTX, self.client.limits.maxInfoRX) + 40)
         reply.clear()
         self.readDataBlock(self.client.aarqRequest(), reply)
         self.client.parseAareResponse(reply.data)
+        if self.client.interfaceType == InterfaceType.WRAPPER:
+            #  Wrapper header is 8 bytes.
+            self.setReceiveBufferSize(self.client.settings.maxPduSize + 8)
         reply.clear()
         if self.client.authentication > Authentication.LOW:
             for it in self.client.getApplicationAssociationRequest():
                 self.readDLMSPacket(it, reply)
             self.client.parseApplicationAssociationResponse(reply.data)
+        self.associated = True
+
+    def __setSerialMode(self, baudRate, dataBits=8, parity=Parity.NONE, stopBits=StopBits.ONE):
+        self.media.close()
+        self.media.baudRate = baudRate
+        self.media.dataBits = dataBits
+        self.media.parity = parity
+        self.media.stopBits = stopBits
+        self.media.open()
+
+    def __iecReceive(self, p):
+        p.reply = None
+        if not self.media.receive(p):
+            raise TimeoutException("Failed to received reply from the media.")
+        ret = bytes(p.reply).decode("ascii", "replace")
+        self.writeTrace("RX: %s\t%s", TraceLevel.VERBOSE, self.now(), ret.strip())
+        return ret
+
+    def __iecSignOn(self):
+        """
+        IEC 62056-21 sign-on at 300 baud and switch to mode E.  Returns the negotiated baud rate.
+        """
+        if self.media.baudRate != BaudRate.BAUD_RATE_300:
+            self.__setSerialMode(BaudRate.BAUD_RATE_300, 7, Parity.EVEN)
+        p = ReceiveParameters()
+        p.allData = False
+        p.eop = '\n'
+        p.waitTime = self.waitTime
+        with self.media.getSynchronous():
+            data = "/?!\r\n"
+            self.writeTrace("TX: %s\t%s", TraceLevel.VERBOSE, self.now(), data.strip())
+            self.media.send(data.encode("ascii"))
+            replyStr = self.__iecReceive(p)
+            #If echo is used.
+            if replyStr == data:
+                replyStr = self.__iecReceive(p)
+        if len(replyStr) < 5 or replyStr[0] != '/':
+            raise Exception("Invalid responce : " + replyStr)
+        baudrate = replyStr[4]
+        bitrate = GXDLMSReader.IEC_BAUD_RATES.get(baudrate)
+        if bitrate is None:
+            raise Exception("Unknown baud rate.")
+        self.writeTrace("Bitrate is : %s", TraceLevel.INFO, bitrate)
+        #Send ACK
+        #Send Protocol control character
+        #"2" HDLC protocol procedure (Mode E)
+        controlCharacter = ord('2')
+        #Mode control character
+        #"2" //(HDLC protocol procedure) (Binary mode)
+        modeControlCharacter = ord('2')
+        #Set mode E.
+        tmp = bytearray([0x06, controlCharacter, ord(baudrate), modeControlCharacter, 13, 10])
+        with self.media.getSynchronous():
+            if self.isTraceEnabled(TraceLevel.VERBOSE):
+                self.writeTrace("TX: " + self.now() + "\t" + GXByteBuffer.hex(tmp), TraceLevel.VERBOSE)
+            self.media.send(tmp)
+            #  Acknowledgement takes 200 ms to send at 300 baud.  Optical probe might echo it.
+            p.reply = None
+            p.waitTime = 200
+            if self.media.receive(p) and self.isTraceEnabled(TraceLevel.VERBOSE):
+                self.writeTrace("RX: " + self.now() + "\t" + GXByteBuffer.hex(p.reply), TraceLevel.VERBOSE)
+        self.__setSerialMode(bitrate)
+        #  Meter needs time to change the baud rate.
+        time.sleep(self.iecSettleTime / 1000.0)
+        return bitrate
+
+    def __isModeE(self, baudRate):
+        """
+        Returns True if the meter is still in mode E and it answers to SNRM without the sign-on.
+        """
+        #pylint: disable=broad-except
+        self.__setSerialMode(baudRate)
+        policy = self.retryPolicy
+        waitTime = self.waitTime
+        #  Probe is sent only once and it does not affect the timeouts of the meter.
+        self.retryPolicy = GXRetryPolicy(1, maxFailures=0)
+        self.waitTime = self.iecProbeTimeout
+        try:
+            self.readDLMSPacket(self.client.snrmRequest(), GXReplyData())
+            return True
+        except Exception:
+            self.writeTrace("Meter is not in mode E. Sign-on is made.", TraceLevel.INFO)
+            return False
+        finally:
+            self.retryPolicy = policy
+            self.waitTime = waitTime
 
+    @_measured
+    @_reassociateOnFailure
     def read(self, item, attributeIndex):
         data = self.client.read(item, attributeIndex)[0]
         reply = GXReplyData()
         self.readDataBlock(data, reply)
         if item.getDataType(attributeIndex) == DataType.NONE:
             item.setDataType(attributeIndex, reply.valueType)
-        return self.client.updateValue(item, attributeIndex, reply.value)
+        return self.updateValue(item, attributeIndex, reply.value)
 
+    @_measured
+    @_reassociateOnFailure
     def readList(self, list_):
         if list_:
             data = self.client.readList(list_)
             reply = GXReplyData()
             values = list()
             for it in data:
-                self.readDataBlock(it, reply)
-                values.extend(reply.value)
+                values.extend(self.__readListBlock(it, reply))
                 reply.clear()
             if len(values) != len(list_):
                 raise ValueError("Invalid reply. Read items count do not match.")
-            self.client.updateValues(list_, values)
+            return self.__updateValues(list_, values)
+        return None
+
+    def __readListBlock(self, data, reply):
+        """
+        Read get-with-list reply.  Items that the meter failed to read are returned as the exception.
+        """
+        try:
+            self.readDataBlock(data, reply)
+        except GXDLMSException as ex:
+            #  Meter has answered to each item but some of them have failed.
+            #  Failed item is returned as None so it can't be told apart from null value.
+            if not isinstance(reply.value, list):
+                raise
+            return [ex if it is None else it for it in reply.value]
+        return reply.value
+
+    def __updateValues(self, batch, values):
+        ret = list()
+        for (item, attributeIndex), value in zip(batch, values):
+            if isinstance(value, Exception):
+                ret.append(value)
+            else:
+                ret.append(self.updateValue(item, attributeIndex, value))
+        return ret
+
+    @_measured
+    @_reassociateOnFailure
+    def readPlanned(self, batch, plan, index):
+        """
+        Read the attribute batch using precompiled request of the read plan.
+        """
+        reply = GXReplyData()
+        if len(batch) == 1:
+            self.readDataBlock(plan.getMessages(self.client, index), reply)
+            item, attributeIndex = batch[0]
+            if item.getDataType(attributeIndex) == DataType.NONE:
+                item.setDataType(attributeIndex, reply.valueType)
+            return [self.updateValue(item, attributeIndex, reply.value)]
+        values = self.__readListBlock(plan.getMessages(self.client, index), reply)
+        if len(values) != len(batch):
+            raise ValueError("Invalid reply. Read items count do not match.")
+        return self.__updateValues(batch, values)
+
+    def getReadListBatchSize(self):
+        """
+        Returns how many attributes are read with one get-request-with-list.
+        """
+        if self.client.negotiatedConformance & Conformance.MULTIPLE_REFERENCES == 0:
+            return 1
+        #  Request header takes 12 bytes and each attribute descriptor 10 bytes.
+        count = int((self.client.settings.maxPduSize - 12) / 10)
+        if self.client.interfaceType == InterfaceType.HDLC:
+            #  Request is kept in one HDLC frame.  LLC header takes 3 bytes.
+            count = min(count, int((self.client.limits.maxInfoTX - 3 - 12) / 10))
+        return max(1, min(count, self.maxReferences))
+
+    def readBatches(self, list_):
+        """
+        Read attributes using get-request-with-list batches sized to the negotiated PDU.
+
+        Failed batch is split and read again so one failing attribute do not
+        cause that other attributes are read one by one.
+        Returns list of (item, attributeIndex, value) tuples.  Value is the
+        exception if attribute read failed.
+        """
+        return list(self.iterBatches(list_))
+
+    def iterBatches(self, list_):
+        """
+        Read attributes like readBatches and yield (item, attributeIndex, value) tuples when each batch is read.
+        """
+        count = self.getReadListBatchSize()
+        plan = None
+        if self.readPlans and self.client.useLogicalNameReferencing and list_:
+            plan = self.readPlans.getPlan(list_, count)
+        for pos in range(0, len(list_), count):
+            ret = list()
+            self.__readBatch(list_[pos:pos + count], ret, plan, int(pos / count))
+            for it in ret:
+                yield it
+
+    def __readBatch(self, batch, results, plan=None, planIndex=0):
+        #pylint: disable=broad-except
+        try:
+            if plan:
+                values = self.readPlanned(batch, plan, planIndex)
+            elif len(batch) == 1:
+                values = [self.read(batch[0][0], batch[0][1])]
+            else:
+                values = self.readList(batch)
+        except (TimeoutException, OSError):
+            #  Connection is lost.  Other attributes would fail too.
+            raise
+        except Exception as ex:
+            if len(batch) == 1:
+                results.append((batch[0][0], batch[0][1], ex))
+                return
+            #  Whole request has failed.
+            half = int(len(batch) / 2)
+            self.__readBatch(batch[0:half], results)
+            self.__readBatch(batch[half:], results)
+            return
+        for (item, attributeIndex), value in zip(batch, values):
+            if isinstance(value, Exception) and len(batch) != 1:
+                #  Item has failed or it's null.  It's read alone to get the error code of the item.
+                self.__readBatch([(item, attributeIndex)], results)
+            else:
+                results.append((item, attributeIndex, value))
 
+    @_reassociateOnFailure
     def write(self, item, attributeIndex):
         data = self.client.write(item, attributeIndex)
         self.readDLMSPacket(data)
 
     def GetColumns(self, pg):
+        """
+        Read and return capture objects of the profile generic.
+        """
         entries = self.read(pg, 7)
-        print("Reading Profile Generic: " + pg.logicalName() + " " + pg.description() + " entries:" + str(entries))
+        self.writeTrace("Reading Profile Generic: %s %s entries:%s", TraceLevel.INFO, pg.logicalName, pg.description, entries)
+        self.read(pg, 3)
+        return pg.captureObjects
+
+    @classmethod
+    def __getColumnPositions(cls, pg, columns):
+        """
+        Returns zero based positions of the (object, capture object) columns in the capture objects.
+        """
+        ret = []
+        for obj, co in columns:
+            for pos, (k, v) in enumerate(pg.captureObjects):
+                if k.objectType == obj.objectType and k.logicalName == obj.logicalName and \
+                        v.attributeIndex == co.attributeIndex and v.dataIndex == co.dataIndex:
+                    ret.append(pos)
+                    break
+            else:
+                raise ValueError("Invalid column: " + obj.logicalName + ":" + str(co.attributeIndex))
+        return ret
+
+    def __getEntryView(self, pg, columns):
+        """
+        Returns (columns, picks) of the read by entry reply or None if all the columns are read.
+
+        Entry descriptor selects a continuous range of columns so the
+        columns between the selected ones are sent too.  Picks are the
+        positions of the selected columns in the reply row.
+        """
+        if not columns:
+            return None
+        positions = self.__getColumnPositions(pg, columns)
+        first, last = min(positions), max(positions)
+        picks = [pos - first for pos in positions]
+        if picks == list(range(last - first + 1)):
+            picks = None
+        return (pg.captureObjects[first:last + 1], picks)
+
+    def __getEntryRequest(self, pg, index, count, view):
+        """
+        Returns read by entry request of the columns in the view.
+        """
+        if view is None:
+            return self.client.readRowsByEntry(pg, index, count)
+        first = pg.captureObjects.index(view[0][0])
+        pg.buffer = []
+        buff = GXByteBuffer(19)
+        buff.setUInt8(0x02)
+        buff.setUInt8(DataType.STRUCTURE)
+        buff.setUInt8(0x04)
+        _GXCommon.setData(self.client.settings, buff, DataType.UINT32, index)
+        _GXCommon.setData(self.client.settings, buff, DataType.UINT32, index + count - 1 if count else 0)
+        #  From and to selected value are one based indexes of the columns.
+        _GXCommon.setData(self.client.settings, buff, DataType.UINT16, first + 1)
+        _GXCommon.setData(self.client.settings, buff, DataType.UINT16, first + len(view[0]))
+        #pylint: disable=protected-access
+        return self.client._read(pg.name, ObjectType.PROFILE_GENERIC, 2, buff)
+
+    def __getRangeView(self, pg, columns):
+        """
+        Returns (columns, picks) of the read by range reply or None if all the columns are read.  Meter sends only the selected columns.
+        """
+        if not columns:
+            return None
+        return ([pg.captureObjects[pos] for pos in self.__getColumnPositions(pg, columns)], None)
+
+    def __getRangeRequest(self, pg, start, end, view):
+        """
+        Returns read by range request of the columns in the view.
+        """
+        if view is None:
+            return self.client.readRowsByRange(pg, start, end)
+        return self.client.readRowsByRange(pg, start, end, view[0])
+
+    @_measured
+    @_reassociateOnFailure
+    def readRowsByEntry(self, pg, index, count, columns=None):
+        """
+        Read rows by entry.  Only the given columns of the capture objects are read if columns are given.
+        """
+        if self.decoderPool:
+            return list(self.iterRowsByEntry(pg, index, count, columns))
+        view = self.__getEntryView(pg, columns)
+        data = self.__getEntryRequest(pg, index, count, view)
         reply = GXReplyData()
-        data = self.client.read(pg.name, pg.objectType, 3)[0]
-        self.readDataBlock(data, reply)
-        self.client.updateValue(pg, 3, reply.value)
-        return pg.getCaptureObjects()
+        self.__readSlow(self.readDataBlock, data, reply)
+        return self.__getSelectedRows(pg, reply.value, view)
 
-    def readRowsByEntry(self, pg, index, count):
-        data = self.client.readRowsByEntry(pg, index, count)
+    @_measured
+    @_reassociateOnFailure
+    def readRowsByRange(self, pg, start, end, columns=None):
+        """
+        Read rows by range.  Only the given columns of the capture objects are read if columns are given.
+        """
+        if self.decoderPool:
+            return list(self.iterRowsByRange(pg, start, end, columns))
+        view = self.__getRangeView(pg, columns)
+        data = self.__getRangeRequest(pg, start, end, view)
         reply = GXReplyData()
-        self.readDataBlock(data, reply)
-        return self.client.updateValue(pg, 2, reply.value)
+        self.__readSlow(self.readDataBlock, data, reply)
+        return self.__getSelectedRows(pg, reply.value, view)
+
+    def __getSelectedRows(self, pg, value, view):
+        if view is None:
+            return self.updateValue(pg, 2, value)
+        return self.__pickColumns(self.updateValue(pg, 2, value, view[0]), view)
+
+    @classmethod
+    def __pickColumns(cls, rows, view):
+        """
+        Returns the selected columns of the rows.
+        """
+        if view is None or view[1] is None:
+            return rows
+        return [[row[pos] for pos in view[1]] for row in rows]
+
+    def iterRowsByEntry(self, pg, index, count, columns=None):
+        """
+        Read rows by entry and yield them as data blocks are received.
+        """
+        view = self.__getEntryView(pg, columns)
+        return self.__iterRows(pg, lambda: self.__getEntryRequest(pg, index, count, view), view)
 
-    def readRowsByRange(self, pg, start, end):
+    def iterRowsByRange(self, pg, start, end, columns=None):
+        """
+        Read rows by range and yield them as data blocks are received.
+        """
+        view = self.__getRangeView(pg, columns)
+        return self.__iterRows(pg, lambda: self.__getRangeRequest(pg, start, end, view), view)
+
+    def __iterRows(self, pg, request, view=None):
+        """
+        Yields profile generic rows.
+
+        Complete rows are parsed from each received data block and removed
+        from the reply so only the incomplete last row is kept in memory.
+        Rows are not added to the buffer of the profile generic.  Request
+        is sent again after re-association if the association is lost before
+        the first reply.
+        """
         reply = GXReplyData()
-        data = self.client.readRowsByRange(pg, start, end)
-        self.readDataBlock(data, reply)
-        return self.client.updateValue(pg, 2, reply.value)
+        #  Last yielded row.  Needed when the meter leaves the capture time empty.
+        last = []
+        #  Is array header already parsed from the reply.
+        started = False
+        #  Rows are parsed only from whole data blocks that are not ciphered.
+        streaming = self.client.settings.cipher is None or self.client.settings.cipher.security == Security.NONE
+        try:
+            self.__readSlow(self.readDLMSPacket, request(), reply)
+        except Exception as ex:
+            if not self.persistent or not self.isAssociationLost(ex):
+                raise
+            self.reassociate(ex)
+            reply.clear()
+            self.__readSlow(self.readDLMSPacket, request(), reply)
+        #  Rows of the previous data block that are decoded in the decoder pool and offset of the block.
+        pending = None
+        offset = 0
+        while True:
+            if streaming and reply.moreData == RequestTypes.DATABLOCK:
+                if not started:
+                    #  Data is not an array.  Reply is parsed by the client.
+                    streaming = reply.data.size != 0 and reply.data.getUInt8(0) == DataType.ARRAY
+                    if streaming:
+                        reply.data.position = 1
+                        _GXCommon.getObjectCount(reply.data)
+                        started = True
+                elif pending:
+                    for row in self.__takeRows(pg, reply.data, pending, offset, last, view):
+                        yield row
+                else:
+                    reply.data.position = 0
+                if started:
+                    if self.decoderPool:
+                        #  Next block is read while this block is decoded.
+                        offset = reply.data.position
+                        pending = self.decoderPool.submitRows(self.client.settings, reply.data.subArray(offset, reply.data.size - offset))
+                    else:
+                        for row in self.__getRows(pg, reply.data, last, view):
+                            yield row
+                        reply.data.trim()
+            if not reply.isMoreData():
+                break
+            self.readNextBlock(reply)
+        if started:
+            if pending:
+                for row in self.__takeRows(pg, reply.data, pending, offset, last, view):
+                    yield row
+            reply.data.position = 0
+            for row in self.__getRows(pg, reply.data, last, view):
+                yield row
+        else:
+            for row in self.__convertRows(pg, reply.value or [], last, view):
+                yield row
+
+    def __takeRows(self, pg, data, pending, offset, last, view):
+        """
+        Wait rows from the decoder pool and remove decoded bytes from the data.
+        """
+        rows, count, _ = pending.result()
+        data.position = offset + count
+        data.trim()
+        return self.__convertRows(pg, rows, last, view)
+
+    def __getRows(self, pg, data, last, view=None):
+        """
+        Parse complete rows from the data.  Data position is left at the start of the first incomplete row.
+        """
+        rows = []
+        #  Rows are timed only when metrics are collected.
+        start = 0
+        if self.metrics is not None:
+            start = time.perf_counter()
+        while data.position < data.size:
+            pos = data.position
+            info = _GXDataInfo()
+            row = _GXCommon.getData(self.client.settings, data, info)
+            if not info.complete:
+                data.position = pos
+                break
+            rows.append(row)
+        if self.metrics is not None:
+            self.decodeTime += time.perf_counter() - start
+        return self.__convertRows(pg, rows, last, view)
+
+    def __convertRows(self, pg, rows, last, view=None):
+        #  Profile generic converts the values and adds them to the buffer.
+        #  Last row is kept in the buffer so empty capture times can be resolved.
+        pg.buffer = last[-1:]
+        self.updateValue(pg, 2, rows, view[0] if view else None)
+        ret = pg.buffer[len(last[-1:]):]
+        pg.buffer = []
+        if ret:
+            last[:] = ret[-1:]
+        return self.__pickColumns(ret, view)
 
+    @classmethod
+    def getScalerIndex(cls, item):
+        if isinstance(item, (GXDLMSRegister,)):
+            return 3
+        if isinstance(item, (GXDLMSDemandRegister,)):
+            return 4
+        return 0
+
+    @_measured
     def readScalerAndUnits(self):
         #pylint: disable=broad-except
         objs = self.client.objects.getObjects([ObjectType.REGISTER, ObjectType.EXTENDED_REGISTER, ObjectType.DEMAND_REGISTER])
-        try:
-            if self.client.negotiatedConformance & Conformance.MULTIPLE_REFERENCES != 0:
-                list_ = list()
-                for it in objs:
-                    if isinstance(it, (GXDLMSRegister,)):
-                        list_.append((it, 3))
-                    elif isinstance(it, (GXDLMSDemandRegister,)):
-                        list_.append((it, 4))
-                self.readList(list_)
-        except Exception:
-            self.client.negotiatedConformance &= ~Conformance.MULTIPLE_REFERENCES
-        if self.client.negotiatedConformance & Conformance.MULTIPLE_REFERENCES == 0:
+        self.cachedScalers = set()
+        if self.associationCache and self.cacheKey:
+            #  Use cached scalers and read only missing or expired ones.
+            cached = self.associationCache.loadScalers(self.cacheKey)
+            missing = []
             for it in objs:
-                try:
-                    if isinstance(it, (GXDLMSRegister,)):
-                        self.read(it, 3)
-                    elif isinstance(it, (GXDLMSDemandRegister,)):
-                        self.read(it, 4)
-                except Exception:
-                    pass
+                if it.logicalName in cached:
+                    it.scaler, it.unit = cached[it.logicalName]
+                    self.cachedScalers.add(it.logicalName)
+                else:
+                    missing.append(it)
+            self.writeTrace("Scalers from the cache: %d/%d", TraceLevel.INFO, len(self.cachedScalers), len(objs))
+            objs = missing
+            if not objs:
+                return
+        list_ = list()
+        for it in objs:
+            list_.append((it, self.getScalerIndex(it)))
+        #  Objects which scaler and unit are read successfully.
+        read_ = list()
+        for item, _, value in self.readBatches(list_):
+            if not isinstance(value, Exception):
+                read_.append(item)
+        if self.associationCache and self.cacheKey and read_:
+            self.associationCache.saveScalers(self.cacheKey, read_)
 
+    @_measured
     def getProfileGenericColumns(self):
         #pylint: disable=broad-except
         profileGenerics = self.client.objects.getObjects(ObjectType.PROFILE_GENERIC)
         for pg in profileGenerics:
-            self.writeTrace("Profile Generic " + str(pg.name) + "Columns:", TraceLevel.INFO)
+            self.writeTrace("Profile Generic %sColumns:", TraceLevel.INFO, pg.name)
             try:
                 self.read(pg, 3)
                 if self.trace > TraceLevel.WARNING:
@@ -301,30 +1089,86 @@ class GXDLMSReader:
                         if desc:
                             sb += desc
                     self.writeTrace(sb, TraceLevel.INFO)
+            except (TimeoutException, OSError):
+                raise
             except Exception as ex:
-                self.writeTrace("Err! Failed to read columns:" + str(ex), TraceLevel.ERROR)
+                self.writeTrace("Err! Failed to read columns:%s", TraceLevel.ERROR, ex)
+
+    @classmethod
+    def getReadPriority(cls, item):
+        """
+        Returns read priority of the object when the session has a budget.  Smaller is read first.
+        """
+        return GXDLMSReader.READ_PRIORITIES.get(item.objectType, 2)
 
+    @_measured
     def getReadOut(self):
+        """
+        Read all the attributes of the objects that are not profile generics.
+
+        If the checkpoint is used objects that are already read are
+        skipped and each object is marked read after its values are shown.
+        If the session has a budget objects are read in priority order and
+        the attributes that do not fit to the budget are skipped.
+        """
         #pylint: disable=unidiomatic-typecheck, broad-except
-        for it in self.client.objects:
+        done = set()
+        if self.checkpoint:
+            done = self.checkpoint.getDone(self.getMeterKey())
+        objects = list()
+        list_ = list()
+        items = list(self.client.objects)
+        if self.budget:
+            items.sort(key=self.getReadPriority)
+        for it in items:
             if type(it) == GXDLMSObject:
                 print("Unknown Interface: " + it.objectType.__str__())
                 continue
             if isinstance(it, GXDLMSProfileGeneric):
                 continue
-
-            self.writeTrace("-------- Reading " + str(it.objectType) + " " + str(it.name) + " " + it.description, TraceLevel.INFO)
-            for pos in (it).getAttributeIndexToRead(True):
-                try:
-                    val = self.read(it, pos)
-                    self.showValue(pos, val)
-                except Exception as ex:
-                    self.writeTrace("Error! Index: " + str(pos) + " " + str(ex), TraceLevel.ERROR)
-                    self.writeTrace(str(ex), TraceLevel.ERROR)
-                    if not isinstance(ex, (GXDLMSException, TimeoutException)):
-                        traceback.print_exc()
+            indexes = [pos for pos in it.getAttributeIndexToRead(True) if GXReadCheckpoint.getKey(it.logicalName, pos) not in done]
+            if indexes:
+                objects.append((it, indexes))
+            for pos in indexes:
+                #  Scaler and unit are not read again if they are taken from the cache.
+                if it.logicalName not in self.cachedScalers or pos != self.getScalerIndex(it):
+                    list_.append((it, pos))
+        #  Batches are read when their values are needed.
+        values = self.iterBatches(list_)
+        count = self.getReadListBatchSize()
+        #  Number of read values.  Next batch is read when it's divisible by the batch size.
+        read = 0
+        skipped = False
+        for it, indexes in objects:
+            if not skipped:
+                self.writeTrace("-------- Reading %s %s %s", TraceLevel.INFO, it.objectType, it.name, it.description)
+            read_ = list()
+            try:
+                for pos in indexes:
+                    if it.logicalName not in self.cachedScalers or pos != self.getScalerIndex(it):
+                        if not skipped and self.budget and read % count == 0 and not self.budget.fits(self):
+                            self.writeTrace("Read budget is used. Skipping the remaining attributes.", TraceLevel.WARNING)
+                            skipped = True
+                        if skipped:
+                            self.budget.skip(it.logicalName, pos, "Attribute")
+                            continue
+                        val = next(values)[2]
+                        read += 1
+                    else:
+                        #  Scaler and unit from the cache.
+                        val = it.getValues()[pos - 1]
+                    self.showResult(it.logicalName, pos, val, it)
+                    #  Attributes that failed because the connection was lost are read again when the session is resumed.
+                    if not isinstance(val, Exception) or not self.isAssociationLost(val):
+                        read_.append(GXReadCheckpoint.getKey(it.logicalName, pos))
+            finally:
+                #  Shown attributes are saved also when the connection is lost in the middle of the object.
+                if self.checkpoint and read_:
+                    self.checkpoint.setDone(self.getMeterKey(), read_)
 
     def showValue(self, pos, val):
+        if not self.isTraceEnabled(TraceLevel.INFO):
+            return
         if isinstance(val, (bytes, bytearray)):
             val = GXByteBuffer(val)
         elif isinstance(val, list):
@@ -337,66 +1181,598 @@ class GXDLMSReader:
                 else:
                     str_ += str(tmp)
             val = str_
-        self.writeTrace("Index: " + str(pos) + " Value: " + str(val), TraceLevel.INFO)
+        self.writeTrace("Index: %s Value: %s", TraceLevel.INFO, pos, val)
+
+    def showRows(self, cells):
+        if not self.isTraceEnabled(TraceLevel.INFO):
+            return
+        for rows in cells:
+            for cell in rows:
+                if isinstance(cell, bytearray):
+                    self.writeTrace(GXByteBuffer.hex(cell) + " | ", TraceLevel.INFO)
+                else:
+                    self.writeTrace("%s | ", TraceLevel.INFO, cell)
+            self.writeTrace("", TraceLevel.INFO)
+
+    def showObjects(self, results):
+        """
+        Show (logicalName, attributeIndex, value) results of readObjects.
+        """
+        for ln, index, value in results:
+            self.writeTrace("-------- Reading %s", TraceLevel.INFO, ln)
+            self.showResult(ln, index, value)
 
+    def getMeterName(self):
+        """
+        Returns logical device name of the meter or the media if it's not read.
+        """
+        if self.identity and self.identity[0]:
+            return self.identity[0]
+        return str(self.media)
+
+    def showResult(self, logicalName, attributeIndex, value, item=None):
+        """
+        Give the value to the result sink or show it if results are not collected.  Value is the exception if read failed.
+        """
+        if self.results is not None:
+            #  Value is scaled when it's updated to the register so only the unit is given.
+            unit = None
+            if attributeIndex in (2, 3) and self.getScalerIndex(item) > attributeIndex:
+                unit = item.unit
+            if isinstance(value, Exception):
+                record = GXResultRecord(self.getMeterName(), logicalName, attributeIndex, None, status=str(value))
+            else:
+                record = GXResultRecord(self.getMeterName(), logicalName, attributeIndex, value, unit=unit)
+            self.results.add(record)
+        if isinstance(value, Exception):
+            self.writeTrace("Error! Index: %s %s", TraceLevel.ERROR, attributeIndex, value)
+        elif self.results is None:
+            self.showValue(attributeIndex, value)
+
+    def showProfileRows(self, pg, rows, columns=None):
+        """
+        Give the profile generic rows to the result sink or show them if results are not collected.
+
+        Capture time of the row is used as the timestamp of the values.
+        Columns are the capture objects of the row cells if only part of the columns are read.
+        """
+        if self.results is None:
+            self.showRows(rows)
+            return
+        meter = self.getMeterName()
+        for row in rows:
+            timestamp = self.getRowTime(row)
+            first = 0 if timestamp is None else 1
+            for (obj, co), value in zip((columns or pg.captureObjects)[first:], row[first:]):
+                #  Cells of the registers are scaled when the buffer is updated.
+                unit = None
+                if co.attributeIndex in (2, 3) and self.getScalerIndex(obj) > co.attributeIndex:
+                    unit = obj.unit
+                self.results.add(GXResultRecord(meter, obj.logicalName, co.attributeIndex, value, unit=unit, timestamp=timestamp))
+
+    @_measured
     def getProfileGenerics(self):
+        """
+        Read rows of the profile generics.
+
+        If the checkpoint is used profiles that are already read are
+        skipped and reading of the last day continues after the last row
+        that was read before the connection was lost.  If the session has
+        a budget rows are read in chunks while they fit to the budget.
+        """
         #pylint: disable=broad-except,too-many-nested-blocks
         cells = []
+        meter = None
+        done = set()
+        if self.checkpoint:
+            meter = self.getMeterKey()
+            done = self.checkpoint.getDone(meter)
         profileGenerics = self.client.objects.getObjects(ObjectType.PROFILE_GENERIC)
         for it in profileGenerics:
-            self.writeTrace("-------- Reading " + str(it.objectType) + " " + str(it.name) + " " + it.description, TraceLevel.INFO)
+            if it.logicalName in done:
+                continue
+            if self.budget and not self.budget.fits(self):
+                self.budget.skip(it.logicalName, 2, "All rows")
+                continue
+            self.writeTrace("-------- Reading %s %s %s", TraceLevel.INFO, it.objectType, it.name, it.description)
             entriesInUse = self.read(it, 7)
             entries = self.read(it, 8)
-            self.writeTrace("Entries: " + str(entriesInUse) + "/" + str(entries), TraceLevel.INFO)
+            self.writeTrace("Entries: %s/%s", TraceLevel.INFO, entriesInUse, entries)
             pg = it
             if entriesInUse == 0 or not pg.captureObjects:
+                if self.checkpoint:
+                    self.checkpoint.setDone(meter, [it.logicalName])
+                continue
+            table = None
+            if self.profileDirectory:
+                table = GXProfileTable.fromProfileGeneric(pg)
+            #  Profile is not marked read if rows are skipped.
+            skipped = len(self.budget.skipped) if self.budget else 0
+            if self.profileWatermarks:
+                #  Watermarks are updated after each request so new rows are continued from them.
+                try:
+                    self.readNewRows(pg, entriesInUse, entries, table)
+                except Exception as ex:
+                    if self.checkpoint and self.isAssociationLost(ex):
+                        raise
+                    self.writeTrace("Error! Failed to read new rows: %s", TraceLevel.ERROR, ex)
+                    if not isinstance(ex, (GXDLMSException, TimeoutException)):
+                        traceback.print_exc()
+                self.saveProfileTable(table)
+                if self.checkpoint and (not self.budget or len(self.budget.skipped) == skipped):
+                    self.checkpoint.setDone(meter, [it.logicalName])
                 continue
+            #  Capture time of the last row that is read before the connection was lost.
+            #  Exported table must contain all the rows so they are read again if the table is exported.
+            last = None
+            if self.checkpoint and table is None:
+                last = self.checkpoint.getProfile(meter, it.logicalName)
+            #  First row is not read if the session has a budget.
+            first = None
+            if last is None and not self.budget:
+                try:
+                    cells = self.readRowsByEntry(pg, 1, 1)
+                    self.showProfileRows(pg, cells)
+                    if cells:
+                        first = self.getRowTime(cells[0])
+                except Exception as ex:
+                    if self.checkpoint and self.isAssociationLost(ex):
+                        raise
+                    self.writeTrace("Error! Failed to read first row: %s", TraceLevel.ERROR, ex)
+                    if not isinstance(ex, (GXDLMSException, TimeoutException)):
+                        traceback.print_exc()
             try:
-                cells = self.readRowsByEntry(pg, 1, 1)
-                if self.trace > TraceLevel.WARNING:
-                    for rows in cells:
-                        for cell in rows:
-                            if isinstance(cell, bytearray):
-                                self.writeTrace(GXByteBuffer.hex(cell) + " | ", TraceLevel.INFO)
-                            else:
-                                self.writeTrace(str(cell) + " | ", TraceLevel.INFO)
-                        self.writeTrace("", TraceLevel.INFO)
+                end = datetime.datetime.now()
+                start = end.replace(hour=0, minute=0, second=0, microsecond=0)
+                if last is not None:
+                    start = max(start, datetime.datetime.fromtimestamp(int(last) + 1))
+                #  First row is not given again if it's captured today.
+                if first is not None:
+                    start = max(start, datetime.datetime.fromtimestamp(int(first) + 1))
+                if self.budget:
+                    self.__readRowsInBudget(it, start, end, table, meter)
+                else:
+                    count = 0
+                    for row in self.iterRowsByRange(it, start, end):
+                        self.showProfileRows(it, [row])
+                        if table is not None:
+                            table.append(row)
+                        count += 1
+                        if self.checkpoint and count % self.rowsPerRequest == 0 and self.getRowTime(row) is not None:
+                            self.checkpoint.setProfile(meter, it.logicalName, self.getRowTime(row))
             except Exception as ex:
-                self.writeTrace("Error! Failed to read first row: " + str(ex), TraceLevel.ERROR)
-                if not isinstance(ex, (GXDLMSException, TimeoutException)):
-                    traceback.print_exc()
+                if self.checkpoint and self.isAssociationLost(ex):
+                    raise
+                self.writeTrace("Error! Failed to read last day: %s", TraceLevel.ERROR, ex)
+            self.saveProfileTable(table)
+            if self.checkpoint and (not self.budget or len(self.budget.skipped) == skipped):
+                self.checkpoint.setDone(meter, [it.logicalName])
+
+    def __readRowsInBudget(self, pg, start, end, table, meter):
+        """
+        Read rows by range in chunks of at most rowsPerRequest capture periods while they fit to the budget.
+
+        Size of the row is estimated from the column count until it's
+        measured from the read rows.  Chunk is shortened to the rows that
+        fit to the remaining budget.
+        """
+        start = int(start.timestamp())
+        end = int(end.timestamp())
+        capturePeriod = self.read(pg, 4)
+        rowSize = GXReadBudget.estimateRows(1, len(pg.captureObjects))
+        while start <= end:
+            count = self.__getRowsInBudget(pg, self.rowsPerRequest, rowSize,
+                                           "Rows from " + datetime.datetime.fromtimestamp(start).isoformat())
+            if count == 0:
+                return
+            used = self.bytesTx + self.bytesRx
+            last = end
+            if capturePeriod:
+                last = min(start + capturePeriod * count - 1, end)
+            rows = self.readRowsByRange(pg, datetime.datetime.fromtimestamp(start), datetime.datetime.fromtimestamp(last))
+            self.showProfileRows(pg, rows)
+            if table is not None:
+                table.extend(rows)
+            if rows:
+                rowSize = (self.bytesTx + self.bytesRx - used) / len(rows)
+                if self.checkpoint and self.getRowTime(rows[-1]) is not None:
+                    self.checkpoint.setProfile(meter, pg.logicalName, self.getRowTime(rows[-1]))
+            start = last + 1
+
+    def __getRowsInBudget(self, pg, count, rowSize, description):
+        """
+        Returns how many of the count rows of the given size are read so they fit to the budget.
+
+        Zero is returned and the skipped rows are added to the budget if not even one row fits.
+        """
+        if self.budget is None:
+            return count
+        count = self.budget.fitRows(self, count, rowSize)
+        if count == 0:
+            self.writeTrace("Read budget is used. Skipping the remaining rows.", TraceLevel.WARNING)
+            self.budget.skip(pg.logicalName, 2, description)
+        return count
+
+    def saveProfileTable(self, table):
+        """
+        Export profile generic table to the profile directory.
+        """
+        if table is None or len(table) == 0:
+            return
+        name = self.getMeterIdentity()[0] or str(self.client.serverAddress)
+        fileName = os.path.join(self.profileDirectory, "".join(c if c.isalnum() else "_" for c in name) + "_" +
+                                table.logicalName + ".gxpt")
+        if not os.path.exists(self.profileDirectory):
+            os.makedirs(self.profileDirectory)
+        table.save(fileName)
+        self.writeTrace("Profile generic rows saved: %s", TraceLevel.INFO, fileName)
+
+    @classmethod
+    def getRowTime(cls, row):
+        """
+        Returns capture time of the row in seconds since epoch or None if the first column is not a time.
+        """
+        if row:
+            if isinstance(row[0], GXDateTime) and row[0].value:
+                return row[0].value.timestamp()
+            if isinstance(row[0], datetime.datetime):
+                return row[0].timestamp()
+        return None
+
+    @classmethod
+    def hasTimeColumn(cls, pg):
+        """
+        Returns True if the rows are sorted by the capture time and they can be read by range.
+        """
+        sort = pg.sortObject
+        if not sort and pg.captureObjects:
+            sort = pg.captureObjects[0][0]
+        return sort is not None and (sort.objectType == ObjectType.CLOCK or sort.logicalName == "0.0.1.1.0.255")
+
+    def getMeterKey(self):
+        """
+        Returns key that identifies the connected meter in the profile watermarks.
+        """
+        identity = self.getMeterIdentity()
+        key = "%d;%s" % (self.client.serverAddress, identity[0])
+        if not identity[0] and isinstance(self.media, GXNet):
+            key += ";%s:%d" % (self.media.hostName, self.media.port)
+        return key
+
+    def readNewRows(self, pg, entriesInUse, profileEntries, table=None):
+        """
+        Read profile generic rows captured after the last collected row.
+
+        Rows are read by entry while the buffer is filling.  When the buffer
+        is full old rows are overwritten and entry indexes move, so rows are
+        read by capture time.  At most maxRowsPerPoll rows are read in one
+        poll.  Remaining rows are read on the next poll.  Read rows are added
+        to the table if it is given.
+        """
+        key = GXProfileWatermarks.getKey(self.getMeterKey(), pg.logicalName)
+        watermark = self.profileWatermarks.get(key)
+        full = profileEntries != 0 and entriesInUse >= profileEntries
+        if watermark and watermark[1] and full and self.hasTimeColumn(pg):
+            self.__readNewRowsByRange(pg, key, watermark[1], entriesInUse, profileEntries, table)
+            return
+        index = 1
+        if watermark:
+            if watermark[0] > entriesInUse:
+                self.writeTrace("Profile generic buffer is reset. Reading all rows.", TraceLevel.WARNING)
+            else:
+                index = watermark[0] + 1
+                if full:
+                    self.writeTrace("Profile generic buffer is full and rows are not sorted by time. Rows might be missed.",
+                                    TraceLevel.WARNING)
+        count = 0
+        rowSize = GXReadBudget.estimateRows(1, len(pg.captureObjects))
+        while index <= entriesInUse and count < self.maxRowsPerPoll:
+            rows = self.__getRowsInBudget(pg, min(self.rowsPerRequest, entriesInUse - index + 1, self.maxRowsPerPoll - count),
+                                          rowSize, "Rows from entry " + str(index))
+            if rows == 0:
+                break
+            used = self.bytesTx + self.bytesRx
+            rows = self.readRowsByEntry(pg, index, rows)
+            if not rows:
+                break
+            rowSize = (self.bytesTx + self.bytesRx - used) / len(rows)
+            self.showProfileRows(pg, rows)
+            if table is not None:
+                table.extend(rows)
+            index += len(rows)
+            count += len(rows)
+            self.profileWatermarks.set(key, index - 1, self.getRowTime(rows[-1]))
+        self.writeTrace("New rows: %d", TraceLevel.INFO, count)
+
+    def __readNewRowsByRange(self, pg, key, last, entriesInUse, profileEntries, table):
+        #  Capture time of the newest row is used instead of the local time
+        #  so the clock of the meter can differ from the local clock.
+        newest = self.getRowTime(self.readRowsByEntry(pg, entriesInUse, 1)[0])
+        start = int(last) + 1
+        capturePeriod = self.read(pg, 4)
+        if capturePeriod:
+            #  Older rows are already overwritten.
+            start = max(start, int(newest) - capturePeriod * (profileEntries - 1))
+        count = 0
+        rowSize = GXReadBudget.estimateRows(1, len(pg.captureObjects))
+        while start <= newest and count < self.maxRowsPerPoll:
+            rows = self.__getRowsInBudget(pg, self.rowsPerRequest, rowSize,
+                                          "Rows from " + datetime.datetime.fromtimestamp(start).isoformat())
+            if rows == 0:
+                break
+            used = self.bytesTx + self.bytesRx
+            end = int(newest)
+            if capturePeriod:
+                end = min(start + capturePeriod * rows - 1, end)
+            rows = self.readRowsByRange(pg, datetime.datetime.fromtimestamp(start), datetime.datetime.fromtimestamp(end))
+            if rows:
+                rowSize = (self.bytesTx + self.bytesRx - used) / len(rows)
+                self.showProfileRows(pg, rows)
+                if table is not None:
+                    table.extend(rows)
+                count += len(rows)
+                last = self.getRowTime(rows[-1])
+                if last is None:
+                    last = end
+                self.profileWatermarks.set(key, entriesInUse, last)
+            start = end + 1
+        self.writeTrace("New rows: %d", TraceLevel.INFO, count)
+
+    def getMeterIdentity(self):
+        #pylint: disable=broad-except
+        """
+        Returns logical device name and firmware version of the meter.
+        """
+        if self.identity is not None:
+            return self.identity
+        identity = []
+        for ln in ("0.0.42.0.0.255", "1.0.0.2.0.255"):
             try:
-                start = datetime.datetime.now()
-                end = start
-                start.replace(hour=0, minute=0, second=0, microsecond=0)
-                end.replace(minute=0, second=0, microsecond=0)
-                cells = self.readRowsByRange(it, start, end)
-                for rows in cells:
-                    for cell in rows:
-                        if isinstance(cell, bytearray):
-                            print(GXByteBuffer.hexToBytes(cell) + " | ")
-                        else:
-                            self.writeTrace(str(cell) + " | ", TraceLevel.INFO)
-                    self.writeTrace("", TraceLevel.INFO)
-            except Exception as ex:
-                self.writeTrace("Error! Failed to read last day: " + str(ex), TraceLevel.ERROR)
+                value = self.read(GXDLMSData(ln), 2)
+                if isinstance(value, (bytes, bytearray)):
+                    value = value.decode("ascii", "replace")
+                identity.append(str(value))
+            except GXDLMSException:
+                identity.append("")
+        self.identity = identity
+        return identity
 
+    @_measured
     def getAssociationView(self):
+        key = None
+        if self.associationCache:
+            identity = self.getMeterIdentity()
+            key = GXAssociationCache.getKey(self.client.serverAddress, self.client.clientAddress, identity[0], identity[1])
+            self.cacheKey = key
+            if self.invalidateCache:
+                self.associationCache.invalidate(key)
+            elif self.associationCache.load(key, self.client):
+                self.writeTrace("Association view loaded from the cache: %s", TraceLevel.INFO, " ".join(identity))
+                self.__learnClasses()
+                return
         reply = GXReplyData()
-        self.readDataBlock(self.client.getObjectsRequest(), reply)
-        self.client.parseObjects(reply.data, True)
+        self.__readSlow(self.readDataBlock, self.client.getObjectsRequest(), reply)
+        if self.metrics is None:
+            self.client.parseObjects(reply.data, True)
+        else:
+            start = time.perf_counter()
+            self.client.parseObjects(reply.data, True)
+            self.decodeTime += time.perf_counter() - start
+        if key:
+            self.associationCache.save(key, self.client.objects, " ".join(identity))
+        self.__learnClasses()
+
+    def __learnClasses(self):
+        if self.obisIndex:
+            self.obisIndex.learn(self.client.objects)
+            self.obisIndex.save()
+
+    def getObject(self, logicalName, objectType=ObjectType.NONE):
+        """
+        Returns the object from the association view or a new object if the interface class is known.
+
+        Class is taken from the OBIS index if it's not given.  None is
+        returned if the association view must be read first.
+        """
+        ret = self.client.objects.findByLN(objectType, logicalName)
+        if ret is not None or not self.client.useLogicalNameReferencing:
+            #  Short names are known only from the association view.
+            return ret
+        if objectType == ObjectType.NONE and self.obisIndex:
+            objectType = self.obisIndex.get(logicalName)
+        if objectType == ObjectType.NONE:
+            return None
+        ret = GXDLMSClient.createObject(objectType)
+        ret.logicalName = logicalName
+        return ret
+
+    @_measured
+    def readObjects(self, list_):
+        """
+        Read (logicalName, attributeIndex, objectType) attributes.
+
+        Objects of known interface class are read right after the
+        association is opened.  Association view is read only if the class
+        of some object is not known or the meter does not have the object
+        with the expected class.
+        Returns list of (logicalName, attributeIndex, value) tuples.  Value is the exception if read failed.
+        """
+        if not self.isAssociated():
+            self.initializeConnection()
+        ret = [None] * len(list_)
+        pending = list(range(len(list_)))
+        while pending:
+            items = []
+            unknown = []
+            for pos in pending:
+                obj = self.getObject(list_[pos][0], list_[pos][2])
+                if obj is None:
+                    unknown.append(pos)
+                else:
+                    items.append((pos, obj))
+            values = self.readBatches([(obj, list_[pos][1]) for pos, obj in items])
+            for (pos, _), (obj, index, value) in zip(items, values):
+                ret[pos] = (list_[pos][0], index, value)
+                if isinstance(value, GXDLMSException) and obj not in self.client.objects:
+                    #  Class may be different in this meter.
+                    unknown.append(pos)
+            if not unknown or self.client.objects:
+                pending = []
+                for pos in unknown:
+                    if ret[pos] is None:
+                        ret[pos] = (list_[pos][0], list_[pos][1], ValueError("Unknown object: " + list_[pos][0]))
+            else:
+                self.getAssociationView()
+                pending = sorted(unknown)
+        return ret
+
+    def open(self):
+        """
+        Open the connection and read the association view if they are not open already.
+        """
+        if not self.isAssociated():
+            self.initializeConnection()
+        if not self.client.objects:
+            try:
+                self.getAssociationView()
+                self.readScalerAndUnits()
+                self.getProfileGenericColumns()
+            except Exception:
+                #  Everything is read again when the connection is opened next time.
+                self.client.objects.clear()
+                raise
+
+    @_profiled
+    @_measured
+    def readScheduled(self, items):
+        """
+        Read poll items that are due in one session.
+
+        Items are read in priority order.  Attributes with the same priority
+        are read with get-request-with-list batches.  For profile generic
+        buffer new rows are read if watermarks are used.  Otherwise rows
+        captured during the last interval are read.
+        Returns list of (item, value) tuples.  Value is the exception if read failed.
+        """
+        #pylint: disable=broad-except
+        ret = list()
+        try:
+            self.open()
+            pos = 0
+            while pos < len(items):
+                end = pos
+                while end < len(items) and items[end].priority == items[pos].priority:
+                    end += 1
+                self.__readScheduledGroup(items[pos:end], ret)
+                pos = end
+        except (KeyboardInterrupt, SystemExit):
+            self.media = None
+            raise
+        except Exception:
+            self.close()
+            raise
+        finally:
+            if not self.persistent:
+                self.close()
+        return ret
 
+    def __readScheduledGroup(self, items, results):
+        #pylint: disable=broad-except
+        list_ = list()
+        attributes = list()
+        profiles = list()
+        for it in items:
+            obj = self.client.objects.findByLN(ObjectType.NONE, it.logicalName)
+            if obj is None:
+                results.append((it, ValueError("Unknown object: " + it.logicalName)))
+            elif isinstance(obj, GXDLMSProfileGeneric) and it.attributeIndex == 2:
+                profiles.append((it, obj))
+            else:
+                list_.append((obj, it.attributeIndex))
+                attributes.append(it)
+        #  Batches return the values in the same order as they are asked.
+        for it, (obj, index, value) in zip(attributes, self.readBatches(list_)):
+            self.writeTrace("-------- Reading %s", TraceLevel.INFO, it.logicalName)
+            self.showResult(it.logicalName, index, value, obj)
+            results.append((it, value))
+        for it, pg in profiles:
+            self.writeTrace("-------- Reading %s", TraceLevel.INFO, it.logicalName)
+            try:
+                rows = self.__readScheduledRows(pg, it.interval)
+            except TimeoutException:
+                raise
+            except Exception as ex:
+                self.writeTrace("Error! Failed to read rows: %s", TraceLevel.ERROR, ex)
+                rows = ex
+            results.append((it, rows))
+
+    def __readScheduledRows(self, pg, interval):
+        rows = list()
+        if self.profileWatermarks:
+            entriesInUse = self.read(pg, 7)
+            entries = self.read(pg, 8)
+            if entriesInUse:
+                self.readNewRows(pg, entriesInUse, entries, rows)
+        else:
+            end = datetime.datetime.now()
+            rows = self.readRowsByRange(pg, end - datetime.timedelta(seconds=interval), end)
+            self.showProfileRows(pg, rows)
+        if self.profileDirectory and rows:
+            table = GXProfileTable.fromProfileGeneric(pg)
+            table.extend(rows)
+            self.saveProfileTable(table)
+        return rows
+
+    @_profiled
+    @_measured
     def readAll(self):
+        """
+        Read all the objects.  Connection is left open if the session is persistent.
+
+        If the checkpoint is used and the connection is lost, connection is
+        opened again and reading continues from the checkpoint at most
+        resumeAttempts times.  Checkpoint is kept if reading fails so the
+        next poll continues from it.
+
+        If the budget is set registers are read before the other objects
+        and the profile generics.  Time budget includes the connection
+        setup, but the bytes of the association and the object list are not
+        counted.  Reads that do not fit to the budget are skipped and listed in the
+        budget.  Checkpoint is kept if reads are skipped so the next poll
+        reads the skipped objects first.  Without the checkpoint skipped
+        reads are only reported and the next poll reads everything again.
+        """
+        attempts = 0
+        started = time.time()
         try:
-            self.initializeConnection()
-            self.getAssociationView()
-            self.readScalerAndUnits()
-            self.getProfileGenericColumns()
-            self.getReadOut()
-            self.getProfileGenerics()
+            while True:
+                try:
+                    self.open()
+                    if self.budget and attempts == 0:
+                        self.budget.start(self, started)
+                    self.getReadOut()
+                    self.getProfileGenerics()
+                    break
+                except Exception as ex:
+                    if not self.checkpoint or attempts >= self.resumeAttempts or not self.isAssociationLost(ex):
+                        raise
+                    attempts += 1
+                    self.writeTrace("Connection lost. Resuming from the checkpoint. %s", TraceLevel.WARNING, ex)
+                    self.__dropConnection()
+            if self.budget:
+                self.budget.stop(self)
+                self.writeTrace(self.budget.getReport(self), TraceLevel.WARNING if self.budget.skipped else TraceLevel.INFO)
+            if self.checkpoint and not (self.budget and self.budget.skipped):
+                self.checkpoint.remove(self.getMeterKey())
         except (KeyboardInterrupt, SystemExit):
             #Don't send anything if user is closing the app.
             self.media = None
             raise
+        except Exception:
+            self.close()
+            raise
         finally:
-            self.close()
\ No newline at end of file
+            if self.budget:
+                self.budget.stop(self)
+            if not self.persistent:
+                self.close()
\ No newline at end of file
@@ -0,0 +1,885 @@
+import datetime
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from gurux_dlms import GXByteBuffer, GXDateTime, GXDLMSClient, GXDLMSNotify
+from gurux_dlms.enums import InterfaceType, ObjectType, DataType, Conformance, ErrorCode
+from gurux_dlms.internal._GXCommon import _GXCommon
+from gurux_dlms.internal._GXDataInfo import _GXDataInfo
+from gurux_dlms._GXFCS16 import _GXFCS16
+from gurux_dlms.objects import GXDLMSData, GXDLMSRegister, GXDLMSPushSetup
+from gurux_dlms.objects.GXDLMSCaptureObject import GXDLMSCaptureObject
+from gurux_serial import GXSerial
+
+
+class GXSimulatedMeter:
+    """
+    Object model of the simulated meter.
+
+    Attribute values are generated on the fly so profile generic buffers
+    keep growing and wrapping with the wall clock like on a real meter.
+    """
+    def __init__(self, objectCount=20, profileEntries=96 * 31, profileChannels=4, capturePeriod=900, serialNumber=1):
+        # Only the encoder settings are needed from the client.
+        self.settings = GXDLMSClient(True).settings
+        # Seconds added to the wall clock.  Used to simulate elapsed time.
+        self.timeShift = 0
+        self.capturePeriod = capturePeriod
+        self.profileEntries = profileEntries
+        # Entries captured since the profile was reset.
+        self.profileStart = self.__floor(time.time() - capturePeriod * profileEntries)
+        self.logicalDeviceName = "GRX%08d" % serialNumber
+        self.firmwareVersion = "1.0.0"
+        self.registers = ["1.0.%d.8.0.255" % (pos + 1) for pos in range(objectCount)]
+        self.profileChannels = self.registers[0:min(profileChannels, len(self.registers))]
+        self.profile = "1.0.99.1.0.255"
+        self.objects = [(ObjectType.ASSOCIATION_LOGICAL_NAME, 2, "0.0.40.0.0.255"),
+                        (ObjectType.DATA, 0, "0.0.42.0.0.255"),
+                        (ObjectType.DATA, 0, "1.0.0.2.0.255"),
+                        (ObjectType.CLOCK, 0, "0.0.1.0.0.255")]
+        for it in self.registers:
+            self.objects.append((ObjectType.REGISTER, 0, it))
+        self.objects.append((ObjectType.PROFILE_GENERIC, 1, self.profile))
+
+    def now(self):
+        return time.time() + self.timeShift
+
+    def __floor(self, value):
+        return int(value) - int(value) % self.capturePeriod
+
+    def getEntries(self):
+        """Returns the capture times of the rows currently in the buffer."""
+        last = self.__floor(self.now())
+        count = min(self.profileEntries, int((last - self.profileStart) / self.capturePeriod) + 1)
+        return [last - self.capturePeriod * (count - 1 - pos) for pos in range(count)]
+
+    def registerValue(self, ln, timestamp=None):
+        if timestamp is None:
+            timestamp = self.now()
+        return (int(timestamp) // 60) * (1 + self.registers.index(ln))
+
+    def getValue(self, ot, ln, index, selector=0, parameters=None):
+        """
+        Returns encoded attribute value or DLMS error code as int.
+        """
+        bb = GXByteBuffer()
+        key = (ot, ln)
+        if key not in [(k[0], k[2]) for k in self.objects]:
+            return ErrorCode.UNDEFINED_OBJECT
+        if index == 1:
+            _GXCommon.setData(self.settings, bb, DataType.OCTET_STRING, _GXCommon.logicalNameToBytes(ln))
+        elif ot == ObjectType.ASSOCIATION_LOGICAL_NAME and index == 2:
+            bb.setUInt8(DataType.ARRAY)
+            _GXCommon.setObjectCount(len(self.objects), bb)
+            for t, version, name in self.objects:
+                bb.setUInt8(DataType.STRUCTURE)
+                bb.setUInt8(4)
+                _GXCommon.setData(self.settings, bb, DataType.UINT16, t)
+                _GXCommon.setData(self.settings, bb, DataType.UINT8, version)
+                _GXCommon.setData(self.settings, bb, DataType.OCTET_STRING, _GXCommon.logicalNameToBytes(name))
+                bb.setUInt8(DataType.STRUCTURE)
+                bb.setUInt8(2)
+                bb.setUInt8(DataType.ARRAY)
+                bb.setUInt8(0)
+                bb.setUInt8(DataType.ARRAY)
+                bb.setUInt8(0)
+        elif ot == ObjectType.DATA and index == 2:
+            if ln == "0.0.42.0.0.255":
+                _GXCommon.setData(self.settings, bb, DataType.OCTET_STRING, self.logicalDeviceName.encode())
+            else:
+                _GXCommon.setData(self.settings, bb, DataType.STRING, self.firmwareVersion)
+        elif ot == ObjectType.CLOCK and index == 2:
+            _GXCommon.setData(self.settings, bb, DataType.OCTET_STRING, GXDateTime(datetime.datetime.fromtimestamp(int(self.now()))))
+        elif ot == ObjectType.CLOCK and index == 3:
+            _GXCommon.setData(self.settings, bb, DataType.INT16, 0)
+        elif ot == ObjectType.CLOCK and index == 4:
+            _GXCommon.setData(self.settings, bb, DataType.UINT8, 0)
+        elif ot == ObjectType.CLOCK and index in (5, 6):
+            _GXCommon.setData(self.settings, bb, DataType.OCTET_STRING, GXDateTime(datetime.datetime(2000, 1, 1)))
+        elif ot == ObjectType.CLOCK and index == 7:
+            _GXCommon.setData(self.settings, bb, DataType.INT8, 0)
+        elif ot == ObjectType.CLOCK and index == 8:
+            _GXCommon.setData(self.settings, bb, DataType.BOOLEAN, False)
+        elif ot == ObjectType.CLOCK and index == 9:
+            _GXCommon.setData(self.settings, bb, DataType.ENUM, 1)
+        elif ot == ObjectType.REGISTER and index == 2:
+            _GXCommon.setData(self.settings, bb, DataType.UINT32, self.registerValue(ln))
+        elif ot == ObjectType.REGISTER and index == 3:
+            bb.setUInt8(DataType.STRUCTURE)
+            bb.setUInt8(2)
+            _GXCommon.setData(self.settings, bb, DataType.INT8, -1)
+            _GXCommon.setData(self.settings, bb, DataType.ENUM, 30)
+        elif ot == ObjectType.PROFILE_GENERIC and index == 2:
+            return self.__getBuffer(bb, selector, parameters)
+        elif ot == ObjectType.PROFILE_GENERIC and index == 3:
+            bb.setUInt8(DataType.ARRAY)
+            _GXCommon.setObjectCount(1 + len(self.profileChannels), bb)
+            self.__setCaptureObject(bb, ObjectType.CLOCK, "0.0.1.0.0.255")
+            for it in self.profileChannels:
+                self.__setCaptureObject(bb, ObjectType.REGISTER, it)
+        elif ot == ObjectType.PROFILE_GENERIC and index == 4:
+            _GXCommon.setData(self.settings, bb, DataType.UINT32, self.capturePeriod)
+        elif ot == ObjectType.PROFILE_GENERIC and index == 5:
+            _GXCommon.setData(self.settings, bb, DataType.ENUM, 1)
+        elif ot == ObjectType.PROFILE_GENERIC and index == 6:
+            self.__setCaptureObject(bb, ObjectType.CLOCK, "0.0.1.0.0.255")
+        elif ot == ObjectType.PROFILE_GENERIC and index == 7:
+            _GXCommon.setData(self.settings, bb, DataType.UINT32, len(self.getEntries()))
+        elif ot == ObjectType.PROFILE_GENERIC and index == 8:
+            _GXCommon.setData(self.settings, bb, DataType.UINT32, self.profileEntries)
+        else:
+            return ErrorCode.READ_WRITE_DENIED
+        return bb
+
+    def __setCaptureObject(self, bb, ot, ln):
+        bb.setUInt8(DataType.STRUCTURE)
+        bb.setUInt8(4)
+        _GXCommon.setData(self.settings, bb, DataType.UINT16, ot)
+        _GXCommon.setData(self.settings, bb, DataType.OCTET_STRING, _GXCommon.logicalNameToBytes(ln))
+        _GXCommon.setData(self.settings, bb, DataType.INT8, 2)
+        _GXCommon.setData(self.settings, bb, DataType.UINT16, 0)
+
+    @classmethod
+    def __toTime(cls, value):
+        value = bytearray(value)
+        if len(value) < 12:
+            raise ValueError("Invalid date time.")
+        year = value[0] << 8 | value[1]
+        return time.mktime((year, value[2], value[3], value[5] if value[5] != 0xFF else 0,
+                            value[6] if value[6] != 0xFF else 0, value[7] if value[7] != 0xFF else 0, 0, 0, -1))
+
+    def __getBuffer(self, bb, selector, parameters):
+        entries = self.getEntries()
+        columns = ["0.0.1.0.0.255"] + self.profileChannels
+        selected = list(range(len(columns)))
+        if selector == 1:
+            start = self.__toTime(parameters[1])
+            end = self.__toTime(parameters[2])
+            entries = [it for it in entries if start <= it <= end]
+            if parameters[3]:
+                selected = [columns.index(_GXCommon.toLogicalName(it[1])) for it in parameters[3]]
+        elif selector == 2:
+            first = max(1, parameters[0])
+            last = parameters[1] if parameters[1] else len(entries)
+            entries = entries[first - 1:last]
+            colStart = max(1, parameters[2])
+            colEnd = parameters[3] if parameters[3] else len(columns)
+            selected = selected[colStart - 1:colEnd]
+        elif selector != 0:
+            return ErrorCode.READ_WRITE_DENIED
+        bb.setUInt8(DataType.ARRAY)
+        _GXCommon.setObjectCount(len(entries), bb)
+        for it in entries:
+            bb.setUInt8(DataType.STRUCTURE)
+            _GXCommon.setObjectCount(len(selected), bb)
+            for pos in selected:
+                if pos == 0:
+                    _GXCommon.setData(self.settings, bb, DataType.OCTET_STRING, GXDateTime(datetime.datetime.fromtimestamp(it)))
+                else:
+                    _GXCommon.setData(self.settings, bb, DataType.UINT32, self.registerValue(columns[pos], it))
+        return bb
+
+
+class GXSimulatorStatistics:
+    """
+    Traffic counters of the simulator.
+    """
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+        self.bytesRx = 0
+        self.bytesTx = 0
+        self.dropped = 0
+        #  HDLC frames rejected because of invalid send or receive sequence number.
+        self.sequenceErrors = 0
+
+    def clear(self):
+        self.__init__()
+
+    def __str__(self):
+        return "Connections: %d Requests: %d RX: %d TX: %d Dropped: %d Sequence errors: %d" % (
+            self.connections, self.requests, self.bytesRx, self.bytesTx, self.dropped, self.sequenceErrors)
+
+
+class _GXMeterSession:
+    """
+    Application layer state of one association.
+    """
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.meter = simulator.meter
+        self.maxPduSize = simulator.maxPduSize
+        self.conformance = 0
+        # Pending get-response-with-datablock data.
+        self.blockData = None
+        self.blockNumber = 0
+        self.invokeId = 0
+        # Pending General Block Transfer blocks.
+        self.gbtBlocks = None
+        # Last GBT block number of the client.
+        self.clientBlock = 0
+        # Blocks sent without waiting acknowledgement.
+        self.gbtWindowSize = 1
+        # Maximum window size of the meter.
+        self.maxWindowSize = simulator.gbtWindowSize
+
+    def handleApdu(self, data):
+        cmd = data[0]
+        if cmd == 0x60:
+            return self.__handleAarq(data)
+        if cmd == 0x62:
+            return bytearray([0x63, 0x03, 0x80, 0x01, 0x00])
+        if cmd == 0xC0:
+            return self.__handleGet(GXByteBuffer(data))
+        if cmd == 0xE0:
+            return self.__handleGbt(GXByteBuffer(data))
+        # Service not supported.
+        return bytearray([0x0E, 0x06, 0x00])
+
+    @classmethod
+    def __reverseBits(cls, value):
+        #  Conformance bit string is sent with the first bit as the most significant bit.
+        ret = 0
+        for pos in range(24):
+            if value & (1 << pos):
+                ret |= 1 << (23 - pos)
+        return ret
+
+    def __handleAarq(self, data):
+        pos = bytes(data).find(b"\x5F\x1F\x04\x00")
+        proposed = 0
+        if pos != -1:
+            proposed = self.__reverseBits(data[pos + 4] << 16 | data[pos + 5] << 8 | data[pos + 6])
+            self.maxPduSize = min(self.simulator.maxPduSize, data[pos + 7] << 8 | data[pos + 8])
+        self.conformance = proposed & self.simulator.conformance
+        bb = GXByteBuffer()
+        bb.set(bytearray([0xA1, 0x09, 0x06, 0x07, 0x60, 0x85, 0x74, 0x05, 0x08, 0x01, 0x01]))
+        bb.set(bytearray([0xA2, 0x03, 0x02, 0x01, 0x00]))
+        bb.set(bytearray([0xA3, 0x05, 0xA1, 0x03, 0x02, 0x01, 0x00]))
+        bb.set(bytearray([0xBE, 0x10, 0x04, 0x0E, 0x08, 0x00, 0x06, 0x5F, 0x1F, 0x04, 0x00]))
+        value = self.__reverseBits(self.conformance)
+        bb.setUInt8((value >> 16) & 0xFF)
+        bb.setUInt8((value >> 8) & 0xFF)
+        bb.setUInt8(value & 0xFF)
+        bb.setUInt16(self.simulator.maxPduSize)
+        bb.setUInt16(0x0007)
+        ret = bytearray([0x61, len(bb)])
+        ret.extend(bb.array())
+        return ret
+
+    def __readAttribute(self, data):
+        ot = data.getUInt16()
+        ln = _GXCommon.toLogicalName(data.subArray(data.position, 6))
+        data.position = data.position + 6
+        index = data.getInt8()
+        selector = 0
+        parameters = None
+        if data.getUInt8() != 0:
+            selector = data.getUInt8()
+            info = _GXDataInfo()
+            parameters = _GXCommon.getData(self.meter.settings, data, info)
+        return self.meter.getValue(ot, ln, index, selector, parameters)
+
+    def __handleGet(self, data):
+        data.getUInt8()
+        type_ = data.getUInt8()
+        self.invokeId = data.getUInt8()
+        if type_ == 1:
+            value = self.__readAttribute(data)
+            if isinstance(value, int):
+                return bytearray([0xC4, 0x01, self.invokeId, 0x01, value])
+            return self.__reply(bytearray([0xC4, 0x01, self.invokeId, 0x00]), value.array())
+        if type_ == 2:
+            if self.blockData is None or data.getUInt32() != self.blockNumber:
+                return bytearray([0xC4, 0x01, self.invokeId, 0x01, ErrorCode.NO_LONG_GET_OR_READ_IN_PROGRESS])
+            return self.__nextBlock()
+        if type_ == 3:
+            count = _GXCommon.getObjectCount(data)
+            bb = GXByteBuffer()
+            _GXCommon.setObjectCount(count, bb)
+            for _ in range(count):
+                value = self.__readAttribute(data)
+                if isinstance(value, int):
+                    bb.setUInt8(1)
+                    bb.setUInt8(value)
+                else:
+                    bb.setUInt8(0)
+                    bb.set(value)
+            return self.__reply(bytearray([0xC4, 0x03, self.invokeId]), bb.array())
+        return bytearray([0xC4, 0x01, self.invokeId, 0x01, ErrorCode.HARDWARE_FAULT])
+
+    def __reply(self, header, value):
+        if len(header) + len(value) <= self.maxPduSize:
+            return header + value
+        if self.conformance & Conformance.GENERAL_BLOCK_TRANSFER:
+            # Header: tag, block control, block number (2), block number ack (2) and length (3).
+            size = self.maxPduSize - 9
+            apdu = header + value
+            self.gbtBlocks = [apdu[pos:pos + size] for pos in range(0, len(apdu), size)]
+            return self.__nextWindow(0)
+        self.blockData = value
+        self.blockNumber = 0
+        return self.__nextBlock()
+
+    def __handleGbt(self, data):
+        data.getUInt8()
+        bc = data.getUInt8()
+        self.clientBlock = data.getUInt16()
+        ack = data.getUInt16()
+        if bc & 0x3F:
+            self.gbtWindowSize = min(bc & 0x3F, self.maxWindowSize)
+        if self.gbtBlocks is None:
+            return bytearray([0xC4, 0x01, self.invokeId, 0x01, ErrorCode.NO_LONG_GET_OR_READ_IN_PROGRESS])
+        return self.__nextWindow(ack)
+
+    def __nextWindow(self, ack):
+        """
+        Returns GBT blocks that follow the acknowledged block.
+        """
+        ret = []
+        last = min(len(self.gbtBlocks), ack + self.gbtWindowSize)
+        for bn in range(ack + 1, last + 1):
+            bc = self.gbtWindowSize
+            if bn == len(self.gbtBlocks):
+                bc |= 0x80
+            elif bn != last:
+                bc |= 0x40
+            bb = GXByteBuffer()
+            bb.setUInt8(0xE0)
+            bb.setUInt8(bc)
+            bb.setUInt16(bn)
+            bb.setUInt16(self.clientBlock)
+            _GXCommon.setObjectCount(len(self.gbtBlocks[bn - 1]), bb)
+            bb.set(self.gbtBlocks[bn - 1])
+            ret.append(bb.array())
+        return ret
+
+    def __nextBlock(self):
+        # Header: tag, type, invoke ID, last block, block number (4), choice and length (3).
+        size = self.maxPduSize - 12
+        self.blockNumber += 1
+        chunk = self.blockData[0:size]
+        self.blockData = self.blockData[size:]
+        last = 0 if self.blockData else 1
+        bb = GXByteBuffer()
+        bb.set(bytearray([0xC4, 0x02, self.invokeId, last]))
+        bb.setUInt32(self.blockNumber)
+        bb.setUInt8(0)
+        _GXCommon.setObjectCount(len(chunk), bb)
+        bb.set(chunk)
+        if last:
+            self.blockData = None
+        return bb.array()
+
+
+class _GXHdlcLink:
+    """
+    HDLC framing for one simulated server address.
+    """
+    def __init__(self, simulator, serverAddress):
+        self.simulator = simulator
+        self.serverAddress = serverAddress
+        self.session = None
+        self.maxInfoTX = simulator.maxInfo
+        self.maxInfoRX = simulator.maxInfo
+        self.receiverSequence = 0
+        self.senderSequence = 0
+        self.received = bytearray()
+        self.pending = []
+
+    @classmethod
+    def getFrames(cls, buff):
+        """
+        Splits received bytes to complete frames.  Incomplete tail is returned as a last item.
+        """
+        frames = []
+        while True:
+            start = buff.find(0x7E)
+            if start == -1 or len(buff) < start + 3:
+                return frames, buff
+            length = ((buff[start + 1] & 0x7) << 8) | buff[start + 2]
+            if len(buff) < start + length + 2:
+                return frames, buff
+            frames.append(bytearray(buff[start + 1:start + length + 1]))
+            buff = buff[start + length + 2:]
+
+    @classmethod
+    def getTargetAddress(cls, frame):
+        pos = 2
+        value = 0
+        while True:
+            value = (value << 7) | (frame[pos] >> 1)
+            if frame[pos] & 1:
+                return value, pos + 1
+            pos += 1
+
+    @classmethod
+    def __frame(cls, control, client, server, info=None, segmented=False):
+        body = bytearray([client]) + server + bytearray([control])
+        length = 2 + len(body) + 2
+        if info:
+            length += 2 + len(info)
+        ret = bytearray([0xA0 | (0x08 if segmented else 0) | ((length >> 8) & 0x7), length & 0xFF]) + body
+        if info:
+            crc = _GXFCS16.countFCS16(ret, 0, len(ret))
+            ret.extend([crc >> 8, crc & 0xFF])
+            ret.extend(info)
+        crc = _GXFCS16.countFCS16(ret, 0, len(ret))
+        ret.extend([crc >> 8, crc & 0xFF])
+        return bytearray([0x7E]) + ret + bytearray([0x7E])
+
+    def handleFrame(self, frame):
+        """
+        Handles one frame and returns the reply frame or None.
+        """
+        _, pos = self.getTargetAddress(frame)
+        server = frame[2:pos]
+        client = frame[pos]
+        control = frame[pos + 1]
+        info = frame[pos + 4:-2] if len(frame) > pos + 4 else bytes()
+        if control & 0xEF == 0x83:
+            # SNRM.
+            if info:
+                values = GXByteBuffer(bytearray(info))
+                values.position = 3
+                while values.position < len(values):
+                    id_ = values.getUInt8()
+                    size = values.getUInt8()
+                    value = values.getUInt8() if size == 1 else values.getUInt16() if size == 2 else values.getUInt32()
+                    if id_ == 6:
+                        self.maxInfoTX = min(self.simulator.maxInfo, value)
+                    elif id_ == 5:
+                        self.maxInfoRX = min(self.simulator.maxInfo, value)
+            self.receiverSequence = 0
+            self.senderSequence = 0
+            self.pending = []
+            self.received = bytearray()
+            self.session = _GXMeterSession(self.simulator)
+            self.session.maxWindowSize = 1
+            ua = GXByteBuffer()
+            ua.set(bytearray([0x81, 0x80, 0x14]))
+            for id_, value in ((5, self.maxInfoTX), (6, self.maxInfoRX), (7, 1), (8, 1)):
+                ua.setUInt8(id_)
+                ua.setUInt8(4 if id_ > 6 else 2)
+                if id_ > 6:
+                    ua.setUInt32(value)
+                else:
+                    ua.setUInt16(value)
+            return self.__frame(0x73, client, server, ua.array())
+        if control & 0xEF == 0x43:
+            # DISC.
+            connected = self.session is not None
+            self.session = None
+            return self.__frame(0x73 if connected else 0x1F, client, server)
+        if self.session is None:
+            return self.__frame(0x1F, client, server)
+        if control & 0x1 == 0:
+            # I-frame.  Frame is rejected like the meter does if N(S) is not the next frame or N(R) does not
+            # acknowledge all the sent frames.
+            if (control >> 1) & 0x7 != self.receiverSequence or (control >> 5) & 0x7 != self.senderSequence:
+                return self.__reject(client, server)
+            self.receiverSequence = (self.receiverSequence + 1) & 0x7
+            segmented = (frame[0] & 0x08) != 0
+            self.received.extend(info)
+            if segmented:
+                return self.__frame(0x11 | (self.receiverSequence << 5), client, server)
+            apdu = self.received[3:]
+            self.received = bytearray()
+            reply = self.session.handleApdu(apdu)
+            if isinstance(reply, list):
+                # GBT window is one block in HDLC.
+                reply = reply[0]
+            reply = bytearray([0xE6, 0xE7, 0x00]) + reply
+            self.pending = [reply[pos:pos + self.maxInfoTX] for pos in range(0, len(reply), self.maxInfoTX)]
+            return self.__nextSegment(client, server)
+        if control & 0xF == 0x1:
+            # Receiver ready.  Send next segment or acknowledge keep alive.
+            if (control >> 5) & 0x7 != self.senderSequence:
+                return self.__reject(client, server)
+            if self.pending:
+                return self.__nextSegment(client, server)
+            return self.__frame(0x11 | (self.receiverSequence << 5), client, server)
+        return None
+
+    def __reject(self, client, server):
+        """
+        Returns frame reject for the frame with invalid sequence number.
+        """
+        self.simulator.addSequenceError()
+        return self.__frame(0x97, client, server)
+
+    def __nextSegment(self, client, server):
+        info = self.pending.pop(0)
+        control = 0x10 | (self.receiverSequence << 5) | (self.senderSequence << 1)
+        self.senderSequence = (self.senderSequence + 1) & 0x7
+        return self.__frame(control, client, server, info, len(self.pending) != 0)
+
+
+class _GXPtyConnection:
+    """
+    Master side of the pseudo terminal used like a socket.
+    """
+    def __init__(self, fd):
+        self.fd = fd
+
+    def recv(self, count):
+        try:
+            return os.read(self.fd, count)
+        except OSError:
+            #  Slave side is closed.
+            return b""
+
+    def sendall(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.fd, view):]
+
+    def shutdown(self, how):
+        self.close()
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class GXPtySerial(GXSerial):
+    """
+    Serial port for the pseudo terminal of the simulator.
+
+    Pseudo terminal does not have modem control lines so RTS and DTR are ignored.
+    """
+    def __getIgnored(self):
+        return True
+
+    def __setIgnored(self, value):
+        pass
+
+    rtsEnable = property(__getIgnored, __setIgnored)
+    dtrEnable = property(__getIgnored, __setIgnored)
+
+
+class GXDLMSSimulator:
+    """
+    Local DLMS/COSEM meter simulator over TCP loopback or a pseudo terminal.
+
+    Supports Logical Name referencing without ciphering, WRAPPER and HDLC
+    framing, IEC 62056-21 mode E sign-on, get-request normal, next and
+    with-list, General Block Transfer and selective access by range and by
+    entry for the profile generic.
+    """
+    def __init__(self, port=4061, interfaceType=InterfaceType.WRAPPER, meter=None, maxPduSize=1024, maxInfo=128, latency=0, loss=0.0):
+        self.port = port
+        self.interfaceType = interfaceType
+        self.meter = meter or GXSimulatedMeter()
+        self.maxPduSize = maxPduSize
+        # Max HDLC information field length.
+        self.maxInfo = maxInfo
+        # Injected one way delay in milliseconds.
+        self.latency = latency
+        # Probability to drop a received request or a streamed GBT block.
+        self.loss = loss
+        # Maximum General Block Transfer window size.
+        self.gbtWindowSize = 16
+        # Connection is closed if no request is received in given seconds.  Zero disables.
+        self.inactivityTimeout = 0
+        #  IEC 62056-21 identification.  Fifth character is the baud rate.
+        self.iecIdentification = "/GRX5GXDLMSSimulator\r\n"
+        #  Time in milliseconds the meter takes to change the baud rate after mode E is selected.
+        self.iecSwitchTime = 0
+        self.__connections = set()
+        self.__ptySlaves = []
+        self.conformance = Conformance.GET | Conformance.SELECTIVE_ACCESS | Conformance.BLOCK_TRANSFER_WITH_GET_OR_READ | \
+            Conformance.MULTIPLE_REFERENCES | Conformance.GENERAL_BLOCK_TRANSFER
+        self.statistics = GXSimulatorStatistics()
+        self.__socket = None
+        self.__thread = None
+        self.__lock = threading.Lock()
+
+    def start(self):
+        self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__socket.bind(("127.0.0.1", self.port))
+        self.port = self.__socket.getsockname()[1]
+        self.__socket.listen(128)
+        self.__thread = threading.Thread(target=self.__accept, daemon=True)
+        self.__thread.start()
+
+    def openPty(self):
+        """
+        Serve HDLC on a pseudo terminal like meters on a serial bus.
+        Each server address is answered by its own HDLC link.
+        Returns name of the serial port that the client opens with GXPtySerial.
+        """
+        master, slave = os.openpty()
+        name = os.ttyname(slave)
+        conn = _GXPtyConnection(master)
+        with self.__lock:
+            self.statistics.connections += 1
+            self.__connections.add(conn)
+        #  Slave is kept open so the master does not fail when the client closes the port.
+        self.__ptySlaves.append(slave)
+        threading.Thread(target=self.__serve, args=(conn, InterfaceType.HDLC), daemon=True).start()
+        return name
+
+    def stop(self):
+        if self.__socket:
+            self.__socket.close()
+            self.__socket = None
+        for it in self.__ptySlaves:
+            os.close(it)
+        self.__ptySlaves = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+
+    def __accept(self):
+        #pylint: disable=broad-except
+        while self.__socket:
+            try:
+                conn, _ = self.__socket.accept()
+            except Exception:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.inactivityTimeout:
+                conn.settimeout(self.inactivityTimeout)
+            with self.__lock:
+                self.statistics.connections += 1
+                self.__connections.add(conn)
+            threading.Thread(target=self.__serve, args=(conn, self.interfaceType), daemon=True).start()
+
+    def __count(self, rx, tx):
+        with self.__lock:
+            self.statistics.bytesRx += rx
+            if tx:
+                self.statistics.requests += 1
+                self.statistics.bytesTx += tx
+
+    def __lost(self):
+        if self.loss and random.random() < self.loss:
+            with self.__lock:
+                self.statistics.dropped += 1
+            return True
+        return False
+
+    def __send(self, conn, data):
+        if self.latency:
+            time.sleep(self.latency / 1000.0)
+        conn.sendall(bytes(data))
+
+    def __serve(self, conn, interfaceType):
+        #pylint: disable=broad-except
+        try:
+            if interfaceType == InterfaceType.WRAPPER:
+                self.__serveWrapper(conn)
+            else:
+                self.__serveHdlc(conn)
+        except Exception:
+            pass
+        finally:
+            with self.__lock:
+                self.__connections.discard(conn)
+            conn.close()
+
+    def addSequenceError(self):
+        with self.__lock:
+            self.statistics.sequenceErrors += 1
+
+    def dropConnections(self):
+        """
+        Close all open connections like a meter that has lost the power.
+        """
+        #pylint: disable=broad-except
+        with self.__lock:
+            connections = list(self.__connections)
+        for it in connections:
+            try:
+                it.shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
+
+    @classmethod
+    def __receive(cls, conn, count):
+        data = bytearray()
+        while len(data) < count:
+            tmp = conn.recv(count - len(data))
+            if not tmp:
+                raise EOFError()
+            data.extend(tmp)
+        return data
+
+    def __serveWrapper(self, conn):
+        session = _GXMeterSession(self)
+        while True:
+            header = self.__receive(conn, 8)
+            data = self.__receive(conn, header[6] << 8 | header[7])
+            if self.__lost():
+                self.__count(8 + len(data), 0)
+                continue
+            replies = session.handleApdu(data)
+            if not isinstance(replies, list):
+                replies = [replies]
+            frames = bytearray()
+            for reply in replies:
+                if len(replies) != 1 and self.__lost():
+                    continue
+                frames.extend(bytearray([0, 1]) + header[4:6] + header[2:4] + bytearray([len(reply) >> 8, len(reply) & 0xFF]) + reply)
+            self.__count(8 + len(data), len(frames))
+            self.__send(conn, frames)
+
+    def __handleIec(self, conn, buff):
+        """
+        Answer to IEC 62056-21 sign-on.  Returns the bytes that are left and
+        the time when mode E is selected or None.
+        """
+        selected = None
+        while buff and buff[0] in (ord('/'), 0x06):
+            end = buff.find(b"\n")
+            if end == -1:
+                break
+            msg = bytes(buff[0:end + 1])
+            buff = buff[end + 1:]
+            if msg.startswith(b"/?"):
+                reply = self.iecIdentification.encode("ascii")
+                self.__count(len(msg), len(reply))
+                self.__send(conn, reply)
+            else:
+                self.__count(len(msg), 0)
+                selected = time.time()
+        return buff, selected
+
+    def __serveHdlc(self, conn):
+        links = {}
+        buff = bytearray()
+        #  Frames are not received until the baud rate is changed.
+        switched = 0
+        while True:
+            tmp = conn.recv(4096)
+            if not tmp:
+                return
+            buff.extend(tmp)
+            buff, selected = self.__handleIec(conn, buff)
+            if selected:
+                switched = selected + self.iecSwitchTime / 1000.0
+            frames, buff = _GXHdlcLink.getFrames(buff)
+            for frame in frames:
+                if time.time() < switched:
+                    with self.__lock:
+                        self.statistics.dropped += 1
+                    continue
+                if self.__lost():
+                    self.__count(len(frame) + 2, 0)
+                    continue
+                address, _ = _GXHdlcLink.getTargetAddress(frame)
+                link = links.get(address)
+                if link is None:
+                    link = links[address] = _GXHdlcLink(self, address)
+                reply = link.handleFrame(frame)
+                self.__count(len(frame) + 2, len(reply) if reply else 0)
+                if reply:
+                    self.__send(conn, reply)
+
+
+class GXPushSimulator:
+    """
+    Simulated meter that pushes data notifications to the push listener.
+
+    Push object list contains the logical device name and the registers of
+    the meter.  Register values follow the wall clock like in the
+    simulator.
+    """
+    def __init__(self, host, port, meter=None, serverAddress=1):
+        self.host = host
+        self.port = port
+        self.meter = meter or GXSimulatedMeter()
+        self.notify = GXDLMSNotify(True, 1, serverAddress, InterfaceType.WRAPPER)
+        self.pushSetup = GXDLMSPushSetup("0.0.25.9.0.255")
+        ldn = GXDLMSData("0.0.42.0.0.255")
+        ldn.value = self.meter.logicalDeviceName
+        self.pushSetup.pushObjectList.append((ldn, GXDLMSCaptureObject(2, 0)))
+        for it in self.meter.registers:
+            self.pushSetup.pushObjectList.append((GXDLMSRegister(it), GXDLMSCaptureObject(2, 0)))
+        #  Sent notifications.
+        self.pushes = 0
+        self.__socket = None
+
+    def getPushObjects(self):
+        """
+        Returns logical names and attribute indexes of the push object list.
+        """
+        return [(k.logicalName, v.attributeIndex) for k, v in self.pushSetup.pushObjectList]
+
+    def connect(self):
+        self.__socket = socket.create_connection((self.host, self.port))
+        self.__socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def close(self):
+        if self.__socket:
+            self.__socket.close()
+            self.__socket = None
+
+    def push(self):
+        """
+        Push current register values.
+        """
+        if not self.__socket:
+            self.connect()
+        now = self.meter.now()
+        for k, _ in self.pushSetup.pushObjectList[1:]:
+            k.value = self.meter.registerValue(k.logicalName, now)
+        for it in self.notify.generatePushSetupMessages(datetime.datetime.fromtimestamp(now), self.pushSetup):
+            self.__socket.sendall(bytes(it))
+        self.pushes += 1
+
+
+if __name__ == '__main__':
+    #  GXDLMSSimulator [port] [-hdlc] [-o objects] [-e profile entries] [-d max PDU size] [-l latency ms] [-x loss]
+    #  GXDLMSSimulator -push host:port [-o objects] [-m meters] [-i interval ms]
+    args = sys.argv[1:]
+    options = {}
+    port = 4061
+    pos = 0
+    while pos < len(args):
+        if args[pos] == "-hdlc":
+            options[args[pos]] = True
+        elif args[pos].startswith("-"):
+            pos += 1
+            options[args[pos - 1]] = args[pos]
+        else:
+            port = int(args[pos])
+        pos += 1
+    if "-push" in options:
+        #  Meters push their values to the listener in turns.
+        host, port = options["-push"].rsplit(":", 1)
+        meters = [GXPushSimulator(host, int(port), GXSimulatedMeter(int(options.get("-o", 20)), serialNumber=pos + 1))
+                  for pos in range(int(options.get("-m", 1)))]
+        interval = int(options.get("-i", 1000)) / 1000.0
+        try:
+            while True:
+                started = time.time()
+                for it in meters:
+                    it.push()
+                print("Pushed: " + str(sum(it.pushes for it in meters)))
+                time.sleep(max(0, interval - (time.time() - started)))
+        except KeyboardInterrupt:
+            for it in meters:
+                it.close()
+        sys.exit(0)
+    simulator = GXDLMSSimulator(port, InterfaceType.HDLC if "-hdlc" in options else InterfaceType.WRAPPER,
+                                GXSimulatedMeter(int(options.get("-o", 20)), int(options.get("-e", 96 * 31))),
+                                maxPduSize=int(options.get("-d", 1024)), latency=int(options.get("-l", 0)),
+                                loss=float(options.get("-x", 0)))
+    simulator.start()
+    print("Simulator is listening port " + str(simulator.port))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        simulator.stop()
@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from gurux_dlms import GXByteBuffer, GXDLMSSettings
+from gurux_dlms.internal._GXCommon import _GXCommon
+from gurux_dlms.internal._GXDataInfo import _GXDataInfo
+
+#  Decoder settings of the worker process.
+_settings = None
+
+
+def _decodeRows(data, useUtc2NormalTime, dateTimeSkips):
+    """
+    Parse complete rows from the data in the worker process.
+    Returns parsed rows, number of parsed bytes and used time in seconds.
+    """
+    #pylint: disable=global-statement
+    global _settings
+    start = time.perf_counter()
+    if _settings is None:
+        _settings = GXDLMSSettings(False, None)
+    _settings.useUtc2NormalTime = useUtc2NormalTime
+    _settings.dateTimeSkips = dateTimeSkips
+    bb = GXByteBuffer(data)
+    rows = []
+    while bb.position < bb.size:
+        pos = bb.position
+        info = _GXDataInfo()
+        row = _GXCommon.getData(_settings, bb, info)
+        if not info.complete:
+            bb.position = pos
+            break
+        rows.append(row)
+    return rows, bb.position, time.perf_counter() - start
+
+
+class GXDecoderStatistics:
+    """
+    Usage of the decoder pool.
+    """
+    def __init__(self, workers):
+        self.workers = workers
+        self.started = time.time()
+        #  Decoded data blocks and bytes.
+        self.tasks = 0
+        self.bytes = 0
+        #  Time in seconds the workers have been decoding.
+        self.busyTime = 0
+
+    def getUtilization(self):
+        """
+        Returns how many percent of the time the workers have been busy.
+        """
+        elapsed = (time.time() - self.started) * self.workers
+        if elapsed <= 0:
+            return 0
+        return 100.0 * self.busyTime / elapsed
+
+    def __str__(self):
+        return "Workers: %d Tasks: %d Bytes: %d Utilization: %.1f %%" % (
+            self.workers, self.tasks, self.bytes, self.getUtilization())
+
+
+class GXDecoderPool:
+    """
+    Decodes profile generic rows of the received data blocks in worker processes.
+
+    Decoding is not serialized by the GIL so many meters that are read in
+    threads can decode at the same time.  Reader sends the next request
+    while the previous data block is decoded.
+    """
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.statistics = GXDecoderStatistics(self.workers)
+        self.__executor = ProcessPoolExecutor(self.workers)
+        self.__lock = threading.Lock()
+
+    def submitRows(self, settings, data):
+        """
+        Start decoding the rows.  Future returns parsed rows and number of parsed bytes.
+        """
+        future = self.__executor.submit(_decodeRows, bytes(data), settings.useUtc2NormalTime, settings.dateTimeSkips)
+        future.size = len(data)
+        future.add_done_callback(self.__done)
+        return future
+
+    def __done(self, future):
+        if future.cancelled() or future.exception():
+            return
+        with self.__lock:
+            self.statistics.tasks += 1
+            self.statistics.bytes += future.size
+            self.statistics.busyTime += future.result()[2]
+
+    def close(self):
+        self.__executor.shutdown()
+
+    def __str__(self):
+        return str(self.statistics)
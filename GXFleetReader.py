@@ -0,0 +1,359 @@
+import shlex
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from gurux_common.enums import TraceLevel
+from gurux_common.io import Parity, StopBits, BaudRate
+from gurux_net import GXNet
+from gurux_serial import GXSerial
+from GXSettings import GXSettings
+from GXDLMSReader import GXDLMSReader
+from GXRetryPolicy import GXRetryPolicy
+from GXReadBudget import GXReadBudget
+from GXRateLimiter import GXRateLimiter
+from GXSerialBus import GXSerialBus, GXBusMedia
+
+
+class GXMeterJob:
+    """
+    Read job of one meter in the fleet.
+    """
+    def __init__(self, args):
+        # Command line parameters of the meter.
+        self.args = args
+        # Meter settings.  Each job has own client and media.
+        self.settings = None
+        self.reader = None
+        # Error if read failed.
+        self.error = None
+        # Poll items that are due.  All objects are read if not set.
+        self.items = None
+        # Read results of the poll items.
+        self.results = None
+        # (logicalName, attributeIndex, description) of the reads that did not fit to the budget.
+        self.skipped = []
+        # Is job aborted because meter timeout expired.
+        self.timedOut = False
+        self.started = 0
+        self.finished = 0
+
+    def __str__(self):
+        return " ".join(self.args[1:])
+
+    def getElapsed(self):
+        if not self.started:
+            return 0
+        if not self.finished:
+            return time.time() - self.started
+        return self.finished - self.started
+
+    def abort(self):
+        #pylint: disable=broad-except
+        """
+        Close the media so the reader stops.  Reader deadline has already
+        ended the receive and the requests.
+        """
+        self.timedOut = True
+        reader = self.reader
+        if reader:
+            #  Reader must not open the connection again.
+            reader.resumeAttempts = 0
+        if reader and reader.media:
+            try:
+                reader.media.close()
+            except Exception:
+                pass
+
+
+class GXFleetStatistics:
+    """
+    Aggregate statistics of the fleet read.
+    """
+    def __init__(self):
+        self.meters = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.timedOut = 0
+        #  Meters which reads were skipped because the budget was used.
+        self.deferred = 0
+        self.started = 0
+        self.finished = 0
+
+    def getElapsed(self):
+        end = self.finished
+        if not end:
+            end = time.time()
+        return end - self.started
+
+    def getMetersPerMinute(self):
+        elapsed = self.getElapsed()
+        if elapsed <= 0:
+            return 0
+        return 60.0 * (self.succeeded + self.failed + self.timedOut) / elapsed
+
+    def __str__(self):
+        return "Meters: %d Succeeded: %d Failed: %d Timed out: %d Deferred: %d Time: %.1f s Throughput: %.1f meters/minute" % (
+            self.meters, self.succeeded, self.failed, self.timedOut, self.deferred, self.getElapsed(), self.getMetersPerMinute())
+
+
+class GXFleetReader:
+    """
+    Reads multiple meters concurrently with a bounded worker pool.
+    """
+    def __init__(self, targets, concurrency=16, meterTimeout=120, trace=TraceLevel.ERROR, readObjects=None):
+        # Command line parameters of each meter.
+        self.targets = targets
+        # Maximum number of meters read at the same time.
+        self.concurrency = concurrency
+        # Maximum time in seconds for one meter.
+        self.meterTimeout = meterTimeout
+        self.trace = trace
+        #  Trace level of the log file.  Same as the trace level if not set.
+        self.logLevel = None
+        # Objects to read from all the meters.  All objects are read if empty.
+        self.readObjects = readObjects
+        #  Association view cache shared by all the meters.
+        self.associationCache = None
+        #  Read association views from the meters and replace cached ones.
+        self.invalidateCache = False
+        #  Profile generic watermarks shared by all the meters.
+        self.profileWatermarks = None
+        #  Read checkpoints shared by all the meters.
+        self.checkpoint = None
+        #  How many times the connection is opened again and reading continues from the checkpoint.
+        self.resumeAttempts = 3
+        #  Time in seconds and bytes of one meter session if they are not given for the meter.  Not limited if zero.
+        self.timeBudget = 0
+        self.byteBudget = 0
+        #  Sessions that are kept open between the runs.  Meters are disconnected after each run if not set.
+        self.sessions = None
+        #  Poll scheduler.  Only due items are read if set.
+        self.scheduler = None
+        #  Maximum requests in a second to one port and to all the meters.  Not limited if zero.
+        self.portRate = 0
+        self.fleetRate = 0
+        #  Reader metrics shared by all the meters.  Metrics are not collected if not set.
+        self.metrics = None
+        #  Process pool where profile generic rows are decoded.
+        self.decoderPool = None
+        #  Interface classes of the OBIS codes shared by all the meters.
+        self.obisIndex = None
+        #  Compiled read plans shared by all the meters.
+        self.readPlans = None
+        #  Result sink shared by all the meters.  Values are written to the trace if not set.
+        self.results = None
+        self.jobs = []
+        self.statistics = GXFleetStatistics()
+        self.__lock = threading.Lock()
+        #  Retry policy of each meter.  Round trip times and failures are kept between the runs.
+        self.__retryPolicies = {}
+        #  Rate limiter of each port.
+        self.__rateLimiters = {}
+        self.__fleetRateLimiter = None
+        #  Shared serial buses by port name.  Port is kept open until the fleet is closed.
+        self.buses = {}
+
+    @classmethod
+    def loadTargets(cls, fileName):
+        """
+        Load meter targets from the file.  Each line contains command line
+        parameters of one meter.  Empty lines and lines starting with # are skipped.
+        """
+        targets = []
+        with open(fileName, "r") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    targets.append(["GXFleetReader"] + shlex.split(line))
+        return targets
+
+    def getRetryPolicy(self, job):
+        """
+        Returns retry policy of the meter.
+        """
+        with self.__lock:
+            ret = self.__retryPolicies.get(str(job))
+            if ret is None:
+                ret = GXRetryPolicy(job.settings.retryAttempts, maxTimeout=job.settings.maxTimeout,
+                                    maxFailures=job.settings.maxFailures)
+                self.__retryPolicies[str(job)] = ret
+            return ret
+
+    def getBus(self, media):
+        """
+        Returns serial bus of the port.  Meters on the same port share the bus.
+        """
+        with self.__lock:
+            ret = self.buses.get(media.port)
+            if ret is None:
+                ret = GXSerialBus(media)
+                self.buses[media.port] = ret
+            return ret
+
+    @classmethod
+    def getPortKey(cls, media):
+        """
+        Returns key of the port that the meter is connected.
+        """
+        if isinstance(media, GXBusMedia):
+            return media.bus.media.port
+        if isinstance(media, GXSerial):
+            return media.port
+        return "%s:%d" % (media.hostName, media.port)
+
+    def close(self):
+        """
+        Close shared serial ports.
+        """
+        with self.__lock:
+            buses = list(self.buses.values())
+            self.buses.clear()
+        for it in buses:
+            it.close()
+
+    def getRateLimiters(self, job):
+        """
+        Returns rate limiters of the meter port and the fleet.
+        """
+        ret = []
+        with self.__lock:
+            if self.portRate:
+                key = self.getPortKey(job.settings.media)
+                limiter = self.__rateLimiters.get(key)
+                if limiter is None:
+                    limiter = GXRateLimiter(self.portRate)
+                    self.__rateLimiters[key] = limiter
+                ret.append(limiter)
+            if self.fleetRate:
+                if self.__fleetRateLimiter is None:
+                    self.__fleetRateLimiter = GXRateLimiter(self.fleetRate)
+                ret.append(self.__fleetRateLimiter)
+        return ret
+
+    def readMeter(self, job):
+        job.started = time.time()
+        try:
+            job.settings = GXSettings()
+            if job.settings.getParameters(job.args) != 0:
+                raise ValueError("Invalid meter parameters: " + str(job))
+            if isinstance(job.settings.media, GXSerial):
+                if job.settings.iec:
+                    #  Sign-on changes the baud rate of the port so the optical probe is not shared.
+                    job.settings.media.baudRate = BaudRate.BAUD_RATE_300
+                    job.settings.media.dataBits = 7
+                    job.settings.media.parity = Parity.EVEN
+                    job.settings.media.stopBits = StopBits.ONE
+                else:
+                    bus = self.getBus(job.settings.media)
+                    job.settings.media = bus.getMedia(str(job.settings.client.serverAddress))
+            elif not isinstance(job.settings.media, GXNet):
+                raise ValueError("Fleet mode supports only network and serial meters: " + str(job))
+            readObjects = job.settings.readObjects or self.readObjects
+            reader = None
+            if self.sessions:
+                reader = self.sessions.get(str(job))
+            if reader is None:
+                reader = GXDLMSReader(job.settings.client, job.settings.media, self.trace)
+                reader.iec = job.settings.iec
+                reader.iecSettleTime = job.settings.iecSettleTime
+                reader.iecSkipSignOn = job.settings.iecSkipSignOn
+                if self.logLevel is not None:
+                    reader.logLevel = self.logLevel
+                reader.maxReferences = job.settings.maxReferences
+                reader.associationCache = self.associationCache
+                reader.invalidateCache = self.invalidateCache
+                reader.profileWatermarks = self.profileWatermarks
+                reader.checkpoint = self.checkpoint
+                timeBudget = job.settings.timeBudget or self.timeBudget
+                byteBudget = job.settings.byteBudget or self.byteBudget
+                if timeBudget or byteBudget:
+                    reader.budget = GXReadBudget(timeBudget, byteBudget)
+                reader.rowsPerRequest = job.settings.rowsPerRequest
+                reader.maxRowsPerPoll = job.settings.maxRowsPerPoll
+                reader.profileDirectory = job.settings.profileDirectory
+                reader.retryPolicy = self.getRetryPolicy(job)
+                reader.rateLimiters = self.getRateLimiters(job)
+                reader.metrics = self.metrics
+                reader.decoderPool = self.decoderPool
+                reader.obisIndex = self.obisIndex
+                reader.readPlans = self.readPlans
+                reader.results = self.results
+                if self.sessions:
+                    self.sessions.add(str(job), reader)
+            #  Aborted job has disabled resuming.
+            reader.resumeAttempts = self.resumeAttempts
+            #  Receive does not wait over the meter timeout and nothing is sent after it.
+            reader.deadline = job.started + self.meterTimeout
+            job.reader = reader
+            if job.timedOut:
+                return
+            with reader.lock:
+                if job.items:
+                    job.results = reader.readScheduled(job.items)
+                    self.scheduler.update(str(job), job.results)
+                elif readObjects:
+                    try:
+                        reader.showObjects(reader.readObjects(readObjects))
+                    except Exception:
+                        reader.close()
+                        raise
+                    finally:
+                        if not reader.persistent:
+                            reader.close()
+                else:
+                    try:
+                        reader.readAll()
+                    finally:
+                        if reader.budget:
+                            job.skipped = list(reader.budget.skipped)
+        except Exception as ex:
+            job.error = ex
+            if job.reader and job.reader.deadline is not None and time.time() >= job.reader.deadline:
+                job.timedOut = True
+            if job.items:
+                self.scheduler.markFailed(str(job), job.items)
+            if self.trace > TraceLevel.WARNING and not job.timedOut:
+                traceback.print_exc()
+        finally:
+            if job.reader:
+                #  Session is kept alive between the polls without the deadline.
+                job.reader.deadline = None
+            job.finished = time.time()
+            self.__updateStatistics(job)
+
+    def __updateStatistics(self, job):
+        with self.__lock:
+            if job.timedOut:
+                self.statistics.timedOut += 1
+            elif job.error:
+                self.statistics.failed += 1
+            else:
+                self.statistics.succeeded += 1
+            if job.skipped:
+                self.statistics.deferred += 1
+
+    def run(self):
+        self.jobs = [GXMeterJob(it) for it in self.targets]
+        if self.scheduler:
+            #  Only meters that have due items are read.  Most urgent meters are read first.
+            for it in self.jobs:
+                it.items = self.scheduler.getDue(str(it))
+            self.jobs = sorted([it for it in self.jobs if it.items], key=lambda it: it.items[0].priority)
+        self.statistics = GXFleetStatistics()
+        self.statistics.meters = len(self.jobs)
+        self.statistics.started = time.time()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = {executor.submit(self.readMeter, it): it for it in self.jobs}
+            while pending:
+                done, _ = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+                for it in done:
+                    del pending[it]
+                #  Abort meters that have used their time.
+                for it in pending.values():
+                    if it.started and not it.timedOut and it.getElapsed() > self.meterTimeout:
+                        if self.trace > TraceLevel.WARNING:
+                            print("Meter timeout expired: " + str(it))
+                        it.abort()
+        self.statistics.finished = time.time()
+        return self.statistics
@@ -0,0 +1,113 @@
+import atexit
+import os
+import queue
+import threading
+
+
+class GXLogWriter:
+    """
+    Buffered log file writer.
+
+    Lines are queued by the caller and written in batches by a background
+    thread.  The file is opened only for the write of each batch and it is
+    rotated before the write when it has grown over the maximum size.
+    Writers are shared by file name, so all the readers of the fleet use
+    the same writer.
+    """
+    __writers = {}
+    __lock = threading.Lock()
+
+    def __init__(self, fileName="logFile.txt", maxSize=10 * 1024 * 1024, backupCount=3):
+        self.fileName = fileName
+        # Maximum size of the log file in bytes before it's rotated.
+        self.maxSize = maxSize
+        # Number of rotated log files that are kept.
+        self.backupCount = backupCount
+        # Maximum number of lines written with one write.
+        self.batchSize = 1000
+        self.__queue = queue.Queue()
+        self.__thread = threading.Thread(target=self.__run, name="GXLogWriter")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    @classmethod
+    def open(cls, fileName="logFile.txt"):
+        """
+        Returns the shared writer of the log file.
+        """
+        with cls.__lock:
+            ret = cls.__writers.get(fileName)
+            if ret is None:
+                ret = cls(fileName)
+                cls.__writers[fileName] = ret
+            return ret
+
+    @classmethod
+    def closeAll(cls):
+        """
+        Write queued lines and stop all shared writers.
+        """
+        with cls.__lock:
+            writers = list(cls.__writers.values())
+            cls.__writers.clear()
+        for it in writers:
+            it.close()
+
+    def write(self, line):
+        """
+        Queue line to the log.  New line is added to the end of the line.
+        """
+        self.__queue.put(line)
+
+    def flush(self):
+        """
+        Wait until queued lines are written.
+        """
+        self.__queue.join()
+
+    def close(self):
+        """
+        Write queued lines and stop the writer thread.
+        """
+        if self.__thread.is_alive():
+            self.__queue.put(None)
+            self.__thread.join()
+
+    def __rotate(self):
+        for pos in range(self.backupCount - 1, 0, -1):
+            name = "%s.%d" % (self.fileName, pos)
+            if os.path.exists(name):
+                os.replace(name, "%s.%d" % (self.fileName, pos + 1))
+        if self.backupCount > 0:
+            os.replace(self.fileName, self.fileName + ".1")
+        else:
+            os.remove(self.fileName)
+
+    def __run(self):
+        closing = False
+        while not closing:
+            lines = [self.__queue.get()]
+            while len(lines) < self.batchSize:
+                try:
+                    lines.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            count = len(lines)
+            if None in lines:
+                closing = True
+                lines = [it for it in lines if it is not None]
+            try:
+                if lines:
+                    if self.maxSize and os.path.exists(self.fileName) and os.path.getsize(self.fileName) >= self.maxSize:
+                        self.__rotate()
+                    with open(self.fileName, "a") as f:
+                        f.write("\n".join(lines))
+                        f.write("\n")
+            except OSError as ex:
+                print("Failed to write the log file. " + str(ex))
+            finally:
+                for _ in range(count):
+                    self.__queue.task_done()
+
+
+atexit.register(GXLogWriter.closeAll)
@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+from gurux_dlms.enums import ObjectType
+
+
+class GXObisIndex:
+    """
+    Interface classes of the OBIS codes.
+
+    Objects with a known interface class can be read without reading the
+    association view first.  Index contains well known OBIS codes and the
+    classes learned from the association views that are read from the
+    meters.  Learned classes are saved to the index file.
+    """
+    #  Well known OBIS codes and their interface classes.
+    DEFAULTS = {"0.0.1.0.0.255": ObjectType.CLOCK,
+                "0.0.40.0.0.255": ObjectType.ASSOCIATION_LOGICAL_NAME,
+                "0.0.42.0.0.255": ObjectType.DATA,
+                "0.0.96.1.0.255": ObjectType.DATA,
+                "0.0.96.1.1.255": ObjectType.DATA,
+                "1.0.0.2.0.255": ObjectType.DATA,
+                "0.0.96.3.10.255": ObjectType.DISCONNECT_CONTROL,
+                "0.0.17.0.0.255": ObjectType.LIMITER,
+                "0.0.25.9.0.255": ObjectType.PUSH_SETUP,
+                "0.0.43.0.0.255": ObjectType.SECURITY_SETUP,
+                "0.0.43.1.0.255": ObjectType.DATA,
+                "0.0.44.0.0.255": ObjectType.IMAGE_TRANSFER,
+                "0.0.99.98.0.255": ObjectType.PROFILE_GENERIC,
+                "1.0.99.1.0.255": ObjectType.PROFILE_GENERIC,
+                "1.0.99.2.0.255": ObjectType.PROFILE_GENERIC,
+                "0.0.98.1.0.255": ObjectType.PROFILE_GENERIC}
+
+    def __init__(self, fileName=None):
+        #  File where learned classes are saved.  Learned classes are kept only in memory if not set.
+        self.fileName = fileName
+        self.__classes = {}
+        self.__lock = threading.Lock()
+        self.__modified = False
+        if fileName and os.path.exists(fileName):
+            with open(fileName, "r") as f:
+                for ln, value in json.load(f).items():
+                    self.__classes[ln] = ObjectType(value)
+
+    @classmethod
+    def getDefault(cls, logicalName):
+        """
+        Returns interface class of the well known OBIS code.  NONE is returned if class is not known.
+        """
+        ret = GXObisIndex.DEFAULTS.get(logicalName)
+        if ret is not None:
+            return ret
+        tmp = logicalName.split(".")
+        if len(tmp) != 6 or not all(it.isdigit() for it in tmp):
+            return ObjectType.NONE
+        a, c, d = int(tmp[0]), int(tmp[2]), int(tmp[3])
+        if a == 1 and 1 <= c <= 80 and d in (8, 9, 10, 29):
+            #  Electricity energy registers.
+            return ObjectType.REGISTER
+        if a == 1 and 1 <= c <= 80 and d in (4, 5, 14, 15, 24, 25):
+            #  Current and last average demand.
+            return ObjectType.DEMAND_REGISTER
+        if a == 1 and 1 <= c <= 80 and d in (6, 16, 26):
+            #  Maximum demand with capture time.
+            return ObjectType.EXTENDED_REGISTER
+        if a == 1 and 1 <= c <= 80 and d == 7:
+            #  Instantaneous values.
+            return ObjectType.REGISTER
+        return ObjectType.NONE
+
+    def get(self, logicalName):
+        """
+        Returns interface class of the object.  NONE is returned if class is not known.
+        """
+        with self.__lock:
+            ret = self.__classes.get(logicalName)
+        if ret is None:
+            ret = GXObisIndex.getDefault(logicalName)
+        return ret
+
+    def learn(self, objects):
+        """
+        Add interface classes of the association view objects to the index.
+        """
+        with self.__lock:
+            for it in objects:
+                if self.__classes.get(it.logicalName) != it.objectType:
+                    self.__classes[it.logicalName] = it.objectType
+                    self.__modified = True
+
+    def save(self):
+        """
+        Save learned classes to the index file if they are changed.
+        """
+        with self.__lock:
+            if not self.fileName or not self.__modified:
+                return
+            tmp = self.fileName + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({k: int(v) for k, v in self.__classes.items()}, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.fileName)
+            self.__modified = False
@@ -0,0 +1,110 @@
+import threading
+import time
+
+
+class GXPollItem:
+    """
+    Attribute that is read from the meter in given interval.
+    """
+    def __init__(self, logicalName, attributeIndex, interval, priority=0):
+        self.logicalName = logicalName
+        self.attributeIndex = attributeIndex
+        #  Read interval in seconds.
+        self.interval = interval
+        #  Items with smaller priority are read first.
+        self.priority = priority
+
+    def getKey(self):
+        return "%s:%d" % (self.logicalName, self.attributeIndex)
+
+    def __str__(self):
+        return "%s %d %d" % (self.getKey(), self.interval, self.priority)
+
+
+class GXPollScheduler:
+    """
+    Decides which attributes of each meter are due to be read.
+
+    Read times are aligned to the interval so items with the same interval
+    are due at the same time and they are read in the same session.  Item
+    that failed to read is tried again after retryInterval seconds or at
+    the next interval if it comes first.
+    """
+    def __init__(self, items, retryInterval=60):
+        self.items = sorted(items, key=lambda it: it.priority)
+        self.retryInterval = retryInterval
+        #  Next read time of each meter and item.
+        self.__nextDue = {}
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def loadItems(cls, fileName):
+        """
+        Load poll items from the file.  Each line contains logical name and
+        attribute index, interval in seconds and optional priority.
+        Example: 1.0.1.8.0.255:2 900 1
+        Empty lines and lines starting with # are skipped.
+        """
+        items = []
+        with open(fileName, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                tmp = line.split()
+                target = tmp[0].split(":")
+                if len(tmp) < 2 or len(target) != 2:
+                    raise ValueError("Invalid poll item: " + line)
+                interval = int(tmp[1])
+                if interval < 1:
+                    raise ValueError("Invalid poll interval: " + line)
+                priority = 0
+                if len(tmp) > 2:
+                    priority = int(tmp[2])
+                items.append(GXPollItem(target[0].strip(), int(target[1]), interval, priority))
+        return items
+
+    def getDue(self, key, now=None):
+        """
+        Returns items of the meter that are due to be read ordered by priority.
+        """
+        if now is None:
+            now = time.time()
+        with self.__lock:
+            return [it for it in self.items if self.__nextDue.get((key, it.getKey()), 0) <= now]
+
+    def getNextDue(self):
+        """
+        Returns the time when the next item is due to be read.  Zero if nothing is read yet.
+        """
+        with self.__lock:
+            if not self.__nextDue:
+                return 0
+            return min(self.__nextDue.values())
+
+    def markRead(self, key, items, now=None):
+        """
+        Items are read and they are due again at the next interval.
+        """
+        if now is None:
+            now = time.time()
+        with self.__lock:
+            for it in items:
+                self.__nextDue[(key, it.getKey())] = now - now % it.interval + it.interval
+
+    def markFailed(self, key, items, now=None):
+        """
+        Items are failed to read and they are tried again after the retry interval.
+        """
+        if now is None:
+            now = time.time()
+        with self.__lock:
+            for it in items:
+                self.__nextDue[(key, it.getKey())] = min(now + self.retryInterval, now - now % it.interval + it.interval)
+
+    def update(self, key, results, now=None):
+        """
+        Update next read times from (item, value) results.  Value is the exception if read failed.
+        """
+        self.markRead(key, [it for it, value in results if not isinstance(value, Exception)], now)
+        self.markFailed(key, [it for it, value in results if isinstance(value, Exception)], now)
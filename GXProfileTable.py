@@ -0,0 +1,210 @@
+import array
+import datetime
+import math
+import struct
+from gurux_dlms import GXDateTime
+from gurux_dlms.enums import ObjectType
+
+
+class GXProfileColumn:
+    """
+    One column of the profile generic table.
+    """
+    # Capture time as seconds since epoch.
+    TIME = 0
+    # Register value with scaler applied.
+    VALUE = 1
+    # Status or other integer value.
+    STATUS = 2
+    # Any other value.  Values are kept as Python objects.
+    OBJECT = 3
+
+    def __init__(self, objectType, logicalName, attributeIndex, kind):
+        self.objectType = objectType
+        self.logicalName = logicalName
+        self.attributeIndex = attributeIndex
+        self.kind = kind
+        if kind == GXProfileColumn.TIME:
+            self.values = array.array('q')
+        elif kind == GXProfileColumn.VALUE:
+            self.values = array.array('d')
+        elif kind == GXProfileColumn.STATUS:
+            #  Status column is widened when a value does not fit.
+            self.values = array.array('H')
+        else:
+            self.values = []
+
+    def __str__(self):
+        return "%d %s:%d" % (self.objectType, self.logicalName, self.attributeIndex)
+
+    @classmethod
+    def getKind(cls, target, attributeIndex):
+        """
+        Returns column kind of the capture object.
+        """
+        if (target.objectType == ObjectType.CLOCK and attributeIndex == 2) or target.logicalName == "0.0.1.1.0.255":
+            return GXProfileColumn.TIME
+        if target.objectType in (ObjectType.REGISTER, ObjectType.EXTENDED_REGISTER) and attributeIndex == 2:
+            return GXProfileColumn.VALUE
+        if target.objectType == ObjectType.DEMAND_REGISTER and attributeIndex in (2, 3):
+            return GXProfileColumn.VALUE
+        if target.objectType == ObjectType.DATA and attributeIndex == 2:
+            return GXProfileColumn.STATUS
+        return GXProfileColumn.OBJECT
+
+    def append(self, value):
+        if self.kind == GXProfileColumn.TIME:
+            if isinstance(value, GXDateTime):
+                value = value.value
+            if isinstance(value, datetime.datetime):
+                value = value.timestamp()
+            self.values.append(int(value or 0))
+        elif value is not None and not isinstance(value, (int, float)):
+            #  Value is not a number.  Column is kept as Python objects.
+            if self.kind != GXProfileColumn.OBJECT:
+                self.kind = GXProfileColumn.OBJECT
+                self.values = self.values.tolist()
+            self.values.append(value)
+        elif self.kind == GXProfileColumn.VALUE:
+            if value is None:
+                value = math.nan
+            self.values.append(float(value))
+        elif self.kind == GXProfileColumn.STATUS:
+            value = int(value or 0)
+            try:
+                self.values.append(value)
+            except OverflowError:
+                #  Widen the column.
+                if self.values.typecode == 'H' and 0 <= value <= 0xFFFFFFFF:
+                    self.values = array.array('I', self.values)
+                else:
+                    self.values = array.array('q', self.values)
+                self.values.append(value)
+        else:
+            self.values.append(value)
+
+
+class GXProfileTable:
+    """
+    Profile generic rows stored in typed array backed columns.
+
+    Columns are created from the capture objects of the profile generic.
+    Capture times are stored as int64 epoch seconds, register values as
+    float64 with the scaler applied and status values as small integers.
+    """
+    # File identifier of the exported table.
+    MAGIC = b"GXPT"
+    VERSION = 1
+
+    def __init__(self, logicalName="", columns=None):
+        self.logicalName = logicalName
+        self.columns = columns or []
+
+    @classmethod
+    def fromProfileGeneric(cls, pg):
+        """
+        Create empty table with the capture objects of the profile generic.
+        """
+        columns = []
+        for k, v in pg.captureObjects:
+            columns.append(GXProfileColumn(k.objectType, k.logicalName, v.attributeIndex,
+                                           GXProfileColumn.getKind(k, v.attributeIndex)))
+        return cls(pg.logicalName, columns)
+
+    def __len__(self):
+        if not self.columns:
+            return 0
+        return len(self.columns[0].values)
+
+    def append(self, row):
+        """
+        Add one row.  Row values must be in the capture object order.
+        """
+        if len(row) != len(self.columns):
+            raise ValueError("Number of columns do not match.")
+        for column, value in zip(self.columns, row):
+            column.append(value)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def getColumn(self, logicalName, attributeIndex=2):
+        """
+        Returns the column of the capture object or None if the object is not captured.
+        """
+        for it in self.columns:
+            if it.logicalName == logicalName and it.attributeIndex == attributeIndex:
+                return it
+        return None
+
+    def getRow(self, index):
+        return [it.values[index] for it in self.columns]
+
+    @classmethod
+    def __writeString(cls, f, value):
+        value = value.encode("utf-8")
+        f.write(struct.pack("<H", len(value)))
+        f.write(value)
+
+    @classmethod
+    def __readString(cls, f):
+        size = struct.unpack("<H", f.read(2))[0]
+        return f.read(size).decode("utf-8")
+
+    def save(self, fileName):
+        """
+        Export the table to a binary file.
+
+        Columns are written one after another as raw little-endian arrays.
+        Object columns are written as strings.
+        """
+        with open(fileName, "wb") as f:
+            f.write(GXProfileTable.MAGIC)
+            f.write(struct.pack("<BII", GXProfileTable.VERSION, len(self), len(self.columns)))
+            self.__writeString(f, self.logicalName)
+            for it in self.columns:
+                if it.kind == GXProfileColumn.OBJECT:
+                    typecode = 's'
+                else:
+                    typecode = it.values.typecode
+                f.write(struct.pack("<HBBc", it.objectType, it.attributeIndex, it.kind, typecode.encode()))
+                self.__writeString(f, it.logicalName)
+            for it in self.columns:
+                if it.kind == GXProfileColumn.OBJECT:
+                    for value in it.values:
+                        self.__writeString(f, str(value))
+                else:
+                    values = it.values
+                    if struct.pack("=H", 1) != struct.pack("<H", 1):
+                        values = array.array(values.typecode, values)
+                        values.byteswap()
+                    values.tofile(f)
+
+    @classmethod
+    def load(cls, fileName):
+        """
+        Load table that is exported with save.
+        """
+        with open(fileName, "rb") as f:
+            if f.read(4) != GXProfileTable.MAGIC:
+                raise ValueError("Invalid profile table file.")
+            version, rows, count = struct.unpack("<BII", f.read(9))
+            if version != GXProfileTable.VERSION:
+                raise ValueError("Unsupported profile table version " + str(version) + ".")
+            ret = cls(cls.__readString(f))
+            typecodes = []
+            for _ in range(count):
+                objectType, attributeIndex, kind, typecode = struct.unpack("<HBBc", f.read(5))
+                column = GXProfileColumn(objectType, cls.__readString(f), attributeIndex, kind)
+                typecodes.append(typecode.decode())
+                ret.columns.append(column)
+            for column, typecode in zip(ret.columns, typecodes):
+                if typecode == 's':
+                    column.values = [cls.__readString(f) for _ in range(rows)]
+                else:
+                    column.values = array.array(typecode)
+                    column.values.fromfile(f, rows)
+                    if struct.pack("=H", 1) != struct.pack("<H", 1):
+                        column.values.byteswap()
+        return ret
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+
+
+class GXProfileWatermarks:
+    """
+    Last collected profile generic row of each meter and profile.
+
+    Watermarks are kept in a JSON file.  Each entry holds the entry index
+    and capture time (seconds since epoch) of the last collected row.
+    Changed watermarks are written at most once in flushInterval seconds
+    and when flush is called, so the file is not written after each
+    request.  Rows of the last flushInterval seconds are read again if the
+    process is stopped before the flush.
+    """
+    def __init__(self, fileName, flushInterval=10.0):
+        # Watermark file.
+        self.fileName = fileName
+        self.flushInterval = flushInterval
+        self.__lock = threading.Lock()
+        self.__values = None
+        # Are there watermarks that are not written to the file.
+        self.__dirty = False
+        self.__saved = time.time()
+
+    @classmethod
+    def getKey(cls, meter, logicalName):
+        """
+        Returns watermark key for the profile generic of the meter.
+        """
+        return meter + ";" + logicalName
+
+    def __getValues(self):
+        if self.__values is None:
+            self.__values = {}
+            if os.path.exists(self.fileName):
+                with open(self.fileName, "r") as f:
+                    self.__values = json.load(f)
+        return self.__values
+
+    def __save(self):
+        path = os.path.dirname(self.fileName)
+        if path and not os.path.exists(path):
+            os.makedirs(path)
+        tmp = self.fileName + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.__values, f)
+        os.replace(tmp, self.fileName)
+        self.__dirty = False
+        self.__saved = time.time()
+
+    def get(self, key):
+        """
+        Returns (entry, time) of the last collected row or None if the profile is not read before.
+        """
+        with self.__lock:
+            value = self.__getValues().get(key)
+        if value is None:
+            return None
+        return (value["entry"], value["time"])
+
+    def set(self, key, entry, time_):
+        """
+        Save entry index and capture time of the last collected row.
+        """
+        with self.__lock:
+            self.__getValues()[key] = {"entry": entry, "time": time_}
+            self.__dirty = True
+            if time.time() - self.__saved >= self.flushInterval:
+                self.__save()
+
+    def flush(self):
+        """
+        Write changed watermarks to the file.
+        """
+        with self.__lock:
+            if self.__dirty:
+                self.__save()
@@ -0,0 +1,194 @@
+import selectors
+import socket
+import threading
+import time
+import traceback
+from gurux_common.enums import TraceLevel
+from gurux_dlms import GXDLMSNotify, GXByteBuffer, GXReplyData
+from gurux_dlms.enums import InterfaceType
+from GXRecordBatcher import GXRecordBatcher
+from GXResultSink import GXResultRecord
+
+
+class GXPushStatistics:
+    """
+    Counters of the push listener.
+    """
+    def __init__(self):
+        self.started = time.time()
+        self.connections = 0
+        #  Received data notifications.
+        self.notifications = 0
+        self.records = 0
+        #  Notifications that could not be decoded.
+        self.errors = 0
+
+    def getNotificationsPerMinute(self):
+        elapsed = time.time() - self.started
+        if elapsed <= 0:
+            return 0
+        return 60.0 * self.notifications / elapsed
+
+    def __str__(self):
+        return "Connections: %d Notifications: %d Records: %d Errors: %d Throughput: %.1f notifications/minute" % (
+            self.connections, self.notifications, self.records, self.errors, self.getNotificationsPerMinute())
+
+
+class _GXPushConnection:
+    """
+    Inbound connection of one meter.
+    """
+    def __init__(self, conn, address):
+        self.conn = conn
+        self.address = address
+        self.buffer = bytearray()
+        #  Notification that is received in several blocks.
+        self.reply = GXReplyData()
+
+
+class GXPushListener:
+    """
+    Receives pushed data notifications from many meters over TCP using WRAPPER framing.
+
+    All the connections are served by one thread.  Decoded values are given
+    to the sink as result records in batches from the batcher thread.  When
+    the sink falls behind and the batcher queue is full the listener stops
+    reading the sockets so TCP flow control slows down the meters.
+
+    If the push object list is given values of the pushed structure are
+    given as own records.  Logical device name (0.0.42.0.0.255) in the push
+    object list is used to identify the meter.
+    """
+    def __init__(self, port=4059, sink=None, pushObjects=None, trace=TraceLevel.ERROR):
+        self.port = port
+        #  Logical names and attribute indexes of the push object list.
+        self.pushObjects = pushObjects or []
+        self.trace = trace
+        self.batcher = GXRecordBatcher(sink or self.__print)
+        self.statistics = GXPushStatistics()
+        self.__notify = GXDLMSNotify(True, 0, 0, InterfaceType.PDU)
+        self.__selector = None
+        self.__socket = None
+        self.__thread = None
+
+    def start(self):
+        self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__socket.bind(("", self.port))
+        self.port = self.__socket.getsockname()[1]
+        self.__socket.listen(1024)
+        self.__socket.setblocking(False)
+        self.__selector = selectors.DefaultSelector()
+        self.__selector.register(self.__socket, selectors.EVENT_READ)
+        self.batcher.start()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Close the connections and give the received records to the sink.
+        """
+        if self.__thread:
+            thread = self.__thread
+            self.__thread = None
+            thread.join()
+        self.batcher.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.stop()
+
+    def __run(self):
+        try:
+            while self.__thread:
+                for key, _ in self.__selector.select(0.5):
+                    if key.data is None:
+                        self.__accept()
+                    else:
+                        self.__receive(key.data)
+        finally:
+            for key in list(self.__selector.get_map().values()):
+                key.fileobj.close()
+            self.__selector.close()
+
+    def __accept(self):
+        try:
+            conn, address = self.__socket.accept()
+        except BlockingIOError:
+            return
+        conn.setblocking(False)
+        self.statistics.connections += 1
+        self.__selector.register(conn, selectors.EVENT_READ, _GXPushConnection(conn, address[0]))
+
+    def __close(self, connection):
+        self.__selector.unregister(connection.conn)
+        connection.conn.close()
+
+    def __receive(self, connection):
+        try:
+            data = connection.conn.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = None
+        if not data:
+            self.__close(connection)
+            return
+        buff = connection.buffer
+        buff.extend(data)
+        pos = 0
+        #  Header: version, source wport, destination wport and length.
+        while len(buff) - pos >= 8:
+            if buff[pos] != 0 or buff[pos + 1] != 1:
+                if self.trace > TraceLevel.OFF:
+                    print("Invalid WRAPPER version from " + connection.address)
+                self.__close(connection)
+                return
+            size = (buff[pos + 6] << 8) | buff[pos + 7]
+            if len(buff) - pos < 8 + size:
+                break
+            source = (buff[pos + 2] << 8) | buff[pos + 3]
+            self.__handlePdu(connection, source, buff[pos + 8:pos + 8 + size])
+            pos += 8 + size
+        del buff[:pos]
+
+    def __handlePdu(self, connection, source, pdu):
+        #pylint: disable=broad-except
+        reply = connection.reply
+        try:
+            self.__notify.getData(GXByteBuffer(pdu), reply)
+            if reply.isMoreData():
+                return
+            self.statistics.notifications += 1
+            records = self.getRecords("%s:%d" % (connection.address, source), reply.value, reply.time)
+        except Exception:
+            self.statistics.errors += 1
+            if self.trace > TraceLevel.WARNING:
+                traceback.print_exc()
+            records = []
+        reply.clear()
+        self.statistics.records += len(records)
+        for it in records:
+            #  Blocks when the sink is behind.
+            self.batcher.put(it)
+
+    def getRecords(self, meter, value, time_):
+        """
+        Returns records of the pushed value.
+        """
+        timestamp = None
+        if time_ is not None and time_.value:
+            timestamp = time_.value.timestamp()
+        if not self.pushObjects or not isinstance(value, list) or len(value) != len(self.pushObjects):
+            return [GXResultRecord(meter, None, 0, value, timestamp=timestamp)]
+        for (ln, index), it in zip(self.pushObjects, value):
+            if ln == "0.0.42.0.0.255" and index == 2:
+                meter = it.decode("ascii", "replace") if isinstance(it, (bytes, bytearray)) else str(it)
+        return [GXResultRecord(meter, ln, index, it, timestamp=timestamp) for (ln, index), it in zip(self.pushObjects, value)]
+
+    @classmethod
+    def __print(cls, records):
+        print("\n".join(str(it) for it in records))
@@ -0,0 +1,36 @@
+import threading
+import time
+
+
+class GXRateLimiter:
+    """
+    Token bucket that limits how many requests are sent in a second.
+
+    Bucket holds at most burst tokens and it is refilled with rate tokens
+    in a second.  Sender waits until there is a token available.
+    """
+    def __init__(self, rate, burst=None):
+        #  Requests in a second.
+        self.rate = float(rate)
+        #  Requests that can be sent at once after idle time.
+        if burst is None:
+            burst = max(1, rate)
+        self.burst = float(burst)
+        self.__tokens = self.burst
+        self.__updated = time.time()
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Wait until request can be sent.
+        """
+        while True:
+            with self.__lock:
+                now = time.time()
+                self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+                self.__updated = now
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                delay = (1 - self.__tokens) / self.rate
+            time.sleep(delay)
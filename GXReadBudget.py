@@ -0,0 +1,142 @@
+import time
+
+
+class GXReadBudget:
+    """
+    Time and traffic budget of one meter session.
+
+    Cost of the next read is estimated in bytes and the time it takes is
+    estimated from the throughput that is measured in the session.  Reads
+    that do not fit to the budget are skipped and they are listed in
+    skipped.  Skipped reads are read in the next poll only if the reader
+    uses the checkpoint.  Budget is checked before each read, so one read
+    that is larger than the estimate can go over the budget.
+
+    Time budget includes the connection setup so the session does not go
+    over its poll slot.  Bytes of the setup are not counted because they
+    can not be skipped.
+    """
+    #  Estimated average size of a profile generic cell and row header in bytes.
+    CELL_SIZE = 8
+    ROW_SIZE = 2
+
+    def __init__(self, seconds=0, bytes_=0):
+        #  Maximum session time in seconds and sent and received bytes.  Not limited if zero.
+        self.seconds = seconds
+        self.bytes = bytes_
+        #  (logicalName, attributeIndex, description) of the skipped reads.
+        self.skipped = []
+        #  Start time of the session.  Budget is used only while the session is running.
+        self.__started = None
+        #  Time when the reads started.  Throughput is measured from it.
+        self.__readsStarted = None
+        self.__bytes = 0
+        self.__requests = 0
+        #  Used time and bytes when the session is stopped.
+        self.__used = (0, 0)
+
+    def start(self, reader, started=None):
+        """
+        Start the session budget when the reads start.  Reader counters are used to measure the traffic.
+
+        Time budget is counted from the given start time of the session.
+        """
+        self.skipped = []
+        self.__readsStarted = time.time()
+        self.__started = started or self.__readsStarted
+        self.__bytes = reader.bytesTx + reader.bytesRx
+        self.__requests = reader.requests
+
+    def stop(self, reader):
+        """
+        Stop the session budget.  Used time and bytes are kept for the report.
+        """
+        if self.__started is not None:
+            self.__used = self.getUsed(reader)
+            self.__started = None
+
+    def getUsed(self, reader):
+        """
+        Returns used time in seconds and used bytes.
+        """
+        if self.__started is None:
+            return self.__used
+        return time.time() - self.__started, reader.bytesTx + reader.bytesRx - self.__bytes
+
+    def __getReadTime(self, bytes_, used):
+        """
+        Returns estimated time in seconds that reading of the given bytes takes.
+        """
+        elapsed = time.time() - self.__readsStarted
+        if used and elapsed > 0:
+            return bytes_ * elapsed / used
+        return 0
+
+    def getRequestSize(self, reader):
+        """
+        Returns average size of request and reply in bytes measured in the session.
+        """
+        requests = reader.requests - self.__requests
+        if requests == 0:
+            return 0
+        return self.getUsed(reader)[1] / requests
+
+    @classmethod
+    def estimateRows(cls, rows, columns):
+        """
+        Returns estimated size of the profile generic rows in bytes.
+        """
+        return rows * (columns * GXReadBudget.CELL_SIZE + GXReadBudget.ROW_SIZE)
+
+    def fits(self, reader, bytes_=None):
+        """
+        Returns True if read of the given size fits to the remaining budget.
+
+        Average request size is used if the size is not given.
+        Everything fits if the session is not running.
+        """
+        if self.__started is None:
+            return True
+        if bytes_ is None:
+            bytes_ = self.getRequestSize(reader)
+        elapsed, used = self.getUsed(reader)
+        if self.bytes and used + bytes_ > self.bytes:
+            return False
+        if self.seconds and elapsed + self.__getReadTime(bytes_, used) > self.seconds:
+            return False
+        return True
+
+    def fitRows(self, reader, rows, rowSize):
+        """
+        Returns how many of the rows of the given size fit to the remaining budget.
+
+        All the rows fit if the session is not running.
+        """
+        if self.__started is None:
+            return rows
+        elapsed, used = self.getUsed(reader)
+        if self.bytes:
+            rows = min(rows, int((self.bytes - used) / rowSize))
+        if self.seconds:
+            if elapsed > self.seconds:
+                return 0
+            needed = self.__getReadTime(rowSize, used)
+            if needed > 0:
+                rows = min(rows, int((self.seconds - elapsed) / needed))
+        return max(0, rows)
+
+    def skip(self, logicalName, attributeIndex, description):
+        """
+        Add skipped read.
+        """
+        self.skipped.append((logicalName, attributeIndex, description))
+
+    def getReport(self, reader):
+        """
+        Returns used budget and skipped reads as text.
+        """
+        elapsed, used = self.getUsed(reader)
+        sb = "Budget: %.1f/%s s %d/%s bytes Skipped: %d" % (elapsed, self.seconds or "-", used, self.bytes or "-", len(self.skipped))
+        for ln, index, description in self.skipped:
+            sb += "\n Skipped " + ln + ":" + str(index) + " " + description
+        return sb
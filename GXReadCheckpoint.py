@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+import time
+
+
+class GXReadCheckpoint:
+    """
+    Progress of readAll sessions that are not finished.
+
+    Checkpoint of each meter holds the objects that are read and the
+    capture time of the last row read from each profile generic.
+    Checkpoints are kept in a JSON file.  Checkpoint is removed when the
+    meter is read to the end.  Checkpoint that is older than maxAge
+    seconds belongs to an earlier poll and it's not resumed.  Old
+    checkpoints are removed from the file when it's written.
+
+    Changes are written at most once in flushInterval seconds and when
+    flush is called, so the file is not written after each object.
+    """
+    def __init__(self, fileName=None, maxAge=3600, flushInterval=10.0):
+        #  Checkpoint file.  Checkpoints are kept only in memory if not set.
+        self.fileName = fileName
+        self.maxAge = maxAge
+        self.flushInterval = flushInterval
+        self.__lock = threading.Lock()
+        self.__values = None
+        #  Are there changes that are not written to the file.
+        self.__dirty = False
+        self.__saved = time.time()
+
+    def __getValues(self):
+        if self.__values is None:
+            self.__values = {}
+            if self.fileName and os.path.exists(self.fileName):
+                with open(self.fileName, "r") as f:
+                    self.__values = json.load(f)
+        return self.__values
+
+    def __save(self):
+        now = time.time()
+        for meter in [k for k, v in self.__values.items() if now - v["started"] > self.maxAge]:
+            del self.__values[meter]
+        self.__dirty = False
+        self.__saved = now
+        if not self.fileName:
+            return
+        path = os.path.dirname(self.fileName)
+        if path and not os.path.exists(path):
+            os.makedirs(path)
+        tmp = self.fileName + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.__values, f)
+        os.replace(tmp, self.fileName)
+
+    def __changed(self):
+        self.__dirty = True
+        if time.time() - self.__saved >= self.flushInterval:
+            self.__save()
+
+    def __find(self, meter):
+        """
+        Returns checkpoint of the meter or None if it's not started or it's too old.
+        """
+        value = self.__getValues().get(meter)
+        if value is None or time.time() - value["started"] > self.maxAge:
+            return None
+        return value
+
+    def __get(self, meter):
+        value = self.__find(meter)
+        if value is None:
+            value = {"started": time.time(), "done": [], "profiles": {}}
+            self.__values[meter] = value
+        return value
+
+    @classmethod
+    def getKey(cls, logicalName, attributeIndex):
+        """
+        Returns checkpoint key of the attribute.
+        """
+        return logicalName + ":" + str(attributeIndex)
+
+    def getDone(self, meter):
+        """
+        Returns keys of the read attributes and profile generics.
+        """
+        with self.__lock:
+            value = self.__find(meter)
+            if value is None:
+                return set()
+            return set(value["done"])
+
+    def setDone(self, meter, keys):
+        """
+        Mark the attributes or profile generics read.
+        """
+        with self.__lock:
+            value = self.__get(meter)
+            value["done"].extend(keys)
+            for it in keys:
+                value["profiles"].pop(it, None)
+            self.__changed()
+
+    def getProfile(self, meter, logicalName):
+        """
+        Returns capture time of the last row read from the profile generic or None.
+        """
+        with self.__lock:
+            value = self.__find(meter)
+            if value is None:
+                return None
+            return value["profiles"].get(logicalName)
+
+    def setProfile(self, meter, logicalName, time_):
+        """
+        Save capture time of the last row read from the profile generic.
+        """
+        with self.__lock:
+            self.__get(meter)["profiles"][logicalName] = time_
+            self.__changed()
+
+    def remove(self, meter):
+        """
+        Remove checkpoint when the meter is read to the end.
+        """
+        with self.__lock:
+            if self.__getValues().pop(meter, None) is not None:
+                self.__changed()
+
+    def flush(self):
+        """
+        Write changed checkpoints to the file.
+        """
+        with self.__lock:
+            if self.__dirty:
+                self.__save()
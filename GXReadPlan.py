@@ -0,0 +1,102 @@
+import collections
+import threading
+from gurux_dlms import GXByteBuffer
+from gurux_dlms.enums import Command
+from gurux_dlms.GetCommandType import GetCommandType
+from gurux_dlms.GXDLMS import GXDLMS
+from gurux_dlms.GXDLMSLNParameters import GXDLMSLNParameters
+from gurux_dlms.internal._GXCommon import _GXCommon
+
+
+class GXReadPlan:
+    """
+    Get requests of the attribute list encoded once.
+
+    Attributes are split to batches and the attribute descriptors of each
+    batch are encoded when the plan is compiled.  Meters of the same model
+    read the same attributes so they share the plan.  Only the framing,
+    invoke ID and ciphering are added per session.
+    """
+    def __init__(self, attributes, batchSize):
+        #  (class id, logical name, attribute index) of the read attributes.
+        self.attributes = attributes
+        self.batchSize = batchSize
+        #  Attribute count and encoded attribute descriptors of each batch.
+        self.requests = []
+        for pos in range(0, len(attributes), batchSize):
+            batch = attributes[pos:pos + batchSize]
+            self.requests.append((len(batch), GXReadPlan.__encode(batch)))
+
+    @classmethod
+    def getKey(cls, list_):
+        """
+        Returns plan key of (item, attributeIndex) list.
+        """
+        return tuple((int(item.objectType), item.logicalName, index) for item, index in list_)
+
+    @classmethod
+    def __encode(cls, batch):
+        bb = GXByteBuffer()
+        if len(batch) != 1:
+            _GXCommon.setObjectCount(len(batch), bb)
+        for objectType, logicalName, index in batch:
+            bb.setUInt16(objectType)
+            bb.set(_GXCommon.logicalNameToBytes(logicalName))
+            bb.setUInt8(index)
+            #  No access selection.
+            bb.setUInt8(0)
+        return bytes(bb.array())
+
+    def getMessages(self, client, pos):
+        """
+        Returns messages of the batch framed for the client session.
+        """
+        settings = client.settings
+        count, data = self.requests[pos]
+        settings.resetBlockIndex()
+        if count == 1:
+            if client.autoIncreaseInvokeID:
+                settings.setInvokeID(int((settings.invokeId + 1) & 0xF))
+            commandType = GetCommandType.NORMAL
+        else:
+            commandType = GetCommandType.WITH_LIST
+        p = GXDLMSLNParameters(settings, 0, Command.GET_REQUEST, commandType, GXByteBuffer(data), None, 0xFF)
+        return GXDLMS.getLnMessages(p)
+
+
+class GXReadPlanCache:
+    """
+    Compiled read plans shared by the readers.
+
+    Least recently used plans are removed when the cache grows over the
+    maximum plan count.
+    """
+    def __init__(self, maxEntries=100):
+        self.maxEntries = maxEntries
+        #  Number of found and compiled plans.
+        self.hits = 0
+        self.misses = 0
+        self.__plans = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    def getPlan(self, list_, batchSize):
+        """
+        Returns compiled plan for (item, attributeIndex) list.
+        """
+        key = (batchSize, GXReadPlan.getKey(list_))
+        with self.__lock:
+            ret = self.__plans.get(key)
+            if ret is not None:
+                self.__plans.move_to_end(key)
+                self.hits += 1
+                return ret
+            self.misses += 1
+        ret = GXReadPlan(key[1], batchSize)
+        with self.__lock:
+            self.__plans[key] = ret
+            while len(self.__plans) > self.maxEntries:
+                self.__plans.popitem(False)
+        return ret
+
+    def __str__(self):
+        return "Plans: %d Hits: %d Misses: %d" % (len(self.__plans), self.hits, self.misses)
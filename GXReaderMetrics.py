@@ -0,0 +1,171 @@
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import threading
+import time
+
+
+class GXSpan:
+    """
+    Timing and traffic of one reader call.
+    """
+    def __init__(self, name, meter):
+        self.name = name
+        #  Media of the meter.
+        self.meter = meter
+        self.started = time.time()
+        #  Wall time in milliseconds.
+        self.elapsed = 0
+        #  Sent requests.  Resends are not counted.
+        self.requests = 0
+        self.bytesTx = 0
+        self.bytesRx = 0
+        #  Resent requests.
+        self.retries = 0
+        #  Time in milliseconds spent decoding the replies.
+        self.decodeTime = 0
+        #  Error if the call failed.
+        self.error = None
+
+    def toDict(self):
+        return {"name": self.name, "meter": self.meter, "started": self.started, "elapsed": self.elapsed,
+                "requests": self.requests, "bytesTx": self.bytesTx, "bytesRx": self.bytesRx, "retries": self.retries,
+                "decodeTime": self.decodeTime, "error": str(self.error) if self.error else None}
+
+    def __str__(self):
+        return "%s %.1f ms requests: %d TX: %d RX: %d retries: %d decode: %.1f ms" % (
+            self.name, self.elapsed, self.requests, self.bytesTx, self.bytesRx, self.retries, self.decodeTime)
+
+
+class GXReaderMetrics:
+    """
+    Collects timing spans of the reader phases and calls.
+
+    Spans are summed by the name and they are given to the listeners when
+    they end.  Metrics are shared by all the readers of the fleet.  If
+    profileDirectory is set each meter session is profiled with cProfile.
+    """
+    #  Counters exported to Prometheus: name, span attribute, scale and help.
+    COUNTERS = [("calls", None, 1, "Number of calls."),
+                ("seconds", "elapsed", 0.001, "Wall time in seconds."),
+                ("requests", "requests", 1, "Sent requests."),
+                ("sent_bytes", "bytesTx", 1, "Sent bytes."),
+                ("received_bytes", "bytesRx", 1, "Received bytes."),
+                ("retries", "retries", 1, "Resent requests."),
+                ("decode_seconds", "decodeTime", 0.001, "Time in seconds spent decoding the replies."),
+                ("errors", None, 1, "Failed calls.")]
+
+    def __init__(self):
+        #  Callbacks that are called with each ended span.
+        self.listeners = []
+        #  Directory where cProfile statistics of each session are saved.  Sessions are not profiled if not set.
+        self.profileDirectory = None
+        self.__totals = {}
+        self.__lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, reader, name):
+        """
+        Measure the reader call.
+        """
+        ret = GXSpan(name, str(reader.media))
+        requests, bytesTx, bytesRx = reader.requests, reader.bytesTx, reader.bytesRx
+        retries, decodeTime = reader.retries, reader.decodeTime
+        start = time.perf_counter()
+        try:
+            yield ret
+        except Exception as ex:
+            ret.error = ex
+            raise
+        finally:
+            ret.elapsed = 1000 * (time.perf_counter() - start)
+            ret.requests = reader.requests - requests
+            ret.bytesTx = reader.bytesTx - bytesTx
+            ret.bytesRx = reader.bytesRx - bytesRx
+            ret.retries = reader.retries - retries
+            ret.decodeTime = 1000 * (reader.decodeTime - decodeTime)
+            self.add(ret)
+
+    def add(self, span):
+        with self.__lock:
+            total = self.__totals.get(span.name)
+            if total is None:
+                total = self.__totals[span.name] = {"calls": 0, "elapsed": 0, "requests": 0, "bytesTx": 0, "bytesRx": 0,
+                                                    "retries": 0, "decodeTime": 0, "errors": 0}
+            total["calls"] += 1
+            total["elapsed"] += span.elapsed
+            total["requests"] += span.requests
+            total["bytesTx"] += span.bytesTx
+            total["bytesRx"] += span.bytesRx
+            total["retries"] += span.retries
+            total["decodeTime"] += span.decodeTime
+            if span.error:
+                total["errors"] += 1
+        for it in self.listeners:
+            it(span)
+
+    @contextlib.contextmanager
+    def profile(self, reader):
+        """
+        Profile the meter session with cProfile if the profile directory is set.
+        """
+        #pylint: disable=broad-except
+        profiler = None
+        if self.profileDirectory:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                #  Other profiler is active.
+                profiler = None
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+                if not os.path.exists(self.profileDirectory):
+                    os.makedirs(self.profileDirectory)
+                name = "".join(c if c.isalnum() else "_" for c in str(reader.media))
+                profiler.dump_stats(os.path.join(self.profileDirectory, name + "_" +
+                                                 datetime.datetime.now().strftime("%Y%m%d%H%M%S") + ".prof"))
+
+    def getTotals(self):
+        """
+        Returns the summed counters of each span name.
+        """
+        with self.__lock:
+            return {k: dict(v) for k, v in self.__totals.items()}
+
+    def toJson(self):
+        return json.dumps(self.getTotals(), indent=2, sort_keys=True)
+
+    def toPrometheus(self):
+        """
+        Returns the metrics in Prometheus text exposition format.
+        """
+        totals = self.getTotals()
+        lines = []
+        for name, attribute, scale, description in GXReaderMetrics.COUNTERS:
+            metric = "dlms_reader_" + name + "_total"
+            lines.append("# HELP " + metric + " " + description)
+            lines.append("# TYPE " + metric + " counter")
+            for phase in sorted(totals):
+                value = totals[phase][attribute or name]
+                lines.append('%s{phase="%s"} %s' % (metric, phase, repr(value * scale)))
+        return "\n".join(lines) + "\n"
+
+    def save(self, fileName):
+        """
+        Save the metrics to the file.  Prometheus text format is used if the file extension is .prom.
+        """
+        if fileName.endswith(".prom"):
+            data = self.toPrometheus()
+        else:
+            data = self.toJson()
+        #  File is replaced at once so the scraper does not read half written file.
+        tmp = fileName + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, fileName)
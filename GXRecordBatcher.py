@@ -0,0 +1,97 @@
+import queue
+import threading
+import time
+import traceback
+
+
+class GXRecordBatcher:
+    """
+    Gives records to the sink in batches from a background thread.
+
+    Batch is given when batchSize records are collected or flushInterval
+    seconds have passed since the first record of the batch.  At most
+    maxPending records are queued.  Producer is blocked when the queue is
+    full so a slow sink slows down the producers instead of growing the
+    memory.
+    """
+    def __init__(self, sink, batchSize=100, flushInterval=1.0, maxPending=10000):
+        #  Callable that is called with a list of records.
+        self.sink = sink
+        self.batchSize = batchSize
+        self.flushInterval = flushInterval
+        #  Number of given batches and records and the time in seconds producers have been blocked.
+        self.batches = 0
+        self.records = 0
+        self.blockedTime = 0
+        self.__queue = queue.Queue(maxPending)
+        self.__thread = None
+        self.__closing = False
+
+    def start(self):
+        self.__closing = False
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def put(self, record, timeout=None):
+        """
+        Add the record to the next batch.  Blocks while the queue is full.
+
+        Returns False if the record was not queued before the timeout.
+        """
+        try:
+            self.__queue.put_nowait(record)
+            return True
+        except queue.Full:
+            pass
+        start = time.time()
+        try:
+            self.__queue.put(record, timeout=timeout)
+            return True
+        except queue.Full:
+            return False
+        finally:
+            self.blockedTime += time.time() - start
+
+    def getPending(self):
+        """
+        Returns the number of queued records.
+        """
+        return self.__queue.qsize()
+
+    def close(self):
+        """
+        Give the queued records to the sink and stop the thread.
+        """
+        if self.__thread:
+            self.__closing = True
+            self.__thread.join()
+            self.__thread = None
+
+    def __run(self):
+        #pylint: disable=broad-except
+        batch = []
+        deadline = 0
+        while True:
+            try:
+                if batch:
+                    timeout = max(0, deadline - time.time())
+                else:
+                    timeout = 0.1
+                batch.append(self.__queue.get(timeout=timeout))
+                if len(batch) == 1:
+                    deadline = time.time() + self.flushInterval
+            except queue.Empty:
+                if not batch:
+                    if self.__closing:
+                        return
+                    continue
+            #  Flush interval is checked also when the records keep coming.
+            if len(batch) < self.batchSize and time.time() < deadline and not (self.__closing and self.__queue.empty()):
+                continue
+            try:
+                self.sink(batch)
+            except Exception:
+                traceback.print_exc()
+            self.batches += 1
+            self.records += len(batch)
+            batch = []
@@ -0,0 +1,181 @@
+import csv
+import datetime
+import enum
+import json
+import os
+import sqlite3
+import time
+from gurux_dlms import GXDateTime
+from GXRecordBatcher import GXRecordBatcher
+
+
+class GXResultRecord:
+    """
+    Value read or received from the meter.
+
+    Values are kept as they are decoded.  They are formatted by the writer
+    when the batch is written.
+    """
+    def __init__(self, meter, logicalName, attributeIndex, value, scaler=None, unit=None, timestamp=None, status=None):
+        #  Logical device name of the meter or the media if it's not known.
+        self.meter = meter
+        #  OBIS code and attribute index.  Logical name is None if the pushed object is not known.
+        self.logicalName = logicalName
+        self.attributeIndex = attributeIndex
+        self.value = value
+        #  Scaler and unit of the register value.  Scaler is given only if the value is not scaled.
+        #  Values read from the registers are already scaled.
+        self.scaler = scaler
+        self.unit = unit
+        #  Capture time of the value in seconds since epoch.  Read time is used if the meter did not give it.
+        self.timestamp = timestamp or time.time()
+        #  Error if the value was failed to read.  None if the value was read.
+        self.status = status
+
+    @classmethod
+    def formatValue(cls, value):
+        """
+        Returns the value in JSON compatible types.
+        """
+        if isinstance(value, (bytes, bytearray)):
+            return value.hex()
+        if isinstance(value, GXDateTime):
+            return value.value.isoformat() if value.value else None
+        if isinstance(value, datetime.datetime):
+            return value.isoformat()
+        if isinstance(value, (list, tuple)):
+            return [GXResultRecord.formatValue(it) for it in value]
+        if isinstance(value, enum.Enum):
+            return value.name
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, int):
+            return int(value)
+        if isinstance(value, float):
+            return float(value)
+        if value is None or isinstance(value, str):
+            return value
+        return str(value)
+
+    def toDict(self):
+        return {"meter": self.meter, "logicalName": self.logicalName, "attributeIndex": self.attributeIndex,
+                "value": GXResultRecord.formatValue(self.value), "scaler": self.scaler,
+                "unit": GXResultRecord.formatValue(self.unit),
+                "timestamp": datetime.datetime.fromtimestamp(self.timestamp, datetime.timezone.utc).isoformat(),
+                "status": self.status or "OK"}
+
+    def __str__(self):
+        if self.logicalName is None:
+            return "%s %s" % (self.meter, GXResultRecord.formatValue(self.value))
+        if self.status:
+            return "%s %s:%d Error! %s" % (self.meter, self.logicalName, self.attributeIndex, self.status)
+        return "%s %s:%d %s" % (self.meter, self.logicalName, self.attributeIndex, GXResultRecord.formatValue(self.value))
+
+
+class GXJsonLinesWriter:
+    """
+    Writes each record as a JSON object on its own line.
+    """
+    def __init__(self, fileName):
+        self.__file = open(fileName, "a")
+
+    def write(self, records):
+        self.__file.write("".join(json.dumps(it.toDict()) + "\n" for it in records))
+        self.__file.flush()
+
+    def close(self):
+        self.__file.close()
+
+
+class GXCsvWriter:
+    """
+    Writes the records as CSV rows.  Header is written to a new file.
+    """
+    COLUMNS = ["meter", "logicalName", "attributeIndex", "value", "scaler", "unit", "timestamp", "status"]
+
+    def __init__(self, fileName):
+        header = not os.path.exists(fileName) or os.path.getsize(fileName) == 0
+        self.__file = open(fileName, "a", newline="")
+        self.__writer = csv.writer(self.__file)
+        if header:
+            self.__writer.writerow(GXCsvWriter.COLUMNS)
+
+    def write(self, records):
+        rows = []
+        for it in records:
+            values = it.toDict()
+            if isinstance(values["value"], list):
+                values["value"] = json.dumps(values["value"])
+            rows.append([values[k] for k in GXCsvWriter.COLUMNS])
+        self.__writer.writerows(rows)
+        self.__file.flush()
+
+    def close(self):
+        self.__file.close()
+
+
+class GXSqliteWriter:
+    """
+    Inserts the records to the results table of SQLite database.  Each batch is one transaction.
+    """
+    def __init__(self, fileName):
+        #  Connection is created by the caller and used by the batcher thread.
+        self.__db = sqlite3.connect(fileName, check_same_thread=False)
+        self.__db.execute("CREATE TABLE IF NOT EXISTS results(meter TEXT, logicalName TEXT, attributeIndex INTEGER, "
+                          "value, scaler REAL, unit TEXT, timestamp REAL, status TEXT)")
+        self.__db.commit()
+
+    def write(self, records):
+        rows = []
+        for it in records:
+            value = GXResultRecord.formatValue(it.value)
+            if isinstance(value, list):
+                value = json.dumps(value)
+            rows.append((it.meter, it.logicalName, it.attributeIndex, value, it.scaler,
+                         GXResultRecord.formatValue(it.unit), it.timestamp, it.status or "OK"))
+        with self.__db:
+            self.__db.executemany("INSERT INTO results VALUES(?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def close(self):
+        self.__db.close()
+
+
+class GXResultSink:
+    """
+    Collects result records and writes them in batches.
+
+    Records are formatted and written by the batcher thread so the reader
+    only queues them.  Batch is written when it's full or flushInterval
+    seconds old.
+    """
+    def __init__(self, writer, batchSize=1000, flushInterval=1.0):
+        self.writer = writer
+        self.batcher = GXRecordBatcher(writer.write, batchSize, flushInterval)
+        self.batcher.start()
+
+    @classmethod
+    def open(cls, fileName):
+        """
+        Open result sink for the file.  Writer is selected by the extension: .csv, .db or .sqlite and JSON lines otherwise.
+        """
+        ext = os.path.splitext(fileName)[1].lower()
+        if ext == ".csv":
+            writer = GXCsvWriter(fileName)
+        elif ext in (".db", ".sqlite"):
+            writer = GXSqliteWriter(fileName)
+        else:
+            writer = GXJsonLinesWriter(fileName)
+        return GXResultSink(writer)
+
+    def add(self, record):
+        self.batcher.put(record)
+
+    def close(self):
+        """
+        Write the queued records and close the writer.
+        """
+        self.batcher.close()
+        self.writer.close()
+
+    def __str__(self):
+        return "Records: %d Batches: %d" % (self.batcher.records, self.batcher.batches)
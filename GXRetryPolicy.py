@@ -0,0 +1,97 @@
+import time
+
+
+class GXRetryPolicy:
+    """
+    Receive timeout and retry policy of one meter connection.
+
+    Receive timeout is derived from the measured round trip times like the
+    TCP retransmission timeout (RFC 6298).  Timeout is doubled after each
+    resend of the request.  If the meter has not answered to maxFailures
+    requests in a row the circuit is opened and the requests fail without
+    sending until resetTime has elapsed.
+    """
+    #  Gain of the smoothed round trip time.
+    ALPHA = 0.125
+    #  Gain of the round trip time variation.
+    BETA = 0.25
+
+    def __init__(self, attempts=3, backoff=2.0, minTimeout=500, maxTimeout=30000, maxFailures=3, resetTime=60):
+        #  How many times request is sent before it fails.
+        self.attempts = attempts
+        #  Receive timeout is multiplied with this after each resend.
+        self.backoff = backoff
+        #  Minimum and maximum receive timeout in milliseconds.
+        self.minTimeout = minTimeout
+        self.maxTimeout = maxTimeout
+        #  Failed requests in a row before the circuit is opened.  Circuit is never opened if zero.
+        self.maxFailures = maxFailures
+        #  Time in seconds after one request is tried again when the circuit is open.
+        self.resetTime = resetTime
+        #  Smoothed round trip time and its variation in milliseconds.
+        self.srtt = None
+        self.rttvar = None
+        #  Receive timeout in milliseconds.  None until the first round trip is measured.
+        self.timeout = None
+        #  Failed requests in a row.
+        self.failures = 0
+        #  Time when the circuit was opened.
+        self.openedAt = 0
+
+    def getTimeout(self, initialTimeout):
+        """
+        Returns receive timeout in milliseconds.  Initial timeout is used until the round trip time is measured.
+        """
+        if self.timeout is None:
+            return initialTimeout
+        return self.timeout
+
+    def addSample(self, rtt):
+        """
+        Update receive timeout with measured round trip time in milliseconds.
+        Round trip of a resent request must not be added.
+        """
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - GXRetryPolicy.BETA) * self.rttvar + GXRetryPolicy.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - GXRetryPolicy.ALPHA) * self.srtt + GXRetryPolicy.ALPHA * rtt
+        self.timeout = int(min(self.maxTimeout, max(self.minTimeout, self.srtt + 4 * self.rttvar)))
+
+    def getRoundTrip(self):
+        """
+        Returns smoothed round trip time with four variations in milliseconds or None if it's not measured.
+        """
+        if self.srtt is None:
+            return None
+        return self.srtt + 4 * self.rttvar
+
+    def backOff(self, timeout):
+        """
+        Returns receive timeout for the resend.
+        """
+        return int(min(self.maxTimeout, timeout * self.backoff))
+
+    def isOpen(self):
+        """
+        Returns True if requests are not sent to the meter.
+        """
+        if not self.maxFailures or self.failures < self.maxFailures:
+            return False
+        #  One request is tried after reset time.
+        return time.time() - self.openedAt < self.resetTime
+
+    def succeeded(self, timeout=None):
+        """
+        Reset failures.  Timeout that received the reply of the resent
+        request is kept until the round trip is measured again.
+        """
+        self.failures = 0
+        if timeout is not None:
+            self.timeout = timeout
+
+    def failed(self):
+        self.failures += 1
+        if self.maxFailures and self.failures >= self.maxFailures:
+            self.openedAt = time.time()
@@ -0,0 +1,160 @@
+import collections
+import contextlib
+import threading
+import time
+
+
+class GXFairLock:
+    """
+    Lock that is given to the waiting threads in the order they asked it.
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__locked = False
+        self.__waiters = collections.deque()
+
+    def acquire(self):
+        with self.__lock:
+            if not self.__locked:
+                self.__locked = True
+                return
+            event = threading.Event()
+            self.__waiters.append(event)
+        #  Lock is handed over by the releasing thread.
+        event.wait()
+
+    def release(self):
+        with self.__lock:
+            if self.__waiters:
+                self.__waiters.popleft().set()
+            else:
+                self.__locked = False
+
+
+class GXBusStatistics:
+    """
+    Usage of the shared serial bus.
+    """
+    def __init__(self):
+        self.started = time.time()
+        #  Request-reply exchanges.
+        self.requests = 0
+        #  Time in seconds the bus has been reserved for the exchanges.
+        self.busyTime = 0
+        #  Time in seconds the sessions have waited for their turn.
+        self.waitTime = 0
+
+    def getUtilization(self):
+        """
+        Returns how many percent of the time the bus has been in use.
+        """
+        elapsed = time.time() - self.started
+        if elapsed <= 0:
+            return 0
+        return 100.0 * self.busyTime / elapsed
+
+    def __str__(self):
+        wait = 0
+        if self.requests:
+            wait = 1000.0 * self.waitTime / self.requests
+        return "Requests: %d Utilization: %.1f %% Average wait: %.1f ms" % (self.requests, self.getUtilization(), wait)
+
+
+class GXBusMedia:
+    """
+    Media of one meter on the shared serial bus.
+
+    Each exchange reserves the bus from the send until the reply is
+    received.  Closing the media ends the session but the port is left open.
+    """
+    def __init__(self, bus, name):
+        self.bus = bus
+        self.name = name
+        self.eop = None
+        self.__open = False
+
+    def open(self):
+        self.bus.open()
+        self.__open = True
+
+    def close(self):
+        self.__open = False
+
+    def isOpen(self):
+        return self.__open and self.bus.isOpen()
+
+    def send(self, data, receiver=None):
+        self.bus.media.send(data, receiver)
+
+    def receive(self, args):
+        return self.bus.media.receive(args)
+
+    def resetSynchronousBuffer(self):
+        self.bus.media.resetSynchronousBuffer()
+
+    def getSynchronous(self):
+        return self.bus.exchange(self)
+
+    def __str__(self):
+        return str(self.bus.media) + " " + self.name
+
+
+class GXSerialBus:
+    """
+    Serial port that is shared by multidrop meters with different HDLC addresses.
+
+    Port is kept open and the sessions of the meters take turns on the
+    port.  Turns are given in the order they are asked so one session can
+    not starve the others.
+    """
+    def __init__(self, media):
+        self.media = media
+        self.statistics = GXBusStatistics()
+        self.__turn = GXFairLock()
+        self.__lock = threading.Lock()
+        #  Session that made the last exchange.
+        self.__owner = None
+
+    def getMedia(self, name):
+        """
+        Returns media for a meter session on the bus.
+        """
+        return GXBusMedia(self, name)
+
+    def open(self):
+        with self.__lock:
+            if not self.media.isOpen():
+                self.media.open()
+
+    def isOpen(self):
+        return bool(self.media.isOpen())
+
+    def close(self):
+        with self.__lock:
+            self.media.close()
+
+    @contextlib.contextmanager
+    def exchange(self, session):
+        """
+        Reserve the bus for one request and reply of the session.
+        """
+        started = time.time()
+        self.__turn.acquire()
+        acquired = time.time()
+        try:
+            if self.__owner is not session:
+                #  Late reply to the previous session is not given to this one.
+                self.media.resetSynchronousBuffer()
+                self.__owner = session
+            self.media.eop = session.eop
+            with self.media.getSynchronous():
+                yield
+        finally:
+            now = time.time()
+            self.statistics.requests += 1
+            self.statistics.busyTime += now - acquired
+            self.statistics.waitTime += acquired - started
+            self.__turn.release()
+
+    def __str__(self):
+        return str(self.media) + " " + str(self.statistics)
@@ -0,0 +1,90 @@
+import threading
+import time
+import traceback
+from gurux_common.enums import TraceLevel
+
+
+class GXSessionManager:
+    """
+    Keeps meter associations open between the polls.
+
+    Readers are stored by key.  Background thread sends keep-alive to the
+    meters that have been idle for keepAliveInterval seconds so the meter
+    does not close the association because of inactivity.  A reader that
+    is in use is skipped.
+    """
+    def __init__(self, keepAliveInterval=30, trace=TraceLevel.ERROR):
+        # Idle time in seconds after keep-alive is sent.
+        self.keepAliveInterval = keepAliveInterval
+        self.trace = trace
+        self.__sessions = {}
+        self.__lock = threading.Lock()
+        self.__closing = threading.Event()
+        self.__thread = None
+
+    def get(self, key):
+        """
+        Returns reader of the session or None if the session is not open.
+        """
+        with self.__lock:
+            return self.__sessions.get(key)
+
+    def add(self, key, reader):
+        """
+        Add reader to the sessions.  Reader is set persistent.
+        """
+        reader.persistent = True
+        with self.__lock:
+            self.__sessions[key] = reader
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, name="GXSessionManager")
+                self.__thread.daemon = True
+                self.__thread.start()
+
+    def close(self):
+        """
+        Stop sending keep-alive and close all the sessions.
+        """
+        self.__closing.set()
+        if self.__thread:
+            self.__thread.join()
+            self.__thread = None
+        with self.__lock:
+            readers = list(self.__sessions.values())
+            self.__sessions.clear()
+        for it in readers:
+            self.__closeReader(it)
+
+    @classmethod
+    def __closeReader(cls, reader):
+        #pylint: disable=broad-except
+        with reader.lock:
+            try:
+                reader.close()
+            except Exception:
+                traceback.print_exc()
+
+    def __run(self):
+        #pylint: disable=broad-except
+        while not self.__closing.wait(1):
+            with self.__lock:
+                readers = list(self.__sessions.values())
+            for it in readers:
+                if self.__closing.is_set():
+                    break
+                if not it.isAssociated() or time.time() - it.lastActivity < self.keepAliveInterval:
+                    continue
+                #  Reader is polled at the moment.
+                if not it.lock.acquire(False):
+                    continue
+                try:
+                    it.keepAlive()
+                except Exception as ex:
+                    if self.trace > TraceLevel.OFF:
+                        print("Keep-alive failed. " + str(ex))
+                    try:
+                        it.close()
+                    except Exception:
+                        pass
+                finally:
+                    it.lock.release()
@@ -1,7 +1,8 @@
-from gurux_dlms.enums import InterfaceType, Authentication
+import re
+from gurux_dlms.enums import InterfaceType, Authentication, Conformance, ObjectType
 from gurux_dlms import GXDLMSClient
 from gurux_common.enums import TraceLevel
-from gurux_common.io import Parity
+from gurux_common.io import Parity, StopBits
 from gurux_net.enums import NetworkType
 from gurux_net import GXNet
 from gurux_serial.GXSerial import GXSerial
@@ -14,11 +15,75 @@ class GXSettings:
     def __init__(self):
         self.media = None
         self.trace = TraceLevel.INFO
+        #  Log file trace level.  Same as the trace level if not given.
+        self.logLevel = None
         self.iec = False
+        #  Time in milliseconds that the meter is given to change the baud rate after IEC sign-on.
+        self.iecSettleTime = 500
+        #  Negotiated baud rate is tried before the IEC sign-on.
+        self.iecSkipSignOn = False
+        #  File where reader metrics are saved after each poll.  Prometheus text format is used if extension is .prom.
+        self.metricsFile = None
+        #  Directory where cProfile statistics of each meter session are saved.
+        self.profileStatsDirectory = None
+        #  Number of worker processes that decode profile generic rows.  Rows are decoded in the reader if zero.
+        self.decoderProcesses = 0
         self.client = GXDLMSClient(True)
-        serverAddress = self.client.getServerAddress(53120382)
         #  Objects to read.
         self.readObjects = []
+        #  Maximum number of attributes read with one request.
+        self.maxReferences = 10
+        #  File where read values are written.  Values are written to the trace if not given.
+        self.outputFile = None
+        #  TCP port where pushed data notifications are listened.  Meters are not read if given.
+        self.pushPort = 0
+        #  File of OBIS code interface classes.  Objects of known class are read without the association view.
+        self.obisIndexFile = None
+        #  File of meter targets for the fleet mode.
+        self.fleetFile = None
+        #  Number of meters read at the same time in the fleet mode.
+        self.concurrency = 16
+        #  Maximum read time of one meter in seconds in the fleet mode.
+        self.meterTimeout = 120
+        #  Association view cache directory.
+        self.cacheDirectory = None
+        #  Maximum number of cached association views.
+        self.cacheSize = 1000
+        #  Read association view from the meter and replace cached one.
+        self.invalidateCache = False
+        #  Time in seconds after cached scaler and unit is read again from the meter.
+        self.scalerTtl = 30 * 24 * 3600
+        #  Profile generic watermark file.  Only new profile rows are read if given.
+        self.watermarkFile = None
+        #  Checkpoint file.  Interrupted read is continued from the checkpoint if given.
+        self.checkpointFile = None
+        #  Maximum time in seconds and sent and received bytes of one meter session.  Not limited if zero.
+        self.timeBudget = 0
+        self.byteBudget = 0
+        #  Number of profile rows read with one request.
+        self.rowsPerRequest = 100
+        #  Maximum number of profile rows read from one profile in one poll.
+        self.maxRowsPerPoll = 10000
+        #  Directory where profile generic rows are exported.
+        self.profileDirectory = None
+        #  Poll interval in seconds.  Meters are read once if zero.
+        self.pollInterval = 0
+        #  Idle time in seconds after keep-alive is sent to the meter between the polls.
+        self.keepAliveInterval = 30
+        #  General Block Transfer window size.  GBT is not proposed to the meter if zero.
+        self.gbtWindowSize = 0
+        #  How many times request is sent before it fails.
+        self.retryAttempts = 3
+        #  Maximum receive timeout in milliseconds.  Timeout is adapted to the measured round trip time.
+        self.maxTimeout = 30000
+        #  Failed requests in a row after the meter is given up.  Meter is never given up if zero.
+        self.maxFailures = 3
+        #  Poll schedule file.  Only items that are due are read if given.
+        self.scheduleFile = None
+        #  Maximum requests in a second to one port.  Not limited if zero.
+        self.portRate = 0
+        #  Maximum requests in a second to all the meters in the fleet mode.  Not limited if zero.
+        self.fleetRate = 0
 
     #
     # Show help.
@@ -29,8 +94,10 @@ class GXSettings:
         print("GuruxDlmsSample -h [Meter IP Address] -p [Meter Port No] -c 16 -s 1 -r SN")
         print(" -h \t host name or IP address.")
         print(" -p \t port number or name (Example: 1000).")
-        print(" -S \t serial port.")
+        print(" -S \t serial port. (Example: /dev/ttyUSB0:9600:8None1)")
         print(" -i IEC is a start protocol.")
+        print(" -e \t Time in ms that the meter is given to change the baud rate after IEC sign-on. (Default: 500)")
+        print(" -k \t Skip IEC sign-on when the meter still answers with the negotiated baud rate.")
         print(" -a \t Authentication (None, Low, High).")
         print(" -P \t Password for authentication.")
         print(" -c \t Client address. (Default: 16)")
@@ -39,7 +106,41 @@ class GXSettings:
         print(" -r [sn, sn]\t Short name or Logican Name (default) referencing is used.")
         print(" -w WRAPPER profile is used. HDLC is default.")
         print(" -t [Error, Warning, Info, Verbose] Trace messages.")
+        print(" -l [Off, Error, Warning, Info, Verbose] Trace messages written to logFile.txt. (Default: same as -t)")
         print(" -g \"0.0.1.0.0.255:1; 0.0.1.0.0.255:2\" Get selected object(s) with given attribute index.")
+        print("    \t Interface class can be given after the attribute index. Example: 1.0.1.8.0.255:2:Register")
+        print(" -f \t Output file of the read values. Use .csv for CSV, .db for SQLite and JSON lines otherwise.")
+        print(" -b \t Listen data notifications pushed by the meters in the given TCP port. -g gives the push object list.")
+        print(" -x \t OBIS code interface class index file. Classes learned from the association views are saved to it.")
+        print(" -R \t Maximum number of attributes the meter accepts in one request. (Default: 10)")
+        print(" -F \t Fleet file. Each line contains parameters of one meter. Example: -h 10.0.0.1 -p 4059 -w")
+        print("    \t Meters with the same serial port (-S) share the port and they are read in turns.")
+        print(" -j \t Number of meters read concurrently in the fleet mode. (Default: 16)")
+        print(" -T \t Maximum read time of one meter in seconds in the fleet mode. (Default: 120)")
+        print(" -C \t Association view cache directory. Association view is read from the meter if not given.")
+        print(" -L \t Maximum number of cached association views. (Default: 1000)")
+        print(" -X \t Read association view, scalers and units from the meter and replace the cached ones.")
+        print(" -E \t Time in seconds after cached scaler and unit is read again from the meter. (Default: 2592000)")
+        print(" -W \t Profile generic watermark file. Only rows captured after the last poll are read.")
+        print(" -J \t Checkpoint file. Read continues from the last read object after the connection is lost.")
+        print(" -d \t Time budget of one meter session in seconds. Registers are read first and reads that do not fit are skipped.")
+        print("    \t Bytes of the connection setup are not counted. Skipped reads are read in the next poll only if the checkpoint (-J) is used.")
+        print(" -v \t Byte budget of one meter session. Sent and received bytes are counted.")
+        print(" -B \t Number of profile rows read with one request. (Default: 100)")
+        print(" -U \t Maximum number of profile rows read from one profile in one poll. (Default: 10000)")
+        print(" -D \t Directory where profile generic rows are exported as binary column files.")
+        print(" -I \t Poll interval in seconds. Associations are kept open between the polls.")
+        print(" -K \t Idle time in seconds after keep-alive is sent between the polls. (Default: 30)")
+        print(" -G \t General Block Transfer window size (1-63). Block transfer is used if the meter does not support GBT.")
+        print(" -N \t How many times request is sent before it fails. (Default: 3)")
+        print(" -M \t Maximum receive timeout in ms. Timeout is adapted to the measured round trip time. (Default: 30000)")
+        print(" -Q \t Failed requests in a row after the meter is given up. 0 never gives up. (Default: 3)")
+        print(" -m \t File where timing and traffic of each reader phase are saved after each poll. Use .prom for Prometheus.")
+        print(" -z \t Directory where cProfile statistics of each meter session are saved.")
+        print(" -u \t Number of worker processes that decode profile generic rows. (Default: 0, rows are decoded by the reader)")
+        print(" -O \t Poll schedule file. Each line contains logical name:attribute index, interval in seconds and priority.")
+        print(" -y \t Maximum requests in a second to one port. (Default: not limited)")
+        print(" -Y \t Maximum requests in a second to all the meters in the fleet mode. (Default: not limited)")
         print("------------------------------------------------------")
         print("Available serial ports:")
         print(GXSerial.getPortNames())
@@ -78,8 +179,36 @@ class GXSettings:
         return list_
 
 
+    @classmethod
+    def __getTraceLevel(cls, value):
+        if value == "Off":
+            return TraceLevel.OFF
+        if value == "Error":
+            return TraceLevel.ERROR
+        if value == "Warning":
+            return TraceLevel.WARNING
+        if value == "Info":
+            return TraceLevel.INFO
+        if value == "Verbose":
+            return TraceLevel.VERBOSE
+        raise ValueError("Invalid trace level(Off, Error, Warning, Info, Verbose).")
+
+    @classmethod
+    def __getObjectType(cls, value):
+        """
+        Returns interface class from the class id or name.  Example: 3 or Register.
+        """
+        if value.isdigit():
+            return ObjectType(int(value))
+        name = value.upper().replace(" ", "_")
+        if name not in ObjectType.__members__:
+            name = "".join("_" + c if c.isupper() and i else c for i, c in enumerate(value)).upper()
+        if name not in ObjectType.__members__:
+            raise ValueError("Invalid interface class: " + value)
+        return ObjectType[name]
+
     def getParameters(self, args):
-        parameters = GXSettings.__getParameters(args, "h:p:c:s:r:it:a:p:wP:g:S:")
+        parameters = GXSettings.__getParameters(args, "h:p:c:s:r:it:a:p:wP:g:S:R:F:j:T:C:L:XE:W:B:U:D:l:I:K:G:N:M:Q:O:y:Y:e:km:z:u:x:b:f:J:d:v:")
         for it in parameters:
             if it.tag == 'w':
                 self.client.interfaceType = InterfaceType.WRAPPER
@@ -98,18 +227,10 @@ class GXSettings:
                     self.media.hostName = it.value
             elif it.tag == 't':
                 #  Trace.
-                if it.value == "Off":
-                    self.trace = TraceLevel.OFF
-                elif it.value == "Error":
-                    self.trace = TraceLevel.ERROR
-                elif it.value == "Warning":
-                    self.trace = TraceLevel.WARNING
-                elif it.value == "Info":
-                    self.trace = TraceLevel.INFO
-                elif it.value == "Verbose":
-                    self.trace = TraceLevel.VERBOSE
-                else:
-                    raise ValueError("Invalid trace level(Off, Error, Warning, Info, Verbose).")
+                self.trace = self.__getTraceLevel(it.value)
+            elif it.tag == 'l':
+                #  Log file trace level.
+                self.logLevel = self.__getTraceLevel(it.value)
             elif it.tag == 'p':
                 #  Port.
                 if not self.media:
@@ -124,11 +245,22 @@ class GXSettings:
                 self.iec = True
             elif it.tag == 'g':
                 #  Get (read) selected objects.
-                for o in it.value.split(";,"):
+                for o in re.split("[;,]", it.value):
+                    if not o.strip():
+                        continue
                     tmp = o.split(":")
-                    if len(tmp) != 2:
+                    if len(tmp) not in (2, 3):
                         raise ValueError("Invalid Logical name or attribute index.")
-                    self.readObjects.append((tmp[0].strip(), int(tmp[1].strip())))
+                    objectType = ObjectType.NONE
+                    if len(tmp) == 3:
+                        objectType = self.__getObjectType(tmp[2].strip())
+                    self.readObjects.append((tmp[0].strip(), int(tmp[1].strip()), objectType))
+            elif it.tag == 'x':
+                self.obisIndexFile = it.value
+            elif it.tag == 'b':
+                self.pushPort = int(it.value)
+            elif it.tag == 'f':
+                self.outputFile = it.value
             elif it.tag == 'S':
                 #Serial Port
                 self.media = GXSerial(None)
@@ -137,8 +269,96 @@ class GXSettings:
                 if len(tmp) > 1:
                     self.media.baudRate = int(tmp[1])
                     self.media.dataBits = int(tmp[2][0: 1])
-                    self.media.parity = Parity(tmp[2][1: len(tmp[2]) - 2] .Substring(1, tmp[2].Length - 2))
-                    self.media.stopBits = int(tmp[2][len(tmp[2]) - 1:])
+                    self.media.parity = Parity[tmp[2][1: len(tmp[2]) - 1].upper()]
+                    self.media.stopBits = StopBits.TWO if tmp[2][len(tmp[2]) - 1:] == "2" else StopBits.ONE
+            elif it.tag == 'R':
+                self.maxReferences = int(it.value)
+                if self.maxReferences < 1:
+                    raise ValueError("Invalid maximum references.")
+            elif it.tag == 'F':
+                self.fleetFile = it.value
+            elif it.tag == 'j':
+                self.concurrency = int(it.value)
+                if self.concurrency < 1:
+                    raise ValueError("Invalid concurrency.")
+            elif it.tag == 'T':
+                self.meterTimeout = int(it.value)
+            elif it.tag == 'C':
+                self.cacheDirectory = it.value
+            elif it.tag == 'L':
+                self.cacheSize = int(it.value)
+            elif it.tag == 'X':
+                self.invalidateCache = True
+            elif it.tag == 'E':
+                self.scalerTtl = int(it.value)
+            elif it.tag == 'W':
+                self.watermarkFile = it.value
+            elif it.tag == 'J':
+                self.checkpointFile = it.value
+            elif it.tag == 'd':
+                self.timeBudget = float(it.value)
+                if self.timeBudget < 0:
+                    raise ValueError("Invalid time budget.")
+            elif it.tag == 'v':
+                self.byteBudget = int(it.value)
+                if self.byteBudget < 0:
+                    raise ValueError("Invalid byte budget.")
+            elif it.tag == 'B':
+                self.rowsPerRequest = int(it.value)
+                if self.rowsPerRequest < 1:
+                    raise ValueError("Invalid rows per request.")
+            elif it.tag == 'U':
+                self.maxRowsPerPoll = int(it.value)
+                if self.maxRowsPerPoll < 1:
+                    raise ValueError("Invalid maximum rows per poll.")
+            elif it.tag == 'D':
+                self.profileDirectory = it.value
+            elif it.tag == 'I':
+                self.pollInterval = int(it.value)
+            elif it.tag == 'K':
+                self.keepAliveInterval = int(it.value)
+                if self.keepAliveInterval < 1:
+                    raise ValueError("Invalid keep-alive interval.")
+            elif it.tag == 'G':
+                self.gbtWindowSize = int(it.value)
+                if self.gbtWindowSize < 1 or self.gbtWindowSize > 63:
+                    raise ValueError("Invalid GBT window size.")
+                self.client.proposedConformance |= Conformance.GENERAL_BLOCK_TRANSFER
+                self.client.setGbtWindowSize(self.gbtWindowSize)
+            elif it.tag == 'N':
+                self.retryAttempts = int(it.value)
+                if self.retryAttempts < 1:
+                    raise ValueError("Invalid retry attempts.")
+            elif it.tag == 'M':
+                self.maxTimeout = int(it.value)
+                if self.maxTimeout < 1:
+                    raise ValueError("Invalid maximum timeout.")
+            elif it.tag == 'Q':
+                self.maxFailures = int(it.value)
+            elif it.tag == 'O':
+                self.scheduleFile = it.value
+            elif it.tag == 'y':
+                self.portRate = float(it.value)
+                if self.portRate < 0:
+                    raise ValueError("Invalid port rate.")
+            elif it.tag == 'Y':
+                self.fleetRate = float(it.value)
+                if self.fleetRate < 0:
+                    raise ValueError("Invalid fleet rate.")
+            elif it.tag == 'e':
+                self.iecSettleTime = int(it.value)
+                if self.iecSettleTime < 0:
+                    raise ValueError("Invalid IEC settle time.")
+            elif it.tag == 'k':
+                self.iecSkipSignOn = True
+            elif it.tag == 'm':
+                self.metricsFile = it.value
+            elif it.tag == 'z':
+                self.profileStatsDirectory = it.value
+            elif it.tag == 'u':
+                self.decoderProcesses = int(it.value)
+                if self.decoderProcesses < 0:
+                    raise ValueError("Invalid number of decoder processes.")
             elif it.tag == 'a':
                 try:
                     it.value = it.value.upper()
@@ -179,7 +399,7 @@ class GXSettings:
                 self.showHelp()
                 return 1
 
-        if not self.media:
+        if not self.media and not self.fleetFile and not self.pushPort:
             GXSettings.showHelp()
             return 1
         return 0
\ No newline at end of file
@@ -1,17 +1,39 @@
 import sys
+import time
 import traceback
 from gurux_common.io import Parity, StopBits, BaudRate
 from gurux_serial import GXSerial
 from gurux_net import GXNet
-from gurux_dlms.enums import ObjectType
 from GXSettings import GXSettings
 from GXDLMSReader import GXDLMSReader
+from GXFleetReader import GXFleetReader
+from GXAssociationCache import GXAssociationCache
+from GXProfileWatermarks import GXProfileWatermarks
+from GXReadCheckpoint import GXReadCheckpoint
+from GXReadBudget import GXReadBudget
+from GXSessionManager import GXSessionManager
+from GXRetryPolicy import GXRetryPolicy
+from GXRateLimiter import GXRateLimiter
+from GXPollScheduler import GXPollScheduler
+from GXReaderMetrics import GXReaderMetrics
+from GXDecoderPool import GXDecoderPool
+from GXObisIndex import GXObisIndex
+from GXReadPlan import GXReadPlanCache
+from GXPushListener import GXPushListener
+from GXResultSink import GXResultSink
 
 class smartclient():
     @classmethod
     def main(cls, args):
         # args: the command line arguments
         reader = None
+        sessions = None
+        fleet = None
+        decoderPool = None
+        listener = None
+        results = None
+        profileWatermarks = None
+        checkpoint = None
         settings = GXSettings()
         try:
             # //////////////////////////////////////
@@ -19,39 +41,172 @@ class smartclient():
             ret = settings.getParameters(args)
             if ret != 0:
                 return
+            if settings.outputFile:
+                results = GXResultSink.open(settings.outputFile)
+            if settings.pushPort:
+                #  Listener writes the batches itself.
+                listener = GXPushListener(settings.pushPort, results.writer.write if results else None,
+                                          [(k, v) for k, v, _ in settings.readObjects], settings.trace)
+                listener.start()
+                print("Listening data notifications in port " + str(listener.port))
+                while True:
+                    time.sleep(60)
+                    print(listener.statistics)
+            associationCache = None
+            if settings.cacheDirectory:
+                associationCache = GXAssociationCache(settings.cacheDirectory, settings.cacheSize, settings.scalerTtl)
+            if settings.watermarkFile:
+                profileWatermarks = GXProfileWatermarks(settings.watermarkFile)
+            if settings.checkpointFile:
+                checkpoint = GXReadCheckpoint(settings.checkpointFile)
+            metrics = None
+            if settings.metricsFile or settings.profileStatsDirectory:
+                metrics = GXReaderMetrics()
+                metrics.profileDirectory = settings.profileStatsDirectory
+            if settings.decoderProcesses:
+                #  Worker processes are started before the reader threads.
+                decoderPool = GXDecoderPool(settings.decoderProcesses)
+            obisIndex = GXObisIndex(settings.obisIndexFile)
+            #  Meters of the same model share the encoded requests.
+            readPlans = GXReadPlanCache()
+            scheduler = None
+            if settings.scheduleFile:
+                scheduler = GXPollScheduler(GXPollScheduler.loadItems(settings.scheduleFile))
+            if settings.fleetFile:
+                fleet = GXFleetReader(GXFleetReader.loadTargets(settings.fleetFile), settings.concurrency,
+                                      settings.meterTimeout, settings.trace, settings.readObjects)
+                fleet.associationCache = associationCache
+                fleet.invalidateCache = settings.invalidateCache
+                fleet.profileWatermarks = profileWatermarks
+                fleet.checkpoint = checkpoint
+                fleet.timeBudget = settings.timeBudget
+                fleet.byteBudget = settings.byteBudget
+                fleet.logLevel = settings.logLevel
+                fleet.scheduler = scheduler
+                fleet.portRate = settings.portRate
+                fleet.fleetRate = settings.fleetRate
+                fleet.metrics = metrics
+                fleet.decoderPool = decoderPool
+                fleet.obisIndex = obisIndex
+                fleet.readPlans = readPlans
+                fleet.results = results
+                if settings.pollInterval:
+                    sessions = GXSessionManager(settings.keepAliveInterval, settings.trace)
+                    fleet.sessions = sessions
+                while True:
+                    started = time.time()
+                    print(fleet.run())
+                    if profileWatermarks:
+                        profileWatermarks.flush()
+                    if checkpoint:
+                        checkpoint.flush()
+                    for it in fleet.buses.values():
+                        print(it)
+                    if decoderPool:
+                        print("Decoder pool: " + str(decoderPool))
+                    print("Read plans: " + str(readPlans))
+                    if settings.metricsFile:
+                        metrics.save(settings.metricsFile)
+                    if scheduler:
+                        time.sleep(max(0, scheduler.getNextDue() - time.time()))
+                        continue
+                    if not sessions:
+                        break
+                    time.sleep(max(0, settings.pollInterval - (time.time() - started)))
+                return
             # //////////////////////////////////////
             #  Initialize connection settings.
             if isinstance(settings.media, GXSerial):
+                #  Serial port settings are given with -S.  Default is 9600 8N1.
                 if settings.iec:
-                    settings.media.baudrate = BaudRate.BAUD_RATE_300
-                    settings.media.bytesize = 7
+                    settings.media.baudRate = BaudRate.BAUD_RATE_300
+                    settings.media.dataBits = 7
                     settings.media.parity = Parity.EVEN
-                    settings.media.stopbits = StopBits.ONE
-                else:
-                    settings.media.baudrate = BaudRate.BAUD_RATE_9600
-                    settings.media.bytesize = 8
-                    settings.media.parity = Parity.NONE
-                    settings.media.stopbits = StopBits.ONE
+                    settings.media.stopBits = StopBits.ONE
             elif not isinstance(settings.media, GXNet):
                 raise Exception("Unknown media type.")
             # //////////////////////////////////////
             reader = GXDLMSReader(settings.client, settings.media, settings.trace)
-            if settings.readObjects:
-                reader.initializeConnection()
-                reader.getAssociationView()
-                for k, v in settings.readObjects:
-                    val = reader.read(settings.client.objects.findByLN(ObjectType.NONE, k), v)
-                    reader.showValue(v, val)
-            else:
-                reader.readAll()
+            reader.iec = settings.iec
+            reader.iecSettleTime = settings.iecSettleTime
+            reader.iecSkipSignOn = settings.iecSkipSignOn
+            reader.metrics = metrics
+            reader.decoderPool = decoderPool
+            reader.obisIndex = obisIndex
+            reader.readPlans = readPlans
+            reader.results = results
+            if settings.logLevel is not None:
+                reader.logLevel = settings.logLevel
+            reader.maxReferences = settings.maxReferences
+            reader.associationCache = associationCache
+            reader.invalidateCache = settings.invalidateCache
+            reader.profileWatermarks = profileWatermarks
+            reader.checkpoint = checkpoint
+            if settings.timeBudget or settings.byteBudget:
+                reader.budget = GXReadBudget(settings.timeBudget, settings.byteBudget)
+            reader.rowsPerRequest = settings.rowsPerRequest
+            reader.maxRowsPerPoll = settings.maxRowsPerPoll
+            reader.profileDirectory = settings.profileDirectory
+            reader.retryPolicy = GXRetryPolicy(settings.retryAttempts, maxTimeout=settings.maxTimeout, maxFailures=settings.maxFailures)
+            if settings.portRate:
+                reader.rateLimiters = [GXRateLimiter(settings.portRate)]
+            if settings.pollInterval:
+                sessions = GXSessionManager(settings.keepAliveInterval, settings.trace)
+                sessions.add(str(settings.media), reader)
+            while True:
+                started = time.time()
+                try:
+                    with reader.lock:
+                        if scheduler:
+                            items = scheduler.getDue(str(settings.media))
+                            try:
+                                scheduler.update(str(settings.media), reader.readScheduled(items))
+                            except Exception:
+                                scheduler.markFailed(str(settings.media), items)
+                                raise
+                        elif settings.readObjects:
+                            reader.showObjects(reader.readObjects(settings.readObjects))
+                        else:
+                            reader.readAll()
+                except Exception:
+                    if not sessions and not scheduler:
+                        raise
+                    #  Association is opened again on the next poll.
+                    traceback.print_exc()
+                if profileWatermarks:
+                    profileWatermarks.flush()
+                if checkpoint:
+                    checkpoint.flush()
+                if settings.metricsFile:
+                    metrics.save(settings.metricsFile)
+                if scheduler:
+                    time.sleep(max(0, scheduler.getNextDue() - time.time()))
+                    continue
+                if not sessions:
+                    break
+                time.sleep(max(0, settings.pollInterval - (time.time() - started)))
         except Exception:
             traceback.print_exc()
         finally:
+            if listener:
+                listener.stop()
+            if sessions:
+                sessions.close()
+            if fleet:
+                fleet.close()
+            if decoderPool:
+                decoderPool.close()
             if reader:
                 try:
                     reader.close()
                 except Exception:
                     traceback.print_exc()
+            if results:
+                results.close()
+            if profileWatermarks:
+                profileWatermarks.flush()
+            if checkpoint:
+                checkpoint.flush()
             print("Ended.")
 
 if __name__ == '__main__':